@@ -1,7 +1,8 @@
 import uuid
-from fastapi import Header, HTTPException, status
+from typing import Optional, Tuple
+from fastapi import Header, HTTPException, Request, status
+from models import GameContext, GameMeta
 from redis_client import redis_client
-from config import Config
 
 
 def generate_api_key() -> str:
@@ -14,49 +15,62 @@ def generate_player_id() -> str:
     return f"player_{uuid.uuid4().hex[:12]}"
 
 
-def store_player_key(player_id: str, api_key: str):
+def store_player_key(player_id: str, api_key: str, game_id: str = None):
     """
-    Store API key for player in Redis with bidirectional mapping
-    - player:{player_id}:api_key → api_key
-    - api_key:{api_key} → player_id (for reverse lookup)
+    Create the player's session: one record in a bucketed session hash
+    (see RedisClient._session_bucket_key) holding player_id and current game
     """
-    # Store player_id → api_key mapping
-    player_key = f"player:{player_id}:api_key"
-    redis_client.client.set(player_key, api_key, ex=Config.TTL_PLAYER_SESSION)
+    redis_client.create_session(api_key, player_id, game_id)
 
-    # Store api_key → player_id reverse mapping
-    api_key_key = f"api_key:{api_key}"
-    redis_client.client.set(api_key_key, player_id, ex=Config.TTL_PLAYER_SESSION)
 
-
-def verify_api_key(api_key: str) -> str:
+def verify_api_key(api_key: str) -> Optional[str]:
     """
-    Verify API key and return player_id
+    Verify API key and return player_id (also refreshes the session)
     Returns None if invalid
     """
-    api_key_key = f"api_key:{api_key}"
-    player_id = redis_client.client.get(api_key_key)
-    return player_id
+    return authenticate(api_key)
 
 
-def refresh_api_key_ttl(api_key: str):
-    """Refresh TTL for API key to keep session alive"""
-    player_id = verify_api_key(api_key)
-    if player_id:
-        # Refresh both mappings
-        player_key = f"player:{player_id}:api_key"
-        api_key_key = f"api_key:{api_key}"
+def authenticate(api_key: str) -> Optional[str]:
+    """
+    Verify API key and refresh its session in one command
+    Returns player_id, or None if invalid
+    """
+    session = redis_client.touch_session(api_key)
+    if session:
+        return session[0]
 
-        redis_client.client.expire(player_key, Config.TTL_PLAYER_SESSION)
-        redis_client.client.expire(api_key_key, Config.TTL_PLAYER_SESSION)
+    # Sessions created before bucketed records were plain api_key:{key} strings
+    legacy_key = f"api_key:{api_key}"
+    player_id = redis_client.client.get(legacy_key)
+    if player_id:
+        redis_client.create_session(api_key, player_id)
+        redis_client.client.delete(legacy_key)
+    return player_id
 
 
-async def get_current_player(x_api_key: str = Header(..., description="API key for authentication")) -> str:
+def authenticate_request(request: Request, api_key: str) -> Optional[str]:
+    """
+    authenticate, at most once per request: the rate limiter authenticates
+    the key first and the route's auth dependency reuses the result
+    """
+    sessions = getattr(request.state, "sessions", None)
+    if sessions is None:
+        sessions = request.state.sessions = {}
+    if api_key not in sessions:
+        sessions[api_key] = authenticate(api_key)
+    return sessions[api_key]
+
+
+async def get_current_player(
+    request: Request,
+    x_api_key: str = Header(..., description="API key for authentication")
+) -> str:
     """
     FastAPI dependency to verify API key and return player_id
     Raises HTTPException if invalid
     """
-    player_id = verify_api_key(x_api_key)
+    player_id = authenticate_request(request, x_api_key)
 
     if not player_id:
         raise HTTPException(
@@ -64,7 +78,69 @@ async def get_current_player(x_api_key: str = Header(..., description="API key f
             detail="Invalid or expired API key"
         )
 
-    # Refresh TTL on valid request to keep session alive
-    refresh_api_key_ttl(x_api_key)
-
     return player_id
+
+
+async def get_existing_player(
+    request: Request,
+    x_api_key: Optional[str] = Header(default=None, description="Existing API key to reuse (optional)")
+) -> Optional[Tuple[str, str]]:
+    """
+    FastAPI dependency for routes that may create a player
+
+    Returns (player_id, api_key) when an X-API-Key is sent, so the caller
+    keeps one identity across games, or None when it is omitted.
+    Raises HTTPException if a key is sent but invalid
+    """
+    if x_api_key is None:
+        return None
+
+    player_id = authenticate_request(request, x_api_key)
+    if not player_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API key"
+        )
+
+    return player_id, x_api_key
+
+
+async def get_game_context(
+    request: Request,
+    game_id: str,
+    x_api_key: str = Header(..., description="API key for authentication")
+) -> GameContext:
+    """
+    FastAPI dependency for authenticated routes on one game
+
+    Authenticates and refreshes the session in one command, then fetches
+    game meta and membership in one pipeline: two round trips in all.
+    The meta is fresh and also seeds the request's meta cache.
+
+    Raises:
+        HTTPException: 401 for a bad API key, 404 if the game does not
+            exist, 403 if the player is not in it
+    """
+    player_id = authenticate_request(request, x_api_key)
+
+    if not player_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired API key"
+        )
+
+    meta, is_member = redis_client.get_game_context(game_id, player_id)
+
+    if meta is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
+
+    if not is_member:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Player not in this game"
+        )
+
+    return GameContext(game_id=game_id, player_id=player_id, meta=GameMeta(**meta))
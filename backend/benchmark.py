@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+Performance benchmarks for the game backend
+
+Runs from the backend directory with the same environment as the API.
+
+Usage:
+    python benchmark.py bots                       # Bot move generation
+    python benchmark.py bots --games 2000 --workers 8
+    python benchmark.py visibility                 # Per-turn visibility for all players
+    python benchmark.py sessions --sessions 200000 # Session memory (writes to REDIS_URL)
+    python benchmark.py codec                      # Stored value size and encode/decode speed
+    python benchmark.py units --units 500          # Unit table vs per-unit JSON per turn
+"""
+
+import argparse
+import json
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from bots import STRATEGIES, build_map_view, compute_game_moves
+from codec import CODECS, get_codec
+from config import Config
+from game_logic import calculate_turn_results, generate_default_map, UNITS_PER_PLAYER
+from redis_client import redis_client
+from units import UnitTable, apply_updates
+from visibility import get_visibility_map
+
+
+def bench_bots(args):
+    """Measure server-side bot moves generated per second, in-process and in the worker pool"""
+    map_view = build_map_view(generate_default_map(args.width, args.height))
+
+    strategies = list(STRATEGIES)
+    jobs = []
+    for g in range(args.games):
+        bots = [(f"bot_{g}_{p}", strategies[p % len(strategies)]) for p in range(args.players)]
+        view = dict(map_view, game_id=f"game_{g}", turn=0, players=[player_id for player_id, _ in bots])
+        jobs.append((view, bots))
+
+    moves_per_run = args.games * args.players * UNITS_PER_PLAYER
+
+    start = time.perf_counter()
+    for view, bots in jobs:
+        compute_game_moves(view, bots)
+    serial = time.perf_counter() - start
+    print(f"in-process:     {moves_per_run / serial:12,.0f} moves/s  ({serial:.3f}s)")
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        # Warm up worker processes before timing
+        list(pool.map(compute_game_moves, *zip(*jobs[:args.workers])))
+
+        start = time.perf_counter()
+        list(pool.map(compute_game_moves, *zip(*jobs), chunksize=max(1, args.games // (args.workers * 4))))
+        pooled = time.perf_counter() - start
+    print(f"pool ({args.workers} procs): {moves_per_run / pooled:12,.0f} moves/s  ({pooled:.3f}s)")
+
+
+def bench_visibility(args):
+    """Measure per-turn visibility masks for every player's units"""
+    map_data = generate_default_map(args.width, args.height, {"seed": args.seed})
+    rng = np.random.default_rng(args.seed)
+
+    start = time.perf_counter()
+    vis_map = get_visibility_map(map_data, args.radius)
+    print(f"precompute:  {(time.perf_counter() - start) * 1000:8.2f} ms")
+
+    turns = []
+    for _ in range(args.turns):
+        turns.append({
+            f"player_{p}": rng.integers(0, [args.width, args.height], size=(args.units, 2))
+            for p in range(args.players)
+        })
+
+    start = time.perf_counter()
+    for positions in turns:
+        vis_map.player_visibility(positions)
+    per_turn = (time.perf_counter() - start) / args.turns
+    print(f"per turn:    {per_turn * 1000:8.2f} ms  ({args.players} players x {args.units} units, radius {args.radius})")
+
+
+def bench_codec(args):
+    """Compare stored size and encode/decode time of each codec for moves, results and maps"""
+    map_data = generate_default_map(args.width, args.height)
+    map_view = build_map_view(map_data)
+    strategies = list(STRATEGIES)
+    bots = [(f"bot_{p:012x}", strategies[p % len(strategies)]) for p in range(args.players)]
+    view = dict(map_view, game_id="game_bench", turn=0, players=[player_id for player_id, _ in bots])
+
+    moves = {
+        player_id: {"turn": 0, "moves": player_moves, "submitted_at": "2024-01-01T00:00:00.000000"}
+        for player_id, player_moves in compute_game_moves(view, bots).items()
+    }
+    samples = {
+        "move": next(iter(moves.values())),
+        "results": calculate_turn_results(moves, "game_bench"),
+        "map": map_data
+    }
+
+    print(f"{'value':<9}{'codec':<9}{'bytes':>10}{'encode us':>12}{'decode us':>12}")
+    for label, value in samples.items():
+        for name in CODECS:
+            value_codec = get_codec(name)
+            encoded = value_codec.encode(value)
+
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                value_codec.encode(value)
+            encode_us = (time.perf_counter() - start) / args.iterations * 1e6
+
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                value_codec.decode(encoded)
+            decode_us = (time.perf_counter() - start) / args.iterations * 1e6
+
+            print(f"{label:<9}{name:<9}{len(encoded):>10,}{encode_us:>12.1f}{decode_us:>12.1f}")
+
+
+def bench_units(args):
+    """Compare one turn's load/apply/store of units as per-unit JSON dicts and as a unit table"""
+    owners = [f"player_{p:012x}" for p in range(args.players)]
+    per_player = args.units // args.players
+    units = [
+        {
+            "unit_id": f"{player_id}_unit_{i}", "player_id": player_id, "type": "soldier",
+            "health": 100, "attack": 10, "defense": 5, "movement_range": 3,
+            "position": {"q": i % 50, "r": i // 50}
+        }
+        for player_id in owners for i in range(per_player)
+    ]
+    # Every unit steps one hex along q, on an open map
+    updates = [
+        {"type": "unit_moved", "player_id": unit["player_id"], "unit_id": unit["unit_id"],
+         "new_position": [unit["position"]["q"] + 1, unit["position"]["r"]]}
+        for unit in units
+    ]
+    passable = np.ones((51, per_player // 50 + 1), dtype=bool)
+
+    stored_dicts = [json.dumps(unit) for unit in units]
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        loaded = {unit["unit_id"]: unit for unit in map(json.loads, stored_dicts)}
+        for update in updates:
+            loaded[update["unit_id"]]["position"] = {"q": update["new_position"][0], "r": update["new_position"][1]}
+        [json.dumps(unit) for unit in loaded.values()]
+    dict_ms = (time.perf_counter() - start) / args.iterations * 1000
+
+    blob = UnitTable.from_units(owners, units).to_bytes()
+    start = time.perf_counter()
+    for _ in range(args.iterations):
+        table = UnitTable.from_bytes(blob, writable=True)
+        apply_updates(table, updates, passable)
+        table.to_bytes()
+    table_ms = (time.perf_counter() - start) / args.iterations * 1000
+
+    print(f"{len(units)} units, every unit moving")
+    print(f"per-unit JSON: {sum(map(len, stored_dicts)):>8,} bytes  {dict_ms:8.3f} ms/turn ({len(units)} values)")
+    print(f"unit table:    {len(blob):>8,} bytes  {table_ms:8.3f} ms/turn (1 value)")
+
+
+def _used_memory() -> int:
+    return redis_client.client.info("memory")["used_memory"]
+
+
+def _write_sessions(layout: str, sessions, batch: int = 1000):
+    """Write sessions under the bench: prefix in the legacy (one key each) or bucketed layout"""
+    ttl = Config.TTL_PLAYER_SESSION
+    expires_at = int(time.time()) + ttl
+    for i in range(0, len(sessions), batch):
+        pipe = redis_client.pipeline()
+        for api_key, player_id, game_id in sessions[i:i + batch]:
+            if layout == "legacy":
+                pipe.set(f"bench:player:{{{player_id}}}:api_key", api_key, ex=ttl)
+                pipe.set(f"bench:api_key:{api_key}", player_id, ex=ttl)
+                pipe.set(f"bench:player:{{{player_id}}}:current_game", game_id, ex=ttl)
+            else:
+                bucket = f"bench:{redis_client._session_bucket_key(api_key)}"
+                pipe.hset(bucket, api_key, f"{player_id}\t{game_id}\t{expires_at}")
+                pipe.expire(bucket, ttl)
+        pipe.execute()
+
+
+def _delete_bench_keys():
+    keys = list(redis_client.client.scan_iter(match="bench:*", count=1000))
+    for i in range(0, len(keys), 1000):
+        redis_client.client.delete(*keys[i:i + 1000])
+
+
+def bench_sessions(args):
+    """Measure Redis memory per player session, one key per field vs bucketed hash records"""
+    sessions = [
+        (str(uuid.uuid4()), f"player_{uuid.uuid4().hex[:12]}", f"game_{uuid.uuid4().hex[:12]}")
+        for _ in range(args.sessions)
+    ]
+    _delete_bench_keys()
+
+    for layout in ("legacy", "bucketed"):
+        before = _used_memory()
+        _write_sessions(layout, sessions)
+        used = _used_memory() - before
+        _delete_bench_keys()
+        print(f"{layout:<9} {used / args.sessions:8.1f} bytes/session  ({used / 2**20:.1f} MiB for {args.sessions:,})")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    bots_parser = subparsers.add_parser("bots", help="Bot move generation throughput")
+    bots_parser.add_argument("--games", type=int, default=1000)
+    bots_parser.add_argument("--players", type=int, default=4)
+    bots_parser.add_argument("--width", type=int, default=20)
+    bots_parser.add_argument("--height", type=int, default=20)
+    bots_parser.add_argument("--workers", type=int, default=4)
+    bots_parser.set_defaults(func=bench_bots)
+
+    vis_parser = subparsers.add_parser("visibility", help="Per-turn visibility computation")
+    vis_parser.add_argument("--players", type=int, default=8)
+    vis_parser.add_argument("--units", type=int, default=100)
+    vis_parser.add_argument("--width", type=int, default=50)
+    vis_parser.add_argument("--height", type=int, default=50)
+    vis_parser.add_argument("--radius", type=int, default=5)
+    vis_parser.add_argument("--turns", type=int, default=50)
+    vis_parser.add_argument("--seed", type=int, default=1)
+    vis_parser.set_defaults(func=bench_visibility)
+
+    sessions_parser = subparsers.add_parser("sessions", help="Redis memory per player session")
+    sessions_parser.add_argument("--sessions", type=int, default=100000)
+    sessions_parser.set_defaults(func=bench_sessions)
+
+    codec_parser = subparsers.add_parser("codec", help="Stored value size and encode/decode speed per codec")
+    codec_parser.add_argument("--players", type=int, default=8)
+    codec_parser.add_argument("--width", type=int, default=50)
+    codec_parser.add_argument("--height", type=int, default=50)
+    codec_parser.add_argument("--iterations", type=int, default=200)
+    codec_parser.set_defaults(func=bench_codec)
+
+    units_parser = subparsers.add_parser("units", help="Unit table vs per-unit JSON load/apply/store")
+    units_parser.add_argument("--players", type=int, default=8)
+    units_parser.add_argument("--units", type=int, default=400)
+    units_parser.add_argument("--iterations", type=int, default=200)
+    units_parser.set_defaults(func=bench_units)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
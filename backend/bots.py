@@ -0,0 +1,249 @@
+import abc
+import asyncio
+import random
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Tuple, Type
+
+from redis_client import redis_client
+from game_logic import UNITS_PER_PLAYER
+from models import compact_move
+import units
+from config import Config
+
+
+def generate_bot_id() -> str:
+    """Generate a unique player ID for a server-hosted bot"""
+    return f"bot_{uuid.uuid4().hex[:12]}"
+
+
+# ==================== Strategies ====================
+
+class BotStrategy(abc.ABC):
+    """
+    Base class for server-hosted bot strategies
+
+    Subclasses set `name` and implement choose_moves(). Strategies run in
+    the bot worker pool, so they must be importable at module level and
+    only use the view they are given (no Redis access).
+    """
+
+    name = "base"
+
+    def __init__(self, seed: str):
+        self.rng = random.Random(seed)
+
+    @abc.abstractmethod
+    def choose_moves(self, view: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Choose this turn's moves
+
+        Args:
+            view: Bot's view of the game: game_id, turn, player_id, unit_ids
+                (the bot's living units), opponents, width, height, passable
+                [(q, r), ...] (at most BOT_VIEW_MAX_HEXES of them),
+                spawn_points, and units: every unit on the board as stored
+                (units.UnitTable.to_units), or None for games without a
+                unit table
+
+        Returns:
+            List of move actions ({unit_id, action, target})
+        """
+
+
+# Registry of available strategies by name
+STRATEGIES: Dict[str, Type[BotStrategy]] = {}
+
+
+def register_strategy(strategy_class: Type[BotStrategy]) -> Type[BotStrategy]:
+    """Class decorator adding a strategy to the registry under its `name`"""
+    STRATEGIES[strategy_class.name] = strategy_class
+    return strategy_class
+
+
+@register_strategy
+class DefenderBot(BotStrategy):
+    """Keeps every unit defending"""
+
+    name = "defender"
+
+    def choose_moves(self, view: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return [
+            {"unit_id": unit_id, "action": "defend", "target": None}
+            for unit_id in view["unit_ids"]
+        ]
+
+
+@register_strategy
+class RandomBot(BotStrategy):
+    """Moves every unit to a random passable hex"""
+
+    name = "random"
+
+    def choose_moves(self, view: Dict[str, Any]) -> List[Dict[str, Any]]:
+        passable = view["passable"]
+        if not passable:
+            return DefenderBot.choose_moves(self, view)
+        return [
+            {"unit_id": unit_id, "action": "move", "target": list(self.rng.choice(passable))}
+            for unit_id in view["unit_ids"]
+        ]
+
+
+@register_strategy
+class RusherBot(BotStrategy):
+    """
+    Sends units at a random living enemy unit: the first attacks it, the
+    rest advance on its position (on a spawn point when positions are unknown)
+    """
+
+    name = "rusher"
+
+    def choose_moves(self, view: Dict[str, Any]) -> List[Dict[str, Any]]:
+        if not view["opponents"] or not view["unit_ids"]:
+            return DefenderBot.choose_moves(self, view)
+
+        enemies = [
+            unit for unit in view["units"] or []
+            if unit["player_id"] != view["player_id"] and unit["health"] > 0
+        ]
+        if enemies:
+            enemy = self.rng.choice(enemies)
+            target_unit, position = enemy["unit_id"], enemy["position"]
+        elif view["units"] is None:
+            target_unit = f"{self.rng.choice(view['opponents'])}_unit_0"
+            position = self.rng.choice(view["spawn_points"])
+        else:
+            return DefenderBot.choose_moves(self, view)  # Every enemy unit is dead
+
+        moves = [{"unit_id": view["unit_ids"][0], "action": "attack", "target": target_unit}]
+        moves.extend(
+            {"unit_id": unit_id, "action": "move", "target": [position["q"], position["r"]]}
+            for unit_id in view["unit_ids"][1:]
+        )
+        return moves
+
+
+# ==================== Worker Pool ====================
+
+def compute_game_moves(view: Dict[str, Any], bots: List[Tuple[str, str]]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compute moves for every bot of one game (runs inside a pool worker)
+
+    Args:
+        view: Shared view of the game (see BotStrategy.choose_moves)
+        bots: List of (player_id, strategy name)
+
+    Returns:
+        Dictionary mapping bot player_id to its moves, in compact form
+    """
+    all_players = view["players"]
+    all_units = view.get("units")
+    moves = {}
+
+    for player_id, strategy_name in bots:
+        strategy = STRATEGIES.get(strategy_name, DefenderBot)(f"{view['game_id']}:{view['turn']}:{player_id}")
+        if all_units is None:
+            unit_ids = [f"{player_id}_unit_{i}" for i in range(UNITS_PER_PLAYER)]
+        else:
+            unit_ids = [unit["unit_id"] for unit in all_units if unit["player_id"] == player_id and unit["health"] > 0]
+        bot_view = dict(
+            view,
+            player_id=player_id,
+            units=all_units,
+            unit_ids=unit_ids,
+            opponents=[other for other in all_players if other != player_id]
+        )
+        moves[player_id] = [compact_move(**move) for move in strategy.choose_moves(bot_view)]
+
+    return moves
+
+
+_pool = None
+
+
+def get_bot_pool() -> ProcessPoolExecutor:
+    """Get the bot worker pool (lazy initialization)"""
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=Config.BOT_WORKERS)
+    return _pool
+
+
+def build_map_view(map_data: Dict[str, Any], hexes: Iterable[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    Static part of a bot view, derived from the game map
+
+    On maps with more than BOT_VIEW_MAX_HEXES passable hexes, `passable` is
+    a fixed uniform sample of them, so views stay small to cache and to
+    send to the pool whatever the map size.
+
+    Args:
+        map_data: Game map (its header is enough when `hexes` is given)
+        hexes: Hexes of the map, if not map_data["hexes"]
+    """
+    rng = random.Random(0)
+    passable = []
+    seen = 0
+    for hex_data in map_data["hexes"] if hexes is None else hexes:
+        if not hex_data["passable"]:
+            continue
+        # Reservoir sampling: every passable hex is kept with equal chance
+        seen += 1
+        if len(passable) < Config.BOT_VIEW_MAX_HEXES:
+            passable.append((hex_data["q"], hex_data["r"]))
+        else:
+            slot = rng.randrange(seen)
+            if slot < Config.BOT_VIEW_MAX_HEXES:
+                passable[slot] = (hex_data["q"], hex_data["r"])
+
+    return {
+        "width": map_data["width"],
+        "height": map_data["height"],
+        "passable": passable,
+        "spawn_points": map_data["spawn_points"]
+    }
+
+
+@lru_cache(maxsize=max(1, Config.BOT_VIEW_CACHE_MAX_HEXES // Config.BOT_VIEW_MAX_HEXES))
+def _map_view(game_id: str) -> Dict[str, Any]:
+    """
+    Static part of a game's bot view (maps never change once created)
+
+    Views hold at most BOT_VIEW_MAX_HEXES hexes each, so the cache holds
+    at most BOT_VIEW_CACHE_MAX_HEXES.
+    """
+    # Chunked maps are read a chunk at a time rather than reassembled whole
+    map_data = redis_client.get_game_map(game_id, with_hexes=False)
+    if not map_data:
+        raise ValueError(f"No map for game {game_id}")
+
+    return build_map_view(map_data, redis_client.iter_map_hexes(game_id) if map_data.get("chunked") else None)
+
+
+async def compute_bot_moves(game_id: str, turn: int, bots: Dict[str, str]) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Compute this turn's moves for a game's bots in the worker pool
+
+    Args:
+        game_id: Game identifier
+        turn: Turn being played
+        bots: Bot player_id → strategy name
+
+    Returns:
+        Dictionary mapping bot player_id to its moves, in compact form
+    """
+    # Building a view reads the map from Redis; keep that off the event loop
+    map_view = await asyncio.to_thread(_map_view, game_id)
+    table = units.load(redis_client.get_units(game_id))
+    view = dict(
+        map_view,
+        game_id=game_id,
+        turn=turn,
+        players=redis_client.get_game_players(game_id),
+        units=table.to_units() if table else None
+    )
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_bot_pool(), compute_game_moves, view, list(bots.items()))
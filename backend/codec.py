@@ -0,0 +1,70 @@
+import json
+from typing import Any, Optional, Union
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+from config import Config
+
+
+# Prefix marking msgpack values. 0xC1 is never used by msgpack and cannot
+# start JSON (or UTF-8) text, so legacy JSON values are always told apart.
+MSGPACK_MAGIC = b"\xc1mp"
+
+
+class JsonCodec:
+    """Compact JSON, byte-identical in format to values stored before codecs existed"""
+    name = "json"
+
+    def encode(self, value: Any) -> bytes:
+        return json.dumps(value, separators=(",", ":")).encode()
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data)
+
+
+class MsgpackCodec:
+    """msgpack behind MSGPACK_MAGIC"""
+    name = "msgpack"
+
+    def __init__(self):
+        if msgpack is None:
+            raise RuntimeError("REDIS_CODEC=msgpack requires the msgpack package (pip install msgpack)")
+
+    def encode(self, value: Any) -> bytes:
+        return MSGPACK_MAGIC + msgpack.packb(value, use_bin_type=True)
+
+    def decode(self, data: bytes) -> Any:
+        return msgpack.unpackb(data[len(MSGPACK_MAGIC):], raw=False, strict_map_key=False)
+
+
+CODECS = {
+    "json": JsonCodec,
+    "msgpack": MsgpackCodec
+}
+
+
+def get_codec(name: str = None):
+    """Codec used for new writes (REDIS_CODEC)"""
+    name = name or Config.REDIS_CODEC
+    if name not in CODECS:
+        raise ValueError(f"Unknown codec '{name}'. Expected one of: {', '.join(CODECS)}")
+    return CODECS[name]()
+
+
+def decode(data: Optional[Union[bytes, str]]) -> Any:
+    """
+    Decode a stored value whatever codec wrote it
+
+    Values carrying MSGPACK_MAGIC are msgpack; anything else is JSON,
+    including every value written before codecs existed.
+    """
+    if data is None:
+        return None
+    if isinstance(data, bytes) and data.startswith(MSGPACK_MAGIC):
+        if msgpack is None:
+            raise RuntimeError("Found a msgpack value but the msgpack package is not installed")
+        return msgpack.unpackb(data[len(MSGPACK_MAGIC):], raw=False, strict_map_key=False)
+    return json.loads(data)
@@ -4,11 +4,21 @@ from dotenv import load_dotenv
 # Load environment variables from .env file if it exists
 load_dotenv()
 
+
+def _rate_limit(name: str, default: str):
+    """Parse a "rate/burst" budget (tokens per second / bucket size) from the environment"""
+    rate, burst = os.getenv(name, default).split("/")
+    return float(rate), int(burst)
+
+
 class Config:
     """Application configuration"""
 
     # Redis configuration
     REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379")
+    REDIS_CLUSTER = os.getenv("REDIS_CLUSTER", "false").lower() in ("1", "true", "yes")
+    # Where tournament.py plays its games; never the game server's Redis
+    TOURNAMENT_REDIS_URL = os.getenv("TOURNAMENT_REDIS_URL", "redis://localhost:6379/15")
 
     # API configuration
     API_SECRET = os.getenv("API_SECRET", "dev_secret_key")
@@ -19,13 +29,126 @@ class Config:
     # TTL settings (in seconds)
     TTL_ACTIVE_GAME = 24 * 60 * 60  # 24 hours
     TTL_COMPLETED_GAME = 1 * 60 * 60  # 1 hour
+    # With EXPORT_COMPLETED_GAMES, completed games are kept until export.py
+    # has exported them, but no longer than TTL_UNEXPORTED_GAME
+    EXPORT_COMPLETED_GAMES = os.getenv("EXPORT_COMPLETED_GAMES", "false").lower() in ("1", "true", "yes")
+    TTL_UNEXPORTED_GAME = int(os.getenv("TTL_UNEXPORTED_GAME", str(7 * 24 * 60 * 60)))  # 7 days
     TTL_PLAYER_SESSION = 48 * 60 * 60  # 48 hours
 
+    # Encoding of moves, results and maps stored in Redis (json | msgpack);
+    # values written with either codec stay readable after switching
+    REDIS_CODEC = os.getenv("REDIS_CODEC", "msgpack")
+
+    # Player sessions live in 16^N bucket hashes (sessions:{prefix}); keep
+    # sessions per bucket under hash-max-listpack-entries (default 128)
+    SESSION_BUCKET_CHARS = int(os.getenv("SESSION_BUCKET_CHARS", "4"))
+    SESSION_PURGE_BUCKETS_PER_SWEEP = 1024
+
+    # Background sweeper settings
+    SWEEP_INTERVAL_SECONDS = int(os.getenv("SWEEP_INTERVAL_SECONDS", "30"))
+    SWEEP_BATCH_SIZE = int(os.getenv("SWEEP_BATCH_SIZE", "100"))
+    TURN_HISTORY_KEEP = 3  # Recent turns kept as individual keys before compaction
+
+    # Turn timings kept for /metrics/turns: per game, and across all games
+    TURN_TIMINGS_KEEP = 100
+    TURN_TIMINGS_GLOBAL_KEEP = 1000
+
+    # Proxies in front of the API that append to X-Forwarded-For (1 on
+    # Railway); rate limits key anonymous clients by the address the
+    # outermost trusted proxy saw, instead of the proxy's own address
+    TRUSTED_PROXY_HOPS = int(os.getenv("TRUSTED_PROXY_HOPS", "0"))
+
+    # Per-API-key rate limits per route: (tokens per second, burst)
+    RATE_LIMITS = {
+        "status": _rate_limit("RATE_LIMIT_STATUS", "0.5/5"),
+        "results": _rate_limit("RATE_LIMIT_RESULTS", "0.5/5"),
+        "submit": _rate_limit("RATE_LIMIT_SUBMIT", "2/10"),
+        "batch": _rate_limit("RATE_LIMIT_BATCH", "1/10"),
+        "bulk": _rate_limit("RATE_LIMIT_BULK", "0.05/2"),
+        "spectate": _rate_limit("RATE_LIMIT_SPECTATE", "2/10"),
+        "default": _rate_limit("RATE_LIMIT_DEFAULT", "5/20"),
+    }
+
+    # Admission control: requests handled concurrently per worker, and how
+    # long an extra request may wait for a slot before getting a 503
+    MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", "200"))
+    ADMISSION_WAIT_SECONDS = 0.5
+
+    # Server-hosted bots: processes computing bot moves
+    BOT_WORKERS = int(os.getenv("BOT_WORKERS", "2"))
+    # Passable hexes in a bot's view of the map (a fixed sample on larger maps),
+    # and the bot views cached per worker, in hexes
+    BOT_VIEW_MAX_HEXES = 4096
+    BOT_VIEW_CACHE_MAX_HEXES = 250_000
+
+    # Spectator feeds (cached per worker)
+    SPECTATOR_REFRESH_SECONDS = 1.0
+    SPECTATOR_HISTORY_TURNS = 20
+    SPECTATOR_MAX_GAMES = 1000
+
+    # Game meta cache (per worker; see RedisClient.get_game_meta)
+    META_CACHE_TTL_SECONDS = float(os.getenv("META_CACHE_TTL_SECONDS", "1.0"))
+    META_CACHE_MAX_GAMES = 10000
+
+    # Turn deadlines
+    TURN_SETTLE_DELAY = 0.5  # Seconds a claimed turn waits for in-flight moves
+
+    # Turn scheduler (per worker): turns processed at once, overall and per
+    # tenant (game creator), and the wait after which a turn jumps the queue
+    TURN_PROCESSING_CONCURRENCY = int(os.getenv("TURN_PROCESSING_CONCURRENCY", "16"))
+    TURN_PROCESSING_PER_TENANT = int(os.getenv("TURN_PROCESSING_PER_TENANT", "4"))
+    TURN_SCHEDULER_MAX_WAIT_SECONDS = 5.0
+    # A claimed turn not finished within this long after its claim (or after
+    # processing started) is taken over by the deadline scheduler
+    TURN_PROCESSING_LEASE_SECONDS = int(os.getenv("TURN_PROCESSING_LEASE_SECONDS", "30"))
+    TURN_TIMEOUT_SECONDS = int(os.getenv("TURN_TIMEOUT_SECONDS", "120"))
+    # A turn whose processing failed is retried after a doubling delay
+    TURN_RETRY_BASE_SECONDS = 1.0
+    TURN_RETRY_MAX_SECONDS = 60.0
+    DEADLINE_POLL_INTERVAL_SECONDS = 1
+    # A claimed deadline comes due again this long after the claim unless
+    # the claimer started the turn (it failed or stopped in between)
+    DEADLINE_CLAIM_RETRY_SECONDS = 30
+    DEADLINE_BATCH_SIZE = 500
+
     # Game settings
     DEFAULT_MAX_PLAYERS = 4
     MIN_PLAYERS = 2
     MAX_PLAYERS = 8
 
+    # Maps: largest side, chunk side (GET /game/{id}/map/chunk), and the
+    # largest map (in hexes) still stored and sent whole
+    MAP_MAX_SIZE = 512
+    MAP_CHUNK_SIZE = 32
+    MAP_INLINE_MAX_HEXES = 50 * 50
+
+    # Seeded terrain maps cached per worker, in hexes (about 270 bytes each)
+    TERRAIN_CACHE_MAX_HEXES = 250_000
+
+    # Move submission limits
+    MAX_MOVES_PER_SUBMISSION = 200
+    MAX_REQUEST_BODY_BYTES = 64 * 1024
+    BATCH_MAX_REQUEST_BODY_BYTES = 1024 * 1024
+
+    # Game listing pagination
+    GAME_LIST_DEFAULT_LIMIT = 20
+    GAME_LIST_MAX_LIMIT = 100
+
+    # Games per /games/bulk request, and their total map hexes (count x
+    # width x height; each game stores its own copy of the map). Games are
+    # stored per pipeline of at most BULK_CREATE_BATCH_SIZE games and
+    # about BULK_CREATE_PIPELINE_BYTES of commands
+    BULK_CREATE_MAX_GAMES = 10000
+    BULK_CREATE_MAX_HEXES = 4_000_000
+    BULK_CREATE_BATCH_SIZE = 500
+    BULK_CREATE_PIPELINE_BYTES = 8 * 1024 * 1024
+
+    # Games per /batch/status or /batch/submit request
+    BATCH_MAX_GAMES = 500
+
+    # Games returned by /player/games/awaiting
+    AWAITING_GAMES_MAX_LIMIT = 1000
+
     @classmethod
     def validate(cls):
         """Validate that required configuration is present"""
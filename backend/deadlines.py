@@ -0,0 +1,104 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import List, Tuple
+
+from redis_client import redis_client, RedisClient
+from turns import begin_processing, schedule_processing
+from config import Config
+
+
+class TurnDeadlineScheduler:
+    """
+    Resolves turns whose deadline passed before every player submitted, and
+    takes over turns whose processing lease expired
+
+    All open turns share one sorted set of deadlines, and all turns being
+    processed one sorted set of leases, so a single loop per worker covers
+    any number of games: each tick reads at most `batch_size` entries of
+    each. Claims are atomic, so running one scheduler in every API worker
+    is safe.
+    """
+
+    def __init__(self, client: RedisClient = None, batch_size: int = None, interval: float = None):
+        self.client = client or redis_client
+        self.batch_size = batch_size or Config.DEADLINE_BATCH_SIZE
+        self.interval = interval or Config.DEADLINE_POLL_INTERVAL_SECONDS
+
+    def collect_overdue_turns(self) -> List[Tuple[str, int]]:
+        """
+        Claim overdue turns and mark missing players as passing, and take
+        over turns whose processing lease expired (the worker that claimed
+        them stopped or stalled)
+
+        Returns:
+            List of (game_id, turn) that this worker must now process
+        """
+        now = time.time()
+        claimed = []
+
+        for game_id in self.client.get_expired_leases(now, limit=self.batch_size):
+            # Postponed, not removed: if this worker fails before taking the
+            # turn over, the lease comes due again
+            if not self.client.claim_expired_lease(game_id, now, now + Config.DEADLINE_CLAIM_RETRY_SECONDS):
+                continue  # Another worker got it
+
+            meta = self.client.get_game_meta(game_id, fresh=True)
+            if not meta or meta["state"] != "processing_turn":
+                # The turn finished since (or the game is gone)
+                self.client.clear_processing_lease(game_id)
+                continue
+
+            # Refused if the holder renewed its lease in the meantime
+            if begin_processing(game_id, meta["current_turn"], take_over=True):
+                claimed.append((game_id, meta["current_turn"]))
+
+        for game_id in self.client.get_overdue_games(now, limit=self.batch_size):
+            # The claim only postpones the deadline: if anything below fails,
+            # the turn comes due again instead of being left without one
+            if not self.client.claim_turn_deadline(game_id, now, now + Config.DEADLINE_CLAIM_RETRY_SECONDS):
+                continue  # Another worker got it
+
+            meta = self.client.get_game_meta(game_id, fresh=True)
+            if meta and meta["state"] == "processing_turn":
+                # Claimed but its lease not yet set (the claimer stopped in
+                # between, or is about to set it): make sure one exists
+                self.client.set_processing_lease(
+                    game_id, now + Config.TURN_PROCESSING_LEASE_SECONDS, only_if_missing=True
+                )
+                self.client.clear_turn_deadline(game_id)
+                continue
+            if not meta or meta["state"] != "in_progress":
+                self.client.clear_turn_deadline(game_id)
+                continue
+
+            turn = meta["current_turn"]
+            passed_move = {
+                "turn": turn,
+                "moves": [],
+                "passed": True,
+                "submitted_at": datetime.utcnow().isoformat()
+            }
+            players = self.client.get_game_players(game_id)
+            self.client.fill_missing_moves(game_id, turn, players, passed_move)
+
+            if begin_processing(game_id, turn):
+                claimed.append((game_id, turn))
+
+        return claimed
+
+    async def run(self):
+        """Check for overdue turns forever, one tick every `interval` seconds"""
+        while True:
+            try:
+                overdue = await asyncio.to_thread(self.collect_overdue_turns)
+                for game_id, turn in overdue:
+                    schedule_processing(game_id, turn)
+            except Exception as e:
+                print(f"Error resolving turn deadlines: {str(e)}")
+
+            await asyncio.sleep(self.interval)
+
+
+# Global deadline scheduler instance
+turn_deadline_scheduler = TurnDeadlineScheduler()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+"""
+Streaming columnar export of completed games for offline analytics
+
+Walks the completed-games index oldest first, reads each game's turns in
+pipelined batches and writes three tables as columnar files:
+
+- games:   one row per game (game_id, completed_at, players, turns)
+- moves:   one row per stored move ([action code, unit_id, target] flattened)
+- results: one row per turn update/event
+
+Rows are buffered per table and flushed every --rows-per-chunk rows, so
+memory stays bounded no matter how many games are exported. Output is
+NumPy .npz parts (moves-00000.npz, ...) or, when pyarrow is installed,
+one Parquet file per table written a row group at a time.
+
+Run it more often than TTL_UNEXPORTED_GAME when EXPORT_COMPLETED_GAMES is
+on: completed games are kept until exported, but not longer than that.
+
+Usage:
+    python export.py out/                          # Games completed since the last export
+    python export.py out/ --format parquet --since 1717000000
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+from models import compact_move
+from redis_client import redis_client
+
+
+# Action code recorded for a player who passed the turn (deadline expired)
+ACTION_PASSED = -1
+
+# Placeholder for missing numeric columns (targets are non-negative hex coords)
+MISSING = -1
+
+TABLES = {
+    "games": {
+        "game_id": str,
+        "completed_at": np.float64,
+        "created_at": str,
+        "max_players": np.int8,
+        "player_count": np.int8,
+        "turns": np.int32
+    },
+    "moves": {
+        "game_id": str,
+        "turn": np.int32,
+        "player_id": str,
+        "unit_id": str,
+        "action": np.int8,
+        "target_q": np.int32,
+        "target_r": np.int32,
+        "target_unit": str
+    },
+    "results": {
+        "game_id": str,
+        "turn": np.int32,
+        "kind": str,
+        "type": str,
+        "player_id": str,
+        "unit_id": str,
+        "q": np.int32,
+        "r": np.int32,
+        "target_unit": str
+    }
+}
+
+
+# ==================== Buffers and Writers ====================
+
+class ColumnBuffer:
+    """Row buffer for one table, kept as one list per column"""
+
+    def __init__(self, columns: Dict[str, Any]):
+        self.columns = columns
+        self.data = {name: [] for name in columns}
+        self.rows = 0
+
+    def append(self, **row):
+        for name, values in self.data.items():
+            values.append(row[name])
+        self.rows += 1
+
+    def take(self) -> Dict[str, np.ndarray]:
+        """Return the buffered rows as typed arrays and clear the buffer"""
+        arrays = {
+            name: np.asarray(values, dtype=self.columns[name])
+            for name, values in self.data.items()
+        }
+        self.data = {name: [] for name in self.columns}
+        self.rows = 0
+        return arrays
+
+
+class NumpyWriter:
+    """Writes each flushed chunk as a compressed .npz part file"""
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        self.parts = {}
+
+    def write(self, table: str, arrays: Dict[str, np.ndarray]):
+        part = self.parts.get(table, 0)
+        np.savez_compressed(os.path.join(self.out_dir, f"{table}-{part:05d}.npz"), **arrays)
+        self.parts[table] = part + 1
+
+    def close(self):
+        pass
+
+
+class ParquetWriter:
+    """Appends each flushed chunk as a row group of one Parquet file per table"""
+
+    def __init__(self, out_dir: str):
+        if pq is None:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self.out_dir = out_dir
+        self.writers = {}
+
+    def write(self, table: str, arrays: Dict[str, np.ndarray]):
+        columns = TABLES[table]
+        batch = pa.table({
+            name: pa.array(values.tolist(), type=pa.string()) if columns[name] is str else pa.array(values)
+            for name, values in arrays.items()
+        })
+        if table not in self.writers:
+            self.writers[table] = pq.ParquetWriter(os.path.join(self.out_dir, f"{table}.parquet"), batch.schema)
+        self.writers[table].write_table(batch)
+
+    def close(self):
+        for writer in self.writers.values():
+            writer.close()
+
+
+WRITERS = {
+    "npz": NumpyWriter,
+    "parquet": ParquetWriter
+}
+
+
+# ==================== Row Extraction ====================
+
+def _target_columns(target: Any) -> Tuple[int, int, str]:
+    """Split a stored target into (q, r, unit_id) columns"""
+    if isinstance(target, (list, tuple)) and len(target) == 2:
+        return int(target[0]), int(target[1]), ""
+    if isinstance(target, str):
+        return MISSING, MISSING, target
+    return MISSING, MISSING, ""
+
+
+def _add_turn_rows(buffers: Dict[str, ColumnBuffer], game_id: str, turn: int,
+                   moves: Dict[str, Any], results: Optional[Dict[str, Any]]):
+    """Flatten one turn's moves and results into table rows"""
+    for player_id, move_data in moves.items():
+        if move_data.get("passed"):
+            buffers["moves"].append(
+                game_id=game_id, turn=turn, player_id=player_id, unit_id="",
+                action=ACTION_PASSED, target_q=MISSING, target_r=MISSING, target_unit=""
+            )
+
+        for move in move_data.get("moves", []):
+            if isinstance(move, dict):
+                # Stored before the compact format existed
+                move = compact_move(move["unit_id"], move["action"], move.get("target"))
+
+            action, unit_id, target = move
+            q, r, target_unit = _target_columns(target)
+            buffers["moves"].append(
+                game_id=game_id, turn=turn, player_id=player_id, unit_id=unit_id,
+                action=action, target_q=q, target_r=r, target_unit=target_unit
+            )
+
+    if not results:
+        return
+
+    for kind, items in (("update", results.get("updates", [])), ("event", results.get("events", []))):
+        for item in items:
+            q, r, target_unit = _target_columns(item.get("new_position", item.get("target")))
+            buffers["results"].append(
+                game_id=game_id, turn=turn, kind=kind, type=item.get("type", ""),
+                player_id=item.get("player_id", ""), unit_id=item.get("unit_id", ""),
+                q=q, r=r, target_unit=target_unit
+            )
+
+
+def export_game(buffers: Dict[str, ColumnBuffer], game_id: str, completed_at: float, turn_batch: int) -> bool:
+    """
+    Append one completed game to the buffers
+
+    Returns:
+        False if the game no longer exists (deleted since it was indexed)
+    """
+    meta = redis_client.get_game_meta(game_id)
+    if not meta:
+        return False
+
+    # A completed game may have results for its final (not incremented) turn
+    # (won through the win condition) or not (ended after the increment), so
+    # the turns played are counted from the results found
+    last_turn = meta["current_turn"]
+    turns_played = 0
+    for start in range(0, last_turn + 1, turn_batch):
+        turns = list(range(start, min(start + turn_batch, last_turn + 1)))
+        for turn, (moves, results) in zip(turns, redis_client.get_turn_history(game_id, turns)):
+            _add_turn_rows(buffers, game_id, turn, moves, results)
+            turns_played += results is not None
+
+    buffers["games"].append(
+        game_id=game_id, completed_at=completed_at, created_at=meta["created_at"] or "",
+        max_players=meta["max_players"], player_count=meta["player_count"], turns=turns_played
+    )
+    return True
+
+
+# ==================== Export Loop ====================
+
+def export_completed_games(writer, since: float = 0.0, batch_size: int = 100,
+                           turn_batch: int = 50, rows_per_chunk: int = 500_000) -> Dict[str, Any]:
+    """
+    Stream every game completed at or after `since` to the writer
+
+    Pages through the completed index by score, so games completing while
+    the export runs are picked up and none are visited twice. A run that
+    starts at or before the export watermark advances it to the last game
+    exported, letting the sweeper delete those games (EXPORT_COMPLETED_GAMES).
+
+    Returns:
+        Export stats, including `next_since` for a later incremental run
+    """
+    contiguous = since <= redis_client.get_export_watermark()
+    buffers = {table: ColumnBuffer(columns) for table, columns in TABLES.items()}
+    rows = {table: 0 for table in TABLES}
+    games = 0
+    # game_ids already exported at the current boundary score
+    boundary = set()
+    page_size = batch_size
+
+    def flush(table: str):
+        if buffers[table].rows:
+            rows[table] += buffers[table].rows
+            writer.write(table, buffers[table].take())
+
+    while True:
+        page = redis_client.get_completed_games_since(since, page_size)
+        fresh = [(game_id, score) for game_id, score in page if game_id not in boundary]
+
+        if not fresh:
+            if len(page) < page_size:
+                break
+            # A whole page shares one score; widen it to get past the tie
+            page_size *= 2
+            continue
+        page_size = batch_size
+
+        for game_id, score in fresh:
+            if score != since:
+                since, boundary = score, set()
+            boundary.add(game_id)
+
+            if export_game(buffers, game_id, score, turn_batch):
+                games += 1
+
+            for table, buffer in buffers.items():
+                if buffer.rows >= rows_per_chunk:
+                    flush(table)
+
+    for table in TABLES:
+        flush(table)
+    writer.close()
+
+    # Only once everything is written: games past the watermark may be deleted
+    if contiguous:
+        redis_client.advance_export_watermark(since)
+
+    return {"games": games, "rows": rows, "next_since": since}
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("out_dir", help="Output directory")
+    parser.add_argument("--format", choices=sorted(WRITERS), default="npz")
+    parser.add_argument("--since", type=float, default=None,
+                        help="Only games completed at or after this epoch timestamp (default: where the last export stopped)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Games fetched from the index per page")
+    parser.add_argument("--turn-batch", type=int, default=50, help="Turns fetched per pipelined round trip")
+    parser.add_argument("--rows-per-chunk", type=int, default=500_000, help="Rows buffered per table before a flush")
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    writer = WRITERS[args.format](args.out_dir)
+
+    since = redis_client.get_export_watermark() if args.since is None else args.since
+
+    start = time.perf_counter()
+    stats = export_completed_games(writer, since, args.batch_size, args.turn_batch, args.rows_per_chunk)
+    elapsed = time.perf_counter() - start
+
+    print(f"Exported {stats['games']} games in {elapsed:.2f}s: " +
+          ", ".join(f"{count} {table} rows" for table, count in stats["rows"].items()))
+    print(f"Resume with --since {stats['next_since']} (games completed at exactly that time are repeated)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,12 @@
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from redis_client import redis_client
+from terrain import generate_terrain_map
+from models import ACTION_MOVE, ACTION_ATTACK, ACTION_DEFEND, compact_move
+from visibility import hex_distance
+
+
+# Number of units each player starts with
+UNITS_PER_PLAYER = 3
 
 
 def calculate_turn_results(moves: Dict[str, Any], game_id: str) -> Dict[str, Any]:
@@ -9,11 +16,12 @@ def calculate_turn_results(moves: Dict[str, Any], game_id: str) -> Dict[str, Any
     MVP STUB IMPLEMENTATION:
     - Accepts moves from all players
     - Returns simple delta updates (units moved to target positions)
-    - No combat resolution or complex game logic
-    - Provides structure for future implementation
+    - Attacks are only logged here; resolve_combat applies them once
+      the moves are on the unit table
 
     Args:
-        moves: Dictionary mapping player_id to their move data
+        moves: Dictionary mapping player_id to their move data, whose "moves"
+            are compact [action code, unit_id, target] rows
         game_id: Game identifier
 
     Returns:
@@ -27,14 +35,25 @@ def calculate_turn_results(moves: Dict[str, Any], game_id: str) -> Dict[str, Any
         if not isinstance(player_moves, dict):
             continue
 
+        if player_moves.get("passed"):
+            # Player missed the turn deadline
+            events.append({
+                "type": "turn_passed",
+                "player_id": player_id,
+                "message": f"Player {player_id} did not submit moves in time"
+            })
+
         move_list = player_moves.get("moves", [])
 
+        # Moves are stored pre-validated as [action code, unit_id, target]
         for move in move_list:
-            unit_id = move.get("unit_id")
-            action = move.get("action")
-            target = move.get("target")
+            if isinstance(move, dict):
+                # Stored before the compact format existed
+                move = compact_move(move["unit_id"], move["action"], move.get("target"))
 
-            if action == "move":
+            action, unit_id, target = move
+
+            if action == ACTION_MOVE:
                 # Simple move update - unit moved to target position
                 updates.append({
                     "type": "unit_moved",
@@ -50,17 +69,17 @@ def calculate_turn_results(moves: Dict[str, Any], game_id: str) -> Dict[str, Any
                     "message": f"Unit {unit_id} moved"
                 })
 
-            elif action == "attack":
-                # Stub attack - just log the attempt
+            elif action == ACTION_ATTACK:
+                # Damage is dealt by resolve_combat
                 events.append({
                     "type": "attack_attempted",
                     "player_id": player_id,
                     "unit_id": unit_id,
                     "target": target,
-                    "message": f"Unit {unit_id} attacked (stub - no damage calculated)"
+                    "message": f"Unit {unit_id} attacked {target}"
                 })
 
-            elif action == "defend":
+            elif action == ACTION_DEFEND:
                 # Stub defend action
                 updates.append({
                     "type": "unit_status_changed",
@@ -82,36 +101,115 @@ def calculate_turn_results(moves: Dict[str, Any], game_id: str) -> Dict[str, Any
     }
 
 
-def check_win_condition(game_id: str) -> bool:
+def resolve_combat(unit_table, events: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Resolve a turn's attack_attempted events on a writable unit table
+
+    Attacks resolve in order, at the positions after this turn's moves. An
+    attack lands when attacker and target are alive, belong to different
+    players, and the target is within the attacker's movement_range; it
+    deals attack - defense damage (at least 1), written to the table's
+    health column.
+
+    Args:
+        unit_table: The game's units.UnitTable, loaded writable
+        events: Events from calculate_turn_results
+
+    Returns:
+        Dictionary with 'updates' (unit_damaged, with the unit's health
+        left) and 'events' (attack_hit, unit_destroyed) to append to the
+        turn's results
+    """
+    updates = []
+    combat_events = []
+
+    attacks = [
+        event for event in events
+        if event.get("type") == "attack_attempted" and isinstance(event.get("target"), str)
+    ]
+    if not attacks:
+        return {"updates": updates, "events": combat_events}
+
+    columns = unit_table.columns
+    attackers = unit_table.rows_of([event["player_id"] for event in attacks],
+                                   [event["unit_id"] for event in attacks])
+    # A unit's owner is the player_id part of its unit_id
+    targets = unit_table.rows_of([event["target"].rpartition("_unit_")[0] for event in attacks],
+                                 [event["target"] for event in attacks])
+
+    for event, attacker, target in zip(attacks, attackers, targets):
+        if attacker < 0 or target < 0 or columns["health"][attacker] <= 0 or columns["health"][target] <= 0:
+            continue
+        if columns["owner"][attacker] == columns["owner"][target]:
+            continue
+        distance = hex_distance(int(columns["q"][target]) - int(columns["q"][attacker]),
+                                int(columns["r"][target]) - int(columns["r"][attacker]))
+        if distance > columns["movement"][attacker]:
+            continue
+
+        health = int(columns["health"][target])
+        damage = min(max(int(columns["attack"][attacker]) - int(columns["defense"][target]), 1), health)
+        columns["health"][target] = health - damage
+
+        target_player = event["target"].rpartition("_unit_")[0]
+        updates.append({
+            "type": "unit_damaged",
+            "player_id": target_player,
+            "unit_id": event["target"],
+            "health": health - damage
+        })
+        combat_events.append({
+            "type": "attack_hit",
+            "player_id": event["player_id"],
+            "unit_id": event["unit_id"],
+            "target": event["target"],
+            "damage": damage,
+            "message": f"Unit {event['unit_id']} hit {event['target']} for {damage}"
+        })
+        if health == damage:
+            combat_events.append({
+                "type": "unit_destroyed",
+                "player_id": target_player,
+                "unit_id": event["target"],
+                "destroyed_by": event["player_id"],
+                "message": f"Unit {event['target']} was destroyed"
+            })
+
+    return {"updates": updates, "events": combat_events}
+
+
+def players_standing(unit_table) -> List[str]:
+    """Players of a unit table with at least one unit alive"""
+    alive = set(unit_table.columns["owner"][unit_table.columns["health"] > 0].tolist())
+    return [player_id for slot, player_id in enumerate(unit_table.owners, start=1) if player_id and slot in alive]
+
+
+def check_win_condition(game_id: str, unit_table=None) -> bool:
     """
     Check if game has reached a win condition
 
-    MVP STUB IMPLEMENTATION:
-    - Always returns False (games never end in MVP)
-    - Future: Implement actual win conditions (eliminate all enemies, capture objective, etc.)
+    A game is won once at most one player has units left. Games without a
+    unit table (started before unit tables existed) never end.
 
     Args:
         game_id: Game identifier
+        unit_table: The game's units.UnitTable after this turn, if any
 
     Returns:
         True if game is complete, False otherwise
     """
-    # TODO: Implement actual win condition logic
-    # Examples:
-    # - Check if only one player has units remaining
-    # - Check if a player has captured all objectives
-    # - Check if turn limit reached
-    return False
+    if unit_table is None:
+        return False
+    # TODO: Further win conditions (objectives, turn limit)
+    return len(players_standing(unit_table)) <= 1
 
 
 def generate_default_map(width: int, height: int, terrain_data: Dict[str, Any] = None) -> Dict[str, Any]:
     """
     Generate a basic hex map structure for testing
 
-    MVP STUB IMPLEMENTATION:
-    - Creates simple hex grid with basic terrain
-    - All hexes are passable by default
-    - Future: Add terrain types, obstacles, resources, spawn points
+    - Without terrain_data: simple hex grid with a fixed water/forest pattern
+    - With terrain_data: seeded procedural terrain (see terrain.generate_terrain_map)
 
     Args:
         width: Map width in hexes
@@ -121,6 +219,9 @@ def generate_default_map(width: int, height: int, terrain_data: Dict[str, Any] =
     Returns:
         Map data structure
     """
+    if terrain_data:
+        return generate_terrain_map(width, height, terrain_data)
+
     hexes = []
 
     # Generate hex grid using axial coordinates (q, r)
@@ -134,15 +235,13 @@ def generate_default_map(width: int, height: int, terrain_data: Dict[str, Any] =
                 "occupied_by": None
             }
 
-            # Add some variety if terrain_data not provided
-            if not terrain_data:
-                # Make some hexes water (impassable) for variety
-                if (q + r) % 7 == 0:
-                    hex_data["terrain"] = "water"
-                    hex_data["passable"] = False
-                # Make some hexes forest
-                elif (q * r) % 5 == 0:
-                    hex_data["terrain"] = "forest"
+            # Make some hexes water (impassable) for variety
+            if (q + r) % 7 == 0:
+                hex_data["terrain"] = "water"
+                hex_data["passable"] = False
+            # Make some hexes forest
+            elif (q * r) % 5 == 0:
+                hex_data["terrain"] = "forest"
 
             hexes.append(hex_data)
 
@@ -159,6 +258,19 @@ def generate_default_map(width: int, height: int, terrain_data: Dict[str, Any] =
     }
 
 
+def spawn_point_for_slot(spawn_points: List[Dict[str, Any]], slot: int) -> Optional[Dict[str, Any]]:
+    """
+    Spawn point of a player slot: the point marked with its player_slot, or,
+    on maps with fewer spawn points than players, the points reused in turn
+
+    Returns None if the map has no spawn points.
+    """
+    for point in spawn_points:
+        if point.get("player_slot") == slot:
+            return point
+    return spawn_points[(slot - 1) % len(spawn_points)] if spawn_points else None
+
+
 def initialize_player_units(player_id: str, spawn_point: Dict[str, int]) -> List[Dict[str, Any]]:
     """
     Initialize starting units for a player
@@ -176,7 +288,7 @@ def initialize_player_units(player_id: str, spawn_point: Dict[str, int]) -> List
     """
     units = []
 
-    for i in range(3):
+    for i in range(UNITS_PER_PLAYER):
         unit = {
             "unit_id": f"{player_id}_unit_{i}",
             "player_id": player_id,
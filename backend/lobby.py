@@ -0,0 +1,248 @@
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+
+from models import MapConfig, CreateGameResponse, JoinGameResponse
+from redis_client import redis_client
+from auth import generate_api_key, generate_player_id, store_player_key
+from bots import generate_bot_id
+from game_logic import generate_default_map, spawn_point_for_slot
+from turns import open_turn
+from units import UnitTable
+from config import Config
+
+
+def generate_game_id() -> str:
+    """Generate a unique game ID"""
+    return f"game_{uuid.uuid4().hex[:12]}"
+
+
+# HTTP errors for RedisClient.add_player_to_game failures
+JOIN_ERRORS = {
+    "not_found": (status.HTTP_404_NOT_FOUND, "Game not found"),
+    "not_accepting": (status.HTTP_409_CONFLICT, "Game is not accepting new players"),
+    "already_joined": (status.HTTP_409_CONFLICT, "Player already in this game"),
+    "full": (status.HTTP_409_CONFLICT, "Game is full")
+}
+
+
+def _player_identity(player: Optional[Tuple[str, str]]) -> Tuple[str, str]:
+    """
+    (player_id, api_key) for a player entering a game
+
+    Reuses an existing session when `player` is given, so one API key can
+    play many games at once; otherwise generates a new player.
+    """
+    if player:
+        return player
+    return generate_player_id(), generate_api_key()
+
+
+def _enter_game(game_id: str, player_id: str, api_key: str, existing: bool):
+    """Point the player's session (created for new players) at the game and index it in their games"""
+    if existing:
+        redis_client.set_session_game(api_key, game_id)
+    else:
+        store_player_key(player_id, api_key, game_id)
+
+    redis_client.add_player_game(player_id, game_id)
+
+
+def _add_player(game_id: str, player_id: str, strategy: str = None) -> Dict[str, Any]:
+    """
+    Atomically add a player (or a bot playing `strategy`) to a waiting game
+
+    Starts the game if this player filled it. Returns the join result
+    (slot, player_count, max_players, state).
+
+    Raises:
+        HTTPException: see JOIN_ERRORS
+    """
+    if strategy:
+        error, joined = redis_client.add_bot_to_game(game_id, player_id, strategy)
+    else:
+        error, joined = redis_client.add_player_to_game(game_id, player_id)
+
+    if error:
+        status_code, detail = JOIN_ERRORS[error]
+        raise HTTPException(status_code=status_code, detail=detail)
+
+    if joined["state"] == "in_progress":
+        start_game(game_id, redis_client.get_game_meta(game_id, fresh=True))
+
+    return joined
+
+
+def _generate_map(map_config: MapConfig) -> Dict[str, Any]:
+    """Generate the map described by a MapConfig"""
+    return generate_default_map(
+        width=map_config.width,
+        height=map_config.height,
+        terrain_data=map_config.terrain_data.model_dump() if map_config.terrain_data else None
+    )
+
+
+def create_game(max_players: int, map_config: MapConfig,
+                player: Optional[Tuple[str, str]] = None) -> CreateGameResponse:
+    """
+    Create a new game instance
+
+    - Generates unique game_id, and a creator player_id unless `player`
+      (player_id, api_key) of an existing session is given
+    - Initializes game metadata in Redis
+    - Returns API key for authentication
+    """
+    game_id = generate_game_id()
+
+    # Generate game map
+    map_data = _generate_map(map_config)
+
+    creator_id, api_key = _player_identity(player)
+
+    # Store the game with its creator in slot 1 in one go (see
+    # RedisClient.create_games), so it is never seen without its creator.
+    # The creator is the game's tenant for fair turn scheduling.
+    game_meta = {
+        "state": "waiting_for_players",
+        "current_turn": 0,
+        "max_players": max_players,
+        "created_at": datetime.utcnow().isoformat()
+    }
+    redis_client.create_games([(game_id, creator_id, None if player else api_key)], game_meta, map_data)
+    if player:
+        redis_client.set_session_game(api_key, game_id)
+
+    return CreateGameResponse(
+        game_id=game_id,
+        creator_player_id=creator_id,
+        api_key=api_key,
+        state="waiting_for_players",
+        max_players=max_players,
+        spawn_slot=1
+    )
+
+
+def create_games(count: int, max_players: int, map_config: MapConfig,
+                 player: Optional[Tuple[str, str]] = None) -> List[CreateGameResponse]:
+    """
+    Create many games at once (tournaments, benchmarks)
+
+    - Generates the map once; every game shares it (one terrain seed)
+    - Creates a new creator player per game, unless `player` (player_id,
+      api_key) of an existing session is given to create all of them
+    - Stores games in pipelined batches (see RedisClient.create_games)
+    - Returns every game's credentials
+    """
+    map_data = _generate_map(map_config)
+    game_meta = {
+        "state": "waiting_for_players",
+        "current_turn": 0,
+        "max_players": max_players,
+        "created_at": datetime.utcnow().isoformat()
+    }
+
+    games = []
+    for _ in range(count):
+        if player:
+            games.append((generate_game_id(), player[0], None))
+        else:
+            games.append((generate_game_id(), generate_player_id(), generate_api_key()))
+
+    redis_client.create_games(games, game_meta, map_data)
+
+    if player:
+        redis_client.set_session_game(player[1], games[-1][0])
+
+    return [
+        CreateGameResponse(
+            game_id=game_id,
+            creator_player_id=player_id,
+            api_key=api_key or player[1],
+            state="waiting_for_players",
+            max_players=max_players,
+            spawn_slot=1
+        )
+        for game_id, player_id, api_key in games
+    ]
+
+
+def join_game(game_id: str, player: Optional[Tuple[str, str]] = None) -> JoinGameResponse:
+    """
+    Join an existing game
+
+    - Generates player_id and API key, unless `player` (player_id, api_key)
+      of an existing session is given
+    - Adds the player atomically (see RedisClient.add_player_to_game):
+      checks the game is waiting and not full, assigns a spawn slot and
+      starts the game when it becomes full
+    - Returns the assigned spawn slot and point, and full map data, or only
+      the map header for chunked maps (hexes are then fetched per chunk)
+
+    Raises:
+        HTTPException: 404 if the game does not exist, 409 if it is not
+            accepting players, is full or the player is already in it
+    """
+    player_id, api_key = _player_identity(player)
+    joined = _add_player(game_id, player_id)
+    _enter_game(game_id, player_id, api_key, existing=player is not None)
+
+    # Get map data (the header alone for chunked maps, so join cost does not grow with the map)
+    map_data = redis_client.get_game_map(game_id, with_hexes=False)
+    # The point the slot's units are placed at (see UnitTable.spawn)
+    spawn_point = spawn_point_for_slot(map_data.get("spawn_points", []), joined["slot"]) if map_data else None
+
+    return JoinGameResponse(
+        game_id=game_id,
+        player_id=player_id,
+        api_key=api_key,
+        map=map_data,
+        spawn_slot=joined["slot"],
+        spawn_point=spawn_point,
+        current_players=joined["player_count"],
+        max_players=joined["max_players"],
+        state=joined["state"]
+    )
+
+
+def add_bots(game_id: str, count: int, strategy: str) -> Tuple[List[str], Dict[str, Any]]:
+    """
+    Fill open slots with `count` server-hosted bots playing `strategy`
+
+    Bots join one at a time, atomically, like players; stops at the first
+    bot that cannot join (the game filled up concurrently).
+
+    Returns:
+        Tuple of (bot player_ids, join result of the last bot)
+
+    Raises:
+        HTTPException: see JOIN_ERRORS, if not even the first bot could join
+    """
+    bot_player_ids = []
+    joined = {}
+    for _ in range(count):
+        bot_id = generate_bot_id()
+        try:
+            joined = _add_player(game_id, bot_id, strategy)
+        except HTTPException:
+            if not bot_player_ids:
+                raise
+            break
+        bot_player_ids.append(bot_id)
+
+    return bot_player_ids, joined
+
+
+def start_game(game_id: str, game_meta: dict):
+    """
+    Move a full game to in_progress, place every player's starting units at
+    their spawn slot and open its first turn (updates game_meta in place)
+    """
+    redis_client.update_game_state(game_id, "in_progress")
+    game_meta["state"] = "in_progress"
+
+    map_data = redis_client.get_game_map(game_id, with_hexes=False)
+    units = UnitTable.spawn(redis_client.get_game_slots(game_id), map_data["spawn_points"])
+    redis_client.store_units(game_id, units.to_bytes())
+
+    open_turn(game_id, game_meta["current_turn"])
@@ -1,21 +1,37 @@
-from fastapi import FastAPI, BackgroundTasks, Depends, HTTPException, status
+from fastapi import FastAPI, Depends, Header, HTTPException, Query, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
-import uuid
+import hashlib
 import json
-from datetime import datetime
+from typing import Optional, Tuple
 import asyncio
 
 from models import (
-    CreateGameRequest, CreateGameResponse,
+    CreateGameRequest, CreateGameResponse, CreateGamesRequest, CreateGamesResponse,
     JoinGameRequest, JoinGameResponse,
+    AddBotsRequest, AddBotsResponse,
     GameStatusResponse,
     SubmitMoveRequest, SubmitMoveResponse,
-    TurnResultsResponse
+    TurnResultsResponse,
+    GameSummary, GameListResponse,
+    SpectatorResponse,
+    AwaitingGame, AwaitingGamesResponse,
+    BatchStatusRequest, BatchStatusItem, BatchStatusResponse,
+    BatchSubmitRequest, BatchSubmitItem, BatchSubmitResponse,
+    TurnTimingsResponse, SchedulerMetricsResponse,
+    GameContext, GameMeta
 )
-from redis_client import redis_client
-from auth import get_current_player, generate_api_key, generate_player_id, store_player_key
-from game_logic import calculate_turn_results, check_win_condition, generate_default_map
+from redis_client import redis_client, GAME_STATES
+from auth import get_current_player, get_existing_player, get_game_context
+from turns import claim_if_complete, record_moves, record_moves_batch, schedule_processing, turn_scheduler
+import lobby
+from bots import STRATEGIES
+from spectator import spectator_cache
+from sweeper import game_sweeper
+from rate_limit import rate_limit, admission_control
+from deadlines import turn_deadline_scheduler
 from config import Config
+import codec
+import metrics
 
 # Initialize FastAPI application
 app = FastAPI(
@@ -34,6 +50,36 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def game_meta_scope(request: Request, call_next):
+    """Cache game meta reads for the duration of each request"""
+    with redis_client.meta_cache.request_scope():
+        return await call_next(request)
+
+
+# Global concurrency cap (sheds load with 503 instead of queueing without bound)
+app.middleware("http")(admission_control)
+
+
+# Long-running background loops started with the application
+background_loops = []
+
+
+@app.on_event("startup")
+async def start_background_loops():
+    """Start background maintenance loops"""
+    background_loops.append(asyncio.create_task(game_sweeper.run()))
+    background_loops.append(asyncio.create_task(turn_deadline_scheduler.run()))
+    background_loops.append(asyncio.create_task(turn_scheduler.run()))
+
+
+@app.on_event("shutdown")
+async def stop_background_loops():
+    """Cancel background maintenance loops"""
+    for task in background_loops:
+        task.cancel()
+
+
 # ==================== Health Check ====================
 
 @app.get("/health")
@@ -48,77 +94,211 @@ async def health_check():
     }
 
 
+@app.get("/metrics/turns", response_model=TurnTimingsResponse, dependencies=[Depends(rate_limit("default"))])
+async def turn_metrics(game_id: Optional[str] = None):
+    """
+    Rolling turn processing timings - no authentication required
+
+    - Per-stage count, mean, p50, p95 and max over the last
+      TURN_TIMINGS_GLOBAL_KEEP turns of all games, or the last
+      TURN_TIMINGS_KEEP turns of `game_id`
+    - Includes the slowest turns in the window
+    """
+    if game_id:
+        samples = redis_client.get_game_turn_timings(game_id)
+    else:
+        samples = redis_client.get_recent_turn_timings()
+
+    return TurnTimingsResponse(game_id=game_id, **metrics.summarize(samples))
+
+
+@app.get("/metrics/scheduler", response_model=SchedulerMetricsResponse, dependencies=[Depends(rate_limit("default"))])
+async def scheduler_metrics():
+    """
+    Turn scheduler queue depth for this worker - no authentication required
+
+    - Queued and running turns, overall and by tenant count
+    - How long the oldest queued turn has waited, and the longest wait seen
+    """
+    return SchedulerMetricsResponse(**turn_scheduler.stats())
+
+
 # ==================== Game Creation ====================
 
-@app.post("/game/create", response_model=CreateGameResponse)
-async def create_game(request: CreateGameRequest):
+@app.post("/game/create", response_model=CreateGameResponse, dependencies=[Depends(rate_limit("default"))])
+async def create_game(
+    request: CreateGameRequest,
+    player: Optional[Tuple[str, str]] = Depends(get_existing_player)
+):
     """
     Create a new game instance
 
     - Generates unique game_id and creator player_id
+    - Send X-API-Key to create the game as an existing player instead
     - Initializes game metadata in Redis
     - Returns API key for authentication
     """
-    # Generate IDs
-    game_id = f"game_{uuid.uuid4().hex[:12]}"
-    creator_id = generate_player_id()
-    api_key = generate_api_key()
+    # Map generation is CPU-bound (up to MAP_MAX_SIZE squared hexes); keep it off the event loop
+    return await asyncio.to_thread(lobby.create_game, request.max_players, request.map_config, player)
 
-    # Store API key for creator
-    store_player_key(creator_id, api_key)
 
-    # Generate game map
-    map_data = generate_default_map(
-        width=request.map_config.width,
-        height=request.map_config.height,
-        terrain_data=request.map_config.terrain_data
+@app.post("/games/bulk", response_model=CreateGamesResponse, dependencies=[Depends(rate_limit("bulk"))])
+async def create_games(
+    request: CreateGamesRequest,
+    player: Optional[Tuple[str, str]] = Depends(get_existing_player)
+):
+    """
+    Create up to BULK_CREATE_MAX_GAMES games in one request
+
+    - All games share one generated map; count x width x height may be at
+      most BULK_CREATE_MAX_HEXES
+    - A new creator player per game, or send X-API-Key to create them all
+      as an existing player
+    - Stored in pipelined batches; returns every game's credentials
+    """
+    return CreateGamesResponse(
+        games=await asyncio.to_thread(lobby.create_games, request.count, request.max_players, request.map_config, player)
     )
 
-    # Initialize game metadata
-    game_meta = {
-        "state": "waiting_for_players",
-        "current_turn": 0,
-        "player_count": 1,
-        "max_players": request.max_players,
-        "created_at": datetime.utcnow().isoformat()
-    }
 
-    # Store in Redis
-    redis_client.set_game_meta(game_id, game_meta, ttl=Config.TTL_ACTIVE_GAME)
-    redis_client.store_game_map(game_id, map_data)
-    redis_client.add_player_to_game(game_id, creator_id)
-    redis_client.set_player_current_game(creator_id, game_id)
+# ==================== List Games ====================
 
-    return CreateGameResponse(
-        game_id=game_id,
-        creator_player_id=creator_id,
-        api_key=api_key,
-        state="waiting_for_players",
-        max_players=request.max_players
+@app.get("/games", response_model=GameListResponse, dependencies=[Depends(rate_limit("default"))])
+async def list_games(
+    state: str = "waiting_for_players",
+    offset: int = Query(default=0, ge=0),
+    limit: int = Query(default=Config.GAME_LIST_DEFAULT_LIMIT, ge=1, le=Config.GAME_LIST_MAX_LIMIT)
+):
+    """
+    List games in a given state, oldest first
+
+    - No authentication required
+    - Served from a per-state index, so cost depends only on page size
+    - Use `next_offset` to fetch the following page
+    """
+    if state not in GAME_STATES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown game state '{state}'. Expected one of: {', '.join(GAME_STATES)}"
+        )
+
+    games, total = redis_client.list_games_by_state(state, offset=offset, limit=limit)
+    next_offset = offset + limit if offset + limit < total else None
+
+    return GameListResponse(
+        state=state,
+        games=[GameSummary(**game) for game in games],
+        total=total,
+        offset=offset,
+        limit=limit,
+        next_offset=next_offset
     )
 
 
 # ==================== Join Game ====================
 
-@app.post("/game/{game_id}/join", response_model=JoinGameResponse)
-async def join_game(game_id: str, request: JoinGameRequest):
+@app.post("/game/{game_id}/join", response_model=JoinGameResponse, dependencies=[Depends(rate_limit("default"))])
+async def join_game(
+    game_id: str,
+    request: JoinGameRequest,
+    player: Optional[Tuple[str, str]] = Depends(get_existing_player)
+):
     """
     Join an existing game
 
     - Verifies game exists and is accepting players
     - Generates player_id and API key
+    - Send X-API-Key to join as an existing player (one key, many games)
     - Adds player to game
-    - Returns full map data
+    - Returns full map data, or the map header for large maps (`chunked`
+      true): fetch their hexes with /game/{game_id}/map/chunk
     """
-    # Check if game exists
-    if not redis_client.game_exists(game_id):
+    return lobby.join_game(game_id, player)
+
+
+# ==================== Map Chunks ====================
+
+@app.get("/game/{game_id}/map/chunk", dependencies=[Depends(rate_limit("default"))])
+async def get_map_chunk(
+    game_id: str,
+    cq: int = Query(ge=0, description="Chunk column (q // chunk_size)"),
+    cr: int = Query(ge=0, description="Chunk row (r // chunk_size)"),
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Get the hexes of one map chunk
+
+    - No authentication required (maps are public, as in /spectate)
+    - Returns {"cq", "cr", "hexes"}; the map header gives chunk_size and
+      the chunk grid size (chunks_q, chunks_r)
+    - Maps never change, so chunks carry an ETag and may be cached for
+      good; send If-None-Match with the ETag to get 304
+    """
+    data = redis_client.get_map_chunk(game_id, cq, cr)
+    if data is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found"
+            detail="Map chunk not found"
+        )
+
+    etag = f'"{hashlib.md5(data).hexdigest()[:16]}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=86400, immutable"}
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(
+        content=json.dumps(codec.decode(data), separators=(",", ":")),
+        media_type="application/json",
+        headers=headers
+    )
+
+
+# ==================== Player Games ====================
+
+@app.get("/player/games/awaiting", response_model=AwaitingGamesResponse, dependencies=[Depends(rate_limit("status"))])
+async def get_games_awaiting_move(
+    limit: int = Query(default=Config.AWAITING_GAMES_MAX_LIMIT, ge=1, le=Config.AWAITING_GAMES_MAX_LIMIT),
+    player_id: str = Depends(get_current_player)
+):
+    """
+    List the player's games where a move is due, most urgent first
+
+    - Requires authentication
+    - One call instead of polling /status for every game
+    - Served from the player's games index, updated as turns open and moves land
+    """
+    games = redis_client.get_games_awaiting_move(player_id, limit=limit)
+
+    return AwaitingGamesResponse(
+        player_id=player_id,
+        games=[AwaitingGame(**game) for game in games]
+    )
+
+
+# ==================== Add Bots ====================
+
+@app.post("/game/{game_id}/bots", response_model=AddBotsResponse, dependencies=[Depends(rate_limit("default"))])
+async def add_bots(
+    game_id: str,
+    request: AddBotsRequest,
+    ctx: GameContext = Depends(get_game_context)
+):
+    """
+    Fill open slots with server-hosted bots
+
+    - Requires authentication as a player in the game
+    - Bots join atomically like players; if the game fills up concurrently,
+      only the bots that got a slot are added
+    - Bots compute their moves on the server every turn
+    - Starts the game if it becomes full
+    """
+    if request.strategy not in STRATEGIES:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Unknown bot strategy '{request.strategy}'. Expected one of: {', '.join(STRATEGIES)}"
         )
 
-    # Get game metadata
-    game_meta = redis_client.get_game_meta(game_id)
+    game_meta = ctx.meta.model_dump()
 
     # Check if game is accepting players
     if game_meta["state"] != "waiting_for_players":
@@ -127,50 +307,30 @@ async def join_game(game_id: str, request: JoinGameRequest):
             detail="Game is not accepting new players"
         )
 
-    # Check if game is full
-    if game_meta["player_count"] >= game_meta["max_players"]:
+    # Check there is room for all requested bots
+    if game_meta["player_count"] + request.count > game_meta["max_players"]:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail="Game is full"
+            detail=f"Not enough open slots (open: {game_meta['max_players'] - game_meta['player_count']})"
         )
 
-    # Generate player credentials
-    player_id = generate_player_id()
-    api_key = generate_api_key()
-    store_player_key(player_id, api_key)
-
-    # Add player to game
-    redis_client.add_player_to_game(game_id, player_id)
-    redis_client.set_player_current_game(player_id, game_id)
-
-    # Get updated player count
-    updated_meta = redis_client.get_game_meta(game_id)
-
-    # If game is now full, start the game
-    if updated_meta["player_count"] >= updated_meta["max_players"]:
-        redis_client.update_game_state(game_id, "in_progress")
-        updated_meta["state"] = "in_progress"
-
-    # Get map data
-    map_data = redis_client.get_game_map(game_id)
+    bot_player_ids, joined = lobby.add_bots(game_id, request.count, request.strategy)
 
-    return JoinGameResponse(
+    return AddBotsResponse(
         game_id=game_id,
-        player_id=player_id,
-        api_key=api_key,
-        map=map_data,
-        current_players=updated_meta["player_count"],
-        max_players=updated_meta["max_players"],
-        state=updated_meta["state"]
+        bot_player_ids=bot_player_ids,
+        current_players=joined["player_count"],
+        max_players=joined["max_players"],
+        state=joined["state"]
     )
 
 
 # ==================== Game Status ====================
 
-@app.get("/game/{game_id}/status", response_model=GameStatusResponse)
+@app.get("/game/{game_id}/status", response_model=GameStatusResponse, dependencies=[Depends(rate_limit("status"))])
 async def get_game_status(
     game_id: str,
-    player_id: str = Depends(get_current_player)
+    ctx: GameContext = Depends(get_game_context)
 ):
     """
     Get current game status
@@ -178,31 +338,16 @@ async def get_game_status(
     - Requires authentication
     - Returns game state and move submission status
     """
-    # Check if game exists
-    if not redis_client.game_exists(game_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found"
-        )
-
-    # Verify player is in this game
-    if not redis_client.is_player_in_game(game_id, player_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Player not in this game"
-        )
-
-    # Get game metadata
-    game_meta = redis_client.get_game_meta(game_id)
+    game_meta = ctx.meta
 
     # Count moves submitted for current turn
-    current_turn = game_meta["current_turn"]
+    current_turn = game_meta.current_turn
     moves_submitted = redis_client.count_turn_moves(game_id, current_turn)
-    moves_required = game_meta["player_count"]
+    moves_required = game_meta.player_count
 
     return GameStatusResponse(
         game_id=game_id,
-        state=game_meta["state"],
+        state=game_meta.state,
         current_turn=current_turn,
         moves_submitted=moves_submitted,
         moves_required=moves_required,
@@ -212,12 +357,12 @@ async def get_game_status(
 
 # ==================== Submit Move ====================
 
-@app.post("/game/{game_id}/submit", response_model=SubmitMoveResponse)
+@app.post("/game/{game_id}/submit", response_model=SubmitMoveResponse, dependencies=[Depends(rate_limit("submit"))])
 async def submit_move(
     game_id: str,
     request: SubmitMoveRequest,
-    background_tasks: BackgroundTasks,
-    player_id: str = Depends(get_current_player)
+    ctx: GameContext = Depends(get_game_context),
+    idempotency_key: Optional[str] = Header(default=None, max_length=128)
 ):
     """
     Submit moves for current turn
@@ -225,37 +370,72 @@ async def submit_move(
     - Requires authentication
     - Validates turn number
     - Prevents duplicate submissions
+    - Replays the original response for retries with the same Idempotency-Key
     - Auto-triggers turn processing when all moves received
     """
-    # Check if game exists
-    if not redis_client.game_exists(game_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found"
-        )
+    player_id = ctx.player_id
+    game_meta = ctx.meta
+    moves_required = game_meta.player_count
+
+    # A retry of a submission that already landed gets the original response
+    receipt = None
+    if idempotency_key:
+        receipt = redis_client.get_submission_receipt(game_id, request.turn, player_id)
+        if receipt and receipt["idempotency_key"] != idempotency_key:
+            receipt = None
+        if receipt and receipt["response"] is not None:
+            return SubmitMoveResponse(**receipt["response"])
+
+    if receipt:
+        # The moves landed but the original request failed before answering: finish it
+        moves_submitted, processing = claim_if_complete(game_id, request.turn, moves_required)
+    else:
+        moves_submitted, processing = _store_submission(game_id, request, player_id, game_meta, idempotency_key)
 
-    # Verify player is in this game
-    if not redis_client.is_player_in_game(game_id, player_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Player not in this game"
+    redis_client.clear_move_due(player_id, game_id, request.turn)
+
+    # If all moves are in, trigger turn processing
+    if processing:
+        schedule_processing(game_id, request.turn, game_meta.tenant)
+
+    response = SubmitMoveResponse(
+        success=True,
+        turn=request.turn,
+        moves_submitted=moves_submitted,
+        moves_required=moves_required,
+        processing=processing
+    )
+
+    if idempotency_key:
+        redis_client.store_submission_receipt(
+            game_id, request.turn, player_id, idempotency_key, response.model_dump()
         )
 
-    # Get game metadata
-    game_meta = redis_client.get_game_meta(game_id)
+    return response
 
+
+def _store_submission(game_id: str, request: SubmitMoveRequest, player_id: str,
+                      game_meta: GameMeta, idempotency_key: Optional[str]) -> Tuple[int, bool]:
+    """
+    Check a submission against the game and store its moves (see record_moves)
+
+    Raises:
+        HTTPException: 409 if the game is not in progress, the turn is not
+            the current one or the player already submitted for it
+    """
+    # Context meta is read uncached, so these checks see the latest turn
     # Verify game is in progress
-    if game_meta["state"] not in ["in_progress", "processing_turn"]:
+    if game_meta.state not in ["in_progress", "processing_turn"]:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Game is not in progress (current state: {game_meta['state']})"
+            detail=f"Game is not in progress (current state: {game_meta.state})"
         )
 
     # Verify turn number matches
-    if request.turn != game_meta["current_turn"]:
+    if request.turn != game_meta.current_turn:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
-            detail=f"Turn mismatch. Expected {game_meta['current_turn']}, got {request.turn}"
+            detail=f"Turn mismatch. Expected {game_meta.current_turn}, got {request.turn}"
         )
 
     # Check if player already submitted for this turn
@@ -265,45 +445,22 @@ async def submit_move(
             detail="Move already submitted for this turn"
         )
 
-    # Store the move
-    move_data = {
-        "turn": request.turn,
-        "moves": [move.model_dump() for move in request.moves],
-        "submitted_at": datetime.utcnow().isoformat()
-    }
-    redis_client.store_move(game_id, request.turn, player_id, move_data)
-
-    # Count total moves submitted
-    moves_submitted = redis_client.count_turn_moves(game_id, request.turn)
-    moves_required = game_meta["player_count"]
-
-    processing = False
-
-    # If all moves are in, trigger turn processing
-    if moves_submitted >= moves_required:
-        # Update state to processing
-        redis_client.update_game_state(game_id, "processing_turn")
-        processing = True
-
-        # Trigger background task
-        background_tasks.add_task(process_turn, game_id, request.turn)
-
-    return SubmitMoveResponse(
-        success=True,
-        turn=request.turn,
-        moves_submitted=moves_submitted,
-        moves_required=moves_required,
-        processing=processing
+    # Store the move and claim processing if it completed the move set
+    return record_moves(
+        game_id, request.turn, player_id,
+        [move.to_compact() for move in request.moves],
+        game_meta.player_count,
+        idempotency_key
     )
 
 
 # ==================== Get Turn Results ====================
 
-@app.get("/game/{game_id}/results", response_model=TurnResultsResponse)
+@app.get("/game/{game_id}/results", response_model=TurnResultsResponse, dependencies=[Depends(rate_limit("results"))])
 async def get_turn_results(
     game_id: str,
     turn: int,
-    player_id: str = Depends(get_current_player)
+    ctx: GameContext = Depends(get_game_context)
 ):
     """
     Poll for turn processing results
@@ -312,88 +469,188 @@ async def get_turn_results(
     - Returns results if available
     - Returns ready=False if still processing
     """
-    # Check if game exists
-    if not redis_client.game_exists(game_id):
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Game not found"
-        )
-
-    # Verify player is in this game
-    if not redis_client.is_player_in_game(game_id, player_id):
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Player not in this game"
-        )
-
     # Check if results exist for this turn
     results = redis_client.get_turn_results(game_id, turn)
 
     if results:
         # Results are ready
-        game_meta = redis_client.get_game_meta(game_id)
-
         return TurnResultsResponse(
             ready=True,
             turn=turn,
-            state=game_meta["state"],
+            state=ctx.meta.state,
             updates=results.get("updates", []),
             events=results.get("events", []),
-            next_turn=game_meta["current_turn"]
+            next_turn=ctx.meta.current_turn,
+            timings=results.get("timings")
         )
     else:
         # Results not ready yet
-        game_meta = redis_client.get_game_meta(game_id)
-
         return TurnResultsResponse(
             ready=False,
             turn=turn,
-            state=game_meta["state"]
+            state=ctx.meta.state
         )
 
 
-# ==================== Background Task: Process Turn ====================
+# ==================== Batch ====================
+
+def _batch_context_error(meta: Optional[dict], is_member: bool) -> Optional[Tuple[int, str]]:
+    """Per-item equivalent of the errors raised by get_game_context"""
+    if meta is None:
+        return status.HTTP_404_NOT_FOUND, "Game not found"
+    if not is_member:
+        return status.HTTP_403_FORBIDDEN, "Player not in this game"
+    return None
+
+
+@app.post("/batch/status", response_model=BatchStatusResponse, dependencies=[Depends(rate_limit("batch"))])
+async def batch_status(
+    request: BatchStatusRequest,
+    player_id: str = Depends(get_current_player)
+):
+    """
+    Get the status of many games in one request
 
-async def process_turn(game_id: str, turn: int):
+    - Requires authentication; per-game errors are reported per item
+    - Two pipelined round trips whatever the number of games
+    """
+    contexts = redis_client.get_game_contexts(request.game_ids, player_id)
+
+    valid = [
+        (game_id, meta) for game_id, (meta, is_member) in zip(request.game_ids, contexts)
+        if _batch_context_error(meta, is_member) is None
+    ]
+    counts = redis_client.count_turn_moves_many([(game_id, meta["current_turn"]) for game_id, meta in valid])
+    moves_submitted = {game_id: count for (game_id, _meta), count in zip(valid, counts)}
+
+    results = []
+    for game_id, (meta, is_member) in zip(request.game_ids, contexts):
+        error = _batch_context_error(meta, is_member)
+        if error:
+            results.append(BatchStatusItem(game_id=game_id, status_code=error[0], error=error[1]))
+            continue
+
+        submitted = moves_submitted[game_id]
+        results.append(BatchStatusItem(
+            game_id=game_id,
+            status_code=status.HTTP_200_OK,
+            status=GameStatusResponse(
+                game_id=game_id,
+                state=meta["state"],
+                current_turn=meta["current_turn"],
+                moves_submitted=submitted,
+                moves_required=meta["player_count"],
+                all_moves_in=(submitted >= meta["player_count"])
+            )
+        ))
+
+    return BatchStatusResponse(results=results)
+
+
+@app.post("/batch/submit", response_model=BatchSubmitResponse, dependencies=[Depends(rate_limit("batch"))])
+async def batch_submit(
+    request: BatchSubmitRequest,
+    player_id: str = Depends(get_current_player)
+):
     """
-    Background task to process a turn
+    Submit moves for many games in one request
 
-    - Fetches all moves
-    - Calls game logic to calculate results
-    - Stores results in Redis
-    - Increments turn counter
-    - Updates game state
+    - Requires authentication; each submission is validated like /submit
+      and its outcome reported per item
+    - Moves are stored in one pipeline; a repeated submission for a turn
+      gets 409 and leaves the first one in place
+    - Turn processing starts for every game whose move set became complete
     """
-    try:
-        # Small delay to ensure all moves are stored
-        await asyncio.sleep(0.5)
+    submissions = request.submissions
+    contexts = redis_client.get_game_contexts([submission.game_id for submission in submissions], player_id)
+
+    errors = {}
+    accepted = []
+    for submission, (meta, is_member) in zip(submissions, contexts):
+        error = _batch_context_error(meta, is_member)
+        if error is None and meta["state"] not in ["in_progress", "processing_turn"]:
+            error = status.HTTP_409_CONFLICT, f"Game is not in progress (current state: {meta['state']})"
+        if error is None and submission.turn != meta["current_turn"]:
+            error = status.HTTP_409_CONFLICT, f"Turn mismatch. Expected {meta['current_turn']}, got {submission.turn}"
+
+        if error:
+            errors[submission.game_id] = error
+        else:
+            accepted.append((submission, meta))
+
+    recorded = record_moves_batch([
+        (submission.game_id, submission.turn, player_id,
+         [move.to_compact() for move in submission.moves], meta["player_count"])
+        for submission, meta in accepted
+    ]) if accepted else []
+
+    outcomes = {}
+    for (submission, meta), (stored, moves_submitted, processing) in zip(accepted, recorded):
+        if not stored:
+            errors[submission.game_id] = status.HTTP_409_CONFLICT, "Move already submitted for this turn"
+            continue
+
+        if processing:
+            schedule_processing(submission.game_id, submission.turn, meta["tenant"])
+
+        outcomes[submission.game_id] = SubmitMoveResponse(
+            success=True,
+            turn=submission.turn,
+            moves_submitted=moves_submitted,
+            moves_required=meta["player_count"],
+            processing=processing
+        )
 
-        # Fetch all moves for this turn
-        moves = redis_client.get_turn_moves(game_id, turn)
+    results = []
+    for submission in submissions:
+        if submission.game_id in errors:
+            status_code, detail = errors[submission.game_id]
+            results.append(BatchSubmitItem(game_id=submission.game_id, status_code=status_code, error=detail))
+        else:
+            results.append(BatchSubmitItem(
+                game_id=submission.game_id,
+                status_code=status.HTTP_200_OK,
+                result=outcomes[submission.game_id]
+            ))
 
-        # Calculate turn results using game logic
-        results = calculate_turn_results(moves, game_id)
+    return BatchSubmitResponse(results=results)
 
-        # Store results
-        redis_client.store_turn_results(game_id, turn, results)
 
-        # Check win condition
-        game_complete = check_win_condition(game_id)
+# ==================== Spectate ====================
 
-        if game_complete:
-            # Game is complete
-            redis_client.update_game_state(game_id, "complete")
-        else:
-            # Increment turn and continue game
-            redis_client.increment_turn(game_id)
-            redis_client.update_game_state(game_id, "in_progress")
+@app.get("/game/{game_id}/spectate", response_model=SpectatorResponse, dependencies=[Depends(rate_limit("spectate"))])
+async def spectate_game(
+    game_id: str,
+    since_turn: Optional[int] = Query(default=None, ge=0),
+    include_map: bool = False,
+    if_none_match: Optional[str] = Header(default=None)
+):
+    """
+    Read-only game feed for spectators
+
+    - No authentication required
+    - Without `since_turn`: snapshot with the most recent resolved turns
+    - With `since_turn`: only turns >= since_turn (deltas)
+    - Served from a per-worker cache refreshed once per turn, so viewers add
+      no game reads (only their rate limit check); send If-None-Match with
+      the last ETag to get 304
+    """
+    feed = await spectator_cache.get_feed(game_id, include_map=include_map)
+    if feed is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Game not found"
+        )
 
-    except Exception as e:
-        # Log error and update game state
-        print(f"Error processing turn {turn} for game {game_id}: {str(e)}")
+    headers = {"ETag": feed.etag, "Cache-Control": f"public, max-age={int(Config.SPECTATOR_REFRESH_SECONDS)}"}
+    if if_none_match == feed.etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
 
-        # Set game to error state or retry
-        redis_client.update_game_state(game_id, "in_progress")
+    return Response(
+        content=spectator_cache.render(feed, since_turn, include_map),
+        media_type="application/json",
+        headers=headers
+    )
 
 
 # ==================== Root Endpoint ====================
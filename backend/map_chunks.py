@@ -0,0 +1,57 @@
+"""
+Map chunking
+
+Every map is also stored as square chunks of MAP_CHUNK_SIZE x MAP_CHUNK_SIZE
+hexes, so clients can fetch the region around their units
+(GET /game/{game_id}/map/chunk?cq=&cr=) instead of the whole map. Hex (q, r)
+lives in chunk (q // MAP_CHUNK_SIZE, r // MAP_CHUNK_SIZE).
+"""
+from typing import Any, Dict
+
+from config import Config
+
+
+def chunk_field(cq: int, cr: int) -> str:
+    """Field of chunk (cq, cr) in the game's map chunks hash"""
+    return f"{cq}:{cr}"
+
+
+def is_inline(map_data: Dict[str, Any]) -> bool:
+    """Whether the map is small enough to be stored and sent whole (hexes included)"""
+    return map_data["width"] * map_data["height"] <= Config.MAP_INLINE_MAX_HEXES
+
+
+def map_header(map_data: Dict[str, Any], chunk_size: int = None) -> Dict[str, Any]:
+    """
+    Map without its hexes, plus how it is chunked
+
+    Adds chunk_size, chunks_q and chunks_r (chunk grid size) and `chunked`,
+    True when the hexes must be fetched by chunk.
+    """
+    chunk_size = chunk_size or Config.MAP_CHUNK_SIZE
+    header = {key: value for key, value in map_data.items() if key != "hexes"}
+    header.update(
+        chunked=not is_inline(map_data),
+        chunk_size=chunk_size,
+        chunks_q=-(-map_data["width"] // chunk_size),
+        chunks_r=-(-map_data["height"] // chunk_size)
+    )
+    return header
+
+
+def split_map(map_data: Dict[str, Any], chunk_size: int = None) -> Dict[str, Dict[str, Any]]:
+    """
+    Split a map's hexes into chunks
+
+    Returns:
+        Dictionary mapping chunk_field(cq, cr) to {"cq", "cr", "hexes"}
+    """
+    chunk_size = chunk_size or Config.MAP_CHUNK_SIZE
+    chunks = {}
+    for hex_data in map_data["hexes"]:
+        cq, cr = hex_data["q"] // chunk_size, hex_data["r"] // chunk_size
+        field = chunk_field(cq, cr)
+        if field not in chunks:
+            chunks[field] = {"cq": cq, "cr": cr, "hexes": []}
+        chunks[field]["hexes"].append(hex_data)
+    return chunks
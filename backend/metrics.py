@@ -0,0 +1,79 @@
+"""
+Turn processing timings
+
+process_turn times each stage of a turn with a TurnTimer; the timings are
+attached to the turn's results and kept in Redis (see
+RedisClient.record_turn_timings) as a rolling window per game and across
+all games. summarize() turns a window into per-stage aggregates.
+"""
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+# Stages of process_turn, in order
+STAGES = ("queue", "settle", "fetch", "calculate", "store", "win_check")
+
+
+class TurnTimer:
+    """
+    Wall-clock durations of the stages of one turn, in milliseconds
+
+    `claimed_at` (time.time() when the turn was claimed) gives the queue
+    stage: time between the claim and process_turn starting.
+    """
+
+    def __init__(self, claimed_at: Optional[float] = None):
+        self.timings: Dict[str, float] = {}
+        self._started = time.perf_counter()
+        if claimed_at is not None:
+            self.timings["queue"] = round(max(time.time() - claimed_at, 0.0) * 1000, 3)
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time the enclosed block as stage `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[name] = round((time.perf_counter() - start) * 1000, 3)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Stage timings so far plus `total` (queue included)"""
+        total = (time.perf_counter() - self._started) * 1000 + self.timings.get("queue", 0.0)
+        return {**self.timings, "total": round(total, 3)}
+
+
+def summarize(samples: List[Dict[str, Any]], slowest: int = 10) -> Dict[str, Any]:
+    """
+    Aggregate a window of per-turn timings
+
+    Args:
+        samples: Turn timings as stored by process_turn
+        slowest: Number of slowest turns (by total) to return
+
+    Returns:
+        Dictionary with `samples`, per-stage `stages` aggregates
+        (count, mean_ms, p50_ms, p95_ms, max_ms) and the `slowest` turns
+    """
+    stages = {}
+    for name in STAGES + ("total",):
+        values = np.array([sample[name] for sample in samples if name in sample], dtype=np.float64)
+        if not len(values):
+            continue
+        p50, p95 = np.percentile(values, [50, 95])
+        stages[name] = {
+            "count": int(len(values)),
+            "mean_ms": round(float(values.mean()), 3),
+            "p50_ms": round(float(p50), 3),
+            "p95_ms": round(float(p95), 3),
+            "max_ms": round(float(values.max()), 3)
+        }
+
+    return {
+        "samples": len(samples),
+        "stages": stages,
+        "slowest": sorted(samples, key=lambda sample: sample.get("total", 0.0), reverse=True)[:slowest]
+    }
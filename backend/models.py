@@ -1,14 +1,61 @@
-from pydantic import BaseModel, Field
-from typing import List, Dict, Any, Optional
+from enum import Enum
+from pydantic import BaseModel, Field, conint, constr, field_validator, model_validator
+from typing import List, Dict, Any, Optional, Tuple, Union
+from config import Config
+
+
+# ==================== Move Types ====================
+
+class ActionType(str, Enum):
+    """Unit action types"""
+    MOVE = "move"
+    ATTACK = "attack"
+    DEFEND = "defend"
+
+
+# Compact integer codes used when moves are stored
+ACTION_MOVE = 0
+ACTION_ATTACK = 1
+ACTION_DEFEND = 2
+ACTION_CODES = {ActionType.MOVE: ACTION_MOVE, ActionType.ATTACK: ACTION_ATTACK, ActionType.DEFEND: ACTION_DEFEND}
+
+# Axial hex coordinate [q, r]
+AxialCoord = Tuple[conint(ge=0, le=9999), conint(ge=0, le=9999)]
+
+# Reference to a unit by its unit_id
+UnitRef = constr(min_length=1, max_length=64, pattern=r"^[A-Za-z0-9_-]+$")
+
+
+def compact_move(unit_id: str, action: str, target: Any = None) -> list:
+    """
+    Compact stored form of a move: [action code, unit_id, target]
+
+    target is [q, r], a unit_id or None. Only call this with already
+    validated values (MoveAction.to_compact, or trusted server code).
+    """
+    if isinstance(target, tuple):
+        target = list(target)
+    return [ACTION_CODES[ActionType(action)], unit_id, target]
 
 
 # ==================== Request Models ====================
 
+class TerrainConfig(BaseModel):
+    """Configuration for procedural terrain generation"""
+    seed: Optional[int] = Field(default=None, ge=0, description="Noise seed (random if omitted)")
+    water_ratio: Optional[float] = Field(default=None, ge=0, le=0.6, description="Fraction of hexes that are water")
+    forest_ratio: Optional[float] = Field(default=None, ge=0, le=1, description="Fraction of land hexes that are forest")
+    scale: Optional[float] = Field(default=None, ge=1, le=100, description="Noise feature size in hexes")
+    octaves: Optional[int] = Field(default=None, ge=1, le=6, description="Noise layers")
+    spawn_count: Optional[int] = Field(default=None, ge=2, le=8, description="Number of spawn points")
+    spawn_radius: Optional[int] = Field(default=None, ge=0, le=5, description="Open grass radius around spawns")
+
+
 class MapConfig(BaseModel):
     """Configuration for game map"""
-    width: int = Field(ge=5, le=50, description="Map width in hexes")
-    height: int = Field(ge=5, le=50, description="Map height in hexes")
-    terrain_data: Optional[Dict[str, Any]] = Field(default=None, description="Terrain configuration")
+    width: int = Field(ge=5, le=Config.MAP_MAX_SIZE, description="Map width in hexes")
+    height: int = Field(ge=5, le=Config.MAP_MAX_SIZE, description="Map height in hexes")
+    terrain_data: Optional[TerrainConfig] = Field(default=None, description="Terrain configuration")
 
 
 class CreateGameRequest(BaseModel):
@@ -17,22 +64,89 @@ class CreateGameRequest(BaseModel):
     map_config: MapConfig
 
 
+class CreateGamesRequest(CreateGameRequest):
+    """Request to create many games sharing one map"""
+    count: int = Field(ge=1, le=Config.BULK_CREATE_MAX_GAMES, description="Number of games to create")
+
+    @model_validator(mode="after")
+    def check_total_hexes(self) -> "CreateGamesRequest":
+        """Bound the map data stored by one request (every game holds a copy of the map)"""
+        total = self.count * self.map_config.width * self.map_config.height
+        if total > Config.BULK_CREATE_MAX_HEXES:
+            raise ValueError(
+                f"count x map width x height is {total}, over {Config.BULK_CREATE_MAX_HEXES}"
+            )
+        return self
+
+
 class JoinGameRequest(BaseModel):
     """Request to join an existing game"""
     player_name: str = Field(min_length=1, max_length=50, description="Player display name")
 
 
+class AddBotsRequest(BaseModel):
+    """Request to fill game slots with server-hosted bots"""
+    count: int = Field(ge=1, le=7, default=1, description="Number of bots to add")
+    strategy: str = Field(default="random", description="Bot strategy name")
+
+
 class MoveAction(BaseModel):
     """Individual move action for a unit"""
-    unit_id: str = Field(description="Unique identifier for the unit")
-    action: str = Field(description="Action type: move, attack, defend, etc.")
-    target: Any = Field(description="Target coordinate [q, r] or unit_id")
+    unit_id: UnitRef = Field(description="Unique identifier for the unit")
+    action: ActionType = Field(description="Action type: move, attack or defend")
+    target: Optional[Union[AxialCoord, UnitRef]] = Field(default=None, description="Target coordinate [q, r] or unit_id")
+
+    @model_validator(mode="after")
+    def check_target(self) -> "MoveAction":
+        """Validate the target against the action type"""
+        if self.action == ActionType.MOVE and not isinstance(self.target, tuple):
+            raise ValueError("move requires a target coordinate [q, r]")
+        if self.action == ActionType.ATTACK and self.target is None:
+            raise ValueError("attack requires a target coordinate or unit_id")
+        if self.action == ActionType.DEFEND:
+            self.target = None
+        return self
+
+    def to_compact(self) -> list:
+        """Compact stored form (see compact_move)"""
+        return compact_move(self.unit_id, self.action, self.target)
 
 
 class SubmitMoveRequest(BaseModel):
     """Request to submit moves for current turn"""
     turn: int = Field(ge=0, description="Turn number for validation")
-    moves: List[MoveAction] = Field(description="List of move actions")
+    moves: List[MoveAction] = Field(max_length=Config.MAX_MOVES_PER_SUBMISSION, description="List of move actions")
+
+    @field_validator("moves")
+    @classmethod
+    def check_unique_units(cls, moves: List[MoveAction]) -> List[MoveAction]:
+        """Each unit may act at most once per turn"""
+        if len({move.unit_id for move in moves}) != len(moves):
+            raise ValueError("each unit may only have one action per turn")
+        return moves
+
+
+class BatchStatusRequest(BaseModel):
+    """Request for the status of many games"""
+    game_ids: List[str] = Field(min_length=1, max_length=Config.BATCH_MAX_GAMES, description="Games to report on")
+
+
+class BatchSubmission(SubmitMoveRequest):
+    """Moves for one game in a batch submission"""
+    game_id: str
+
+
+class BatchSubmitRequest(BaseModel):
+    """Request to submit moves for many games at once"""
+    submissions: List[BatchSubmission] = Field(min_length=1, max_length=Config.BATCH_MAX_GAMES)
+
+    @field_validator("submissions")
+    @classmethod
+    def check_unique_games(cls, submissions: List[BatchSubmission]) -> List[BatchSubmission]:
+        """One submission per game"""
+        if len({submission.game_id for submission in submissions}) != len(submissions):
+            raise ValueError("each game may only appear once per batch")
+        return submissions
 
 
 # ==================== Response Models ====================
@@ -44,6 +158,12 @@ class CreateGameResponse(BaseModel):
     api_key: str
     state: str
     max_players: int
+    spawn_slot: int
+
+
+class CreateGamesResponse(BaseModel):
+    """Response after creating many games"""
+    games: List[CreateGameResponse]
 
 
 class JoinGameResponse(BaseModel):
@@ -52,6 +172,30 @@ class JoinGameResponse(BaseModel):
     player_id: str
     api_key: str
     map: Dict[str, Any]
+    spawn_slot: int
+    spawn_point: Optional[Dict[str, Any]] = None
+    current_players: int
+    max_players: int
+    state: str
+
+
+class AwaitingGame(BaseModel):
+    """A game where the player owes a move"""
+    game_id: str
+    turn: int
+    deadline: float = Field(description="Epoch seconds when the turn is resolved without the move")
+
+
+class AwaitingGamesResponse(BaseModel):
+    """Games awaiting the player's move, most urgent first"""
+    player_id: str
+    games: List[AwaitingGame]
+
+
+class AddBotsResponse(BaseModel):
+    """Response after adding bots to a game"""
+    game_id: str
+    bot_player_ids: List[str]
     current_players: int
     max_players: int
     state: str
@@ -76,6 +220,32 @@ class SubmitMoveResponse(BaseModel):
     processing: bool
 
 
+class BatchStatusItem(BaseModel):
+    """Status of one game in a batch, or why it could not be read"""
+    game_id: str
+    status_code: int
+    status: Optional[GameStatusResponse] = None
+    error: Optional[str] = None
+
+
+class BatchStatusResponse(BaseModel):
+    """Per-game results of a batch status request, in request order"""
+    results: List[BatchStatusItem]
+
+
+class BatchSubmitItem(BaseModel):
+    """Outcome of one submission in a batch"""
+    game_id: str
+    status_code: int
+    result: Optional[SubmitMoveResponse] = None
+    error: Optional[str] = None
+
+
+class BatchSubmitResponse(BaseModel):
+    """Per-game results of a batch submission, in request order"""
+    results: List[BatchSubmitItem]
+
+
 class TurnResultsResponse(BaseModel):
     """Response when polling for turn results"""
     ready: bool
@@ -84,6 +254,76 @@ class TurnResultsResponse(BaseModel):
     updates: Optional[List[Dict[str, Any]]] = None
     events: Optional[List[Dict[str, Any]]] = None
     next_turn: Optional[int] = None
+    timings: Optional[Dict[str, float]] = None
+
+
+class GameSummary(BaseModel):
+    """Summary of a game in a listing"""
+    game_id: str
+    state: str
+    current_turn: int
+    player_count: int
+    max_players: int
+    created_at: str
+
+
+class GameListResponse(BaseModel):
+    """Paginated list of games in a given state"""
+    state: str
+    games: List[GameSummary]
+    total: int
+    offset: int
+    limit: int
+    next_offset: Optional[int] = None
+
+
+class SpectatorTurn(BaseModel):
+    """Resolved turn as seen by spectators"""
+    turn: int
+    updates: List[Dict[str, Any]]
+    events: List[Dict[str, Any]]
+
+
+class SpectatorResponse(BaseModel):
+    """Read-only game feed for spectators"""
+    game_id: str
+    state: str
+    current_turn: int
+    player_count: int
+    max_players: int
+    oldest_turn: Optional[int] = None
+    turns: List[SpectatorTurn]
+    map: Optional[Dict[str, Any]] = None
+
+
+class StageTiming(BaseModel):
+    """Aggregate duration of one turn processing stage"""
+    count: int
+    mean_ms: float
+    p50_ms: float
+    p95_ms: float
+    max_ms: float
+
+
+class TurnTimingsResponse(BaseModel):
+    """Rolling turn processing timings for one game or all games"""
+    game_id: Optional[str] = None
+    samples: int
+    stages: Dict[str, StageTiming]
+    slowest: List[Dict[str, Any]]
+
+
+class SchedulerMetricsResponse(BaseModel):
+    """Turn scheduler queue state of one worker"""
+    queued: int
+    running: int
+    tenants_queued: int
+    tenants_running: int
+    oldest_wait_seconds: float
+    max_queue_wait_seconds: float
+    processed: int
+    concurrency: int
+    per_tenant: int
 
 
 # ==================== Internal Models ====================
@@ -95,6 +335,15 @@ class GameMeta(BaseModel):
     player_count: int
     max_players: int
     created_at: str
+    version: int = 0
+    tenant: Optional[str] = None
+
+
+class GameContext(BaseModel):
+    """Authenticated player and fresh metadata of the game a request targets"""
+    game_id: str
+    player_id: str
+    meta: GameMeta
 
 
 # ==================== Error Response Models ====================
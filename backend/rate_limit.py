@@ -0,0 +1,126 @@
+import asyncio
+import math
+from typing import Optional
+from fastapi import Header, HTTPException, Request, status
+from fastapi.responses import JSONResponse
+from redis_client import redis_client
+from auth import authenticate_request
+from config import Config
+
+
+def client_address(request: Request) -> str:
+    """
+    Address of the client that sent a request
+
+    Behind TRUSTED_PROXY_HOPS proxies, that is the X-Forwarded-For entry
+    appended by the outermost trusted proxy; entries left of it were sent
+    by the client and cannot be trusted.
+    """
+    hops = Config.TRUSTED_PROXY_HOPS
+    forwarded = request.headers.get("x-forwarded-for")
+    if hops and forwarded:
+        addresses = [address.strip() for address in forwarded.split(",") if address.strip()]
+        if addresses:
+            return addresses[-min(hops, len(addresses))]
+    return request.client.host if request.client else "anonymous"
+
+
+def rate_limit(route: str):
+    """
+    Build a FastAPI dependency enforcing the token-bucket budget for a route
+
+    Buckets are keyed by the player of a valid X-API-Key, and otherwise by
+    client_address: made-up keys share their sender's bucket instead of
+    each getting a fresh one. They live in Redis, so the budget is shared
+    by all API workers. Use it in the route decorator's `dependencies`; the
+    key is authenticated once per request (see auth.authenticate_request),
+    so the route's own auth dependency adds no round trip.
+    """
+    rate, burst = Config.RATE_LIMITS.get(route, Config.RATE_LIMITS["default"])
+
+    async def check_rate_limit(
+        request: Request,
+        x_api_key: Optional[str] = Header(default=None, include_in_schema=False)
+    ):
+        try:
+            player_id = authenticate_request(request, x_api_key) if x_api_key else None
+            client_key = player_id or client_address(request)
+            allowed, retry_after = redis_client.take_rate_limit_token(client_key, route, rate, burst)
+        except Exception as e:
+            # Fail open: rate limiting must not take the API down with Redis hiccups
+            print(f"Rate limiter error for route {route}: {str(e)}")
+            return
+
+        if not allowed:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"Rate limit exceeded for {route}",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+
+    return check_rate_limit
+
+
+class AdmissionControl:
+    """
+    Global cap on requests handled concurrently by this worker
+
+    Requests beyond the cap wait up to `wait_seconds` for a slot and are
+    then rejected with 503 + Retry-After, so overload sheds load instead of
+    growing latency without bound. Bodies declared larger than
+    MAX_REQUEST_BODY_BYTES (BATCH_MAX_REQUEST_BODY_BYTES under /batch/)
+    are rejected with 413 before being read, and bodies sent without a
+    Content-Length (chunked) with 411, since their size is unknown.
+    """
+
+    # Paths that must keep answering under load
+    EXEMPT_PATHS = ("/health",)
+
+    def __init__(self, max_concurrent: int = None, wait_seconds: float = None):
+        self.max_concurrent = max_concurrent or Config.MAX_CONCURRENT_REQUESTS
+        self.wait_seconds = wait_seconds if wait_seconds is not None else Config.ADMISSION_WAIT_SECONDS
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def __call__(self, request: Request, call_next):
+        """HTTP middleware entry point"""
+        if request.url.path in self.EXEMPT_PATHS:
+            return await call_next(request)
+
+        max_body = (
+            Config.BATCH_MAX_REQUEST_BODY_BYTES if request.url.path.startswith("/batch/")
+            else Config.MAX_REQUEST_BODY_BYTES
+        )
+        content_length = request.headers.get("content-length")
+        if content_length is None and "transfer-encoding" in request.headers:
+            return JSONResponse(
+                status_code=status.HTTP_411_LENGTH_REQUIRED,
+                content={"detail": "Request body must have a Content-Length"}
+            )
+        if content_length and content_length.isdigit() and int(content_length) > max_body:
+            return JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": f"Request body exceeds {max_body} bytes"}
+            )
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.wait_seconds)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            return JSONResponse(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                content={"detail": "Server overloaded, retry later"},
+                headers={"Retry-After": "1"}
+            )
+
+        self.in_flight += 1
+        try:
+            return await call_next(request)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+
+# Global admission controller instance
+admission_control = AdmissionControl()
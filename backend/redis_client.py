@@ -1,28 +1,433 @@
 import redis
+import hashlib
 import json
-from typing import Optional, Dict, List, Any
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Tuple, Iterator
+import codec
+import map_chunks
 from config import Config
 
 
+# All states a game can be in (see GameMeta in models.py)
+GAME_STATES = ("waiting_for_players", "in_progress", "processing_turn", "complete")
+
+
+# Atomically move a game from in_progress to processing_turn for a given turn,
+# recording the claimer's lease token and its expiry. Only one caller (last
+# submitter or deadline scheduler) wins the transition. With ARGV[3] = '1' a
+# game already in processing_turn is taken over under a new token, but only if
+# its lease expired by ARGV[4] (games claimed before lease expiries were kept
+# in meta count as expired).
+# KEYS[1] = meta; ARGV = turn, lease token, take over, now, lease expires at.
+BEGIN_TURN_PROCESSING_SCRIPT = """
+local meta = redis.call('HMGET', KEYS[1], 'state', 'current_turn', 'lease_expires')
+if meta[2] ~= ARGV[1] then
+    return 0
+end
+local expired = not meta[3] or tonumber(meta[3]) <= tonumber(ARGV[4])
+if meta[1] == 'in_progress' or (ARGV[3] == '1' and meta[1] == 'processing_turn' and expired) then
+    redis.call('HSET', KEYS[1], 'state', 'processing_turn', 'processing_lease', ARGV[2], 'lease_expires', ARGV[5])
+    redis.call('HINCRBY', KEYS[1], 'version', 1)
+    return 1
+end
+return 0
+"""
+
+
+# Extend a processing lease, only for the worker holding it.
+# KEYS[1] = meta; ARGV = lease token, new expiry. Returns 1 if renewed.
+RENEW_LEASE_SCRIPT = """
+local meta = redis.call('HMGET', KEYS[1], 'state', 'processing_lease')
+if meta[1] == 'processing_turn' and meta[2] == ARGV[1] then
+    redis.call('HSET', KEYS[1], 'lease_expires', ARGV[2])
+    return 1
+end
+return 0
+"""
+
+
+# Leave processing_turn, but only if the caller still holds the lease for the
+# turn (it was not taken over): optionally advance current_turn, then set the
+# new state. KEYS[1] = meta; ARGV = turn, lease token, state, advance (1/0).
+# Returns the game's current turn afterwards, or -1 if the lease was lost.
+FINISH_TURN_PROCESSING_SCRIPT = """
+local meta = redis.call('HMGET', KEYS[1], 'state', 'current_turn', 'processing_lease')
+if meta[1] ~= 'processing_turn' or meta[2] ~= ARGV[1] or meta[3] ~= ARGV[2] then
+    return -1
+end
+local turn = tonumber(meta[2])
+if ARGV[4] == '1' then
+    turn = redis.call('HINCRBY', KEYS[1], 'current_turn', 1)
+    redis.call('HDEL', KEYS[1], 'turn_failures')
+end
+redis.call('HSET', KEYS[1], 'state', ARGV[3])
+redis.call('HDEL', KEYS[1], 'processing_lease', 'lease_expires')
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+return turn
+"""
+
+
+# Atomically add a player to a waiting game: reserve the lowest free spawn
+# slot, add the player, bump player_count and flip the game to in_progress
+# when it becomes full. Players of games created before slots existed are
+# taken to hold the lowest slots.
+# KEYS = meta, players, slots, registry; ARGV = player_id, ttl.
+# Returns {0, reason} or {slot, player_count, max_players, state}.
+JOIN_GAME_SCRIPT = """
+local meta = redis.call('HMGET', KEYS[1], 'state', 'player_count', 'max_players')
+if not meta[1] then
+    return {0, 'not_found'}
+end
+if meta[1] ~= 'waiting_for_players' then
+    return {0, 'not_accepting'}
+end
+if redis.call('SISMEMBER', KEYS[2], ARGV[1]) == 1 then
+    return {0, 'already_joined'}
+end
+local count = tonumber(meta[2])
+local max_players = tonumber(meta[3])
+if count >= max_players then
+    return {0, 'full'}
+end
+local slot = 0
+for candidate = count - redis.call('HLEN', KEYS[3]) + 1, max_players do
+    if redis.call('HSETNX', KEYS[3], candidate, ARGV[1]) == 1 then
+        slot = candidate
+        break
+    end
+end
+if slot == 0 then
+    return {0, 'full'}
+end
+redis.call('SADD', KEYS[2], ARGV[1])
+count = redis.call('HINCRBY', KEYS[1], 'player_count', 1)
+local state = meta[1]
+if count >= max_players then
+    state = 'in_progress'
+    redis.call('HSET', KEYS[1], 'state', state)
+end
+redis.call('HINCRBY', KEYS[1], 'version', 1)
+redis.call('SADD', KEYS[4], KEYS[2], KEYS[3])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[3], ARGV[2])
+return {slot, count, max_players, state}
+"""
+
+
+# Token bucket: refill at ARGV[1] tokens/sec up to ARGV[2], then take one token.
+# Uses the server clock so every API worker sees the same time.
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000) + 1000)
+return {allowed, tostring(retry_after)}
+"""
+
+
+# Create, or read and refresh, one session record in a bucket hash. Records are
+# "player_id<TAB>current_game<TAB>expires_at" (server clock, whole seconds).
+# KEYS[1] = bucket, ARGV = api_key, ttl, player_id (create; '' to read),
+# game_id ('' keeps the current game). Returns {player_id, game_id} or nil.
+SESSION_SCRIPT = r"""
+local now = tonumber(redis.call('TIME')[1])
+local ttl = tonumber(ARGV[2])
+local player, game
+if ARGV[3] ~= '' then
+    player, game = ARGV[3], ''
+else
+    local record = redis.call('HGET', KEYS[1], ARGV[1])
+    if not record then
+        return nil
+    end
+    local expires
+    player, game, expires = string.match(record, '^([^\t]*)\t([^\t]*)\t(%d+)$')
+    if not expires or tonumber(expires) <= now then
+        redis.call('HDEL', KEYS[1], ARGV[1])
+        return nil
+    end
+end
+if ARGV[4] ~= '' then
+    game = ARGV[4]
+end
+redis.call('HSET', KEYS[1], ARGV[1], player .. '\t' .. game .. '\t' .. string.format('%d', now + ttl))
+redis.call('EXPIRE', KEYS[1], ttl)
+return {player, game}
+"""
+
+
+# Mark a player's move as no longer due, but only if the index still points
+# at the submitted turn (a later turn may already have been opened).
+# KEYS[1] = player games index, ARGV = game_id, turn.
+CLEAR_MOVE_DUE_SCRIPT = """
+local due = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if due and tonumber(due) == tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], -1, ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+# Claim a due entry of a schedule (sorted set scored by due time) by pushing
+# it back rather than removing it: only if it is due at ARGV[2], reschedule it
+# to ARGV[3], so it comes due again unless the claimer completes its work.
+# KEYS[1] = schedule; ARGV = member, now, retry at. Returns 1 if claimed.
+CLAIM_DUE_SCRIPT = """
+local due = redis.call('ZSCORE', KEYS[1], ARGV[1])
+if due and tonumber(due) <= tonumber(ARGV[2]) then
+    redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+# Raise a timestamp kept in a string key, never lowering it.
+# KEYS[1] = key; ARGV[1] = timestamp. Returns the stored timestamp.
+ADVANCE_WATERMARK_SCRIPT = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+if tonumber(ARGV[1]) > current then
+    redis.call('SET', KEYS[1], ARGV[1])
+    return ARGV[1]
+end
+return tostring(current)
+"""
+
+
+# Drop expired records from a session bucket; returns how many were removed.
+SESSION_PURGE_SCRIPT = r"""
+local now = tonumber(redis.call('TIME')[1])
+local records = redis.call('HGETALL', KEYS[1])
+local purged = 0
+for i = 1, #records, 2 do
+    local expires = string.match(records[i + 1], '\t(%d+)$')
+    if not expires or tonumber(expires) <= now then
+        redis.call('HDEL', KEYS[1], records[i])
+        purged = purged + 1
+    end
+end
+return purged
+"""
+
+
+def game_key(game_id: str, *parts: Any) -> str:
+    """
+    Build a key for a game: game:{game_id}:part1:part2...
+
+    The braces are a Redis Cluster hash tag, so every key of one game
+    hashes to the same slot and multi-key operations stay on one node.
+    """
+    return ":".join([f"game:{{{game_id}}}", *(str(part) for part in parts)])
+
+
+def player_key(player_id: str, *parts: Any) -> str:
+    """Build a key for a player: player:{player_id}:part1... (hash-tagged like game_key)"""
+    return ":".join([f"player:{{{player_id}}}", *(str(part) for part in parts)])
+
+
+# Game meta cached for the current request (see GameMetaCache.request_scope)
+_request_meta: ContextVar[Optional[Dict[str, Any]]] = ContextVar("request_meta", default=None)
+
+
+class GameMetaCache:
+    """
+    Two-level cache of parsed game meta
+
+    - Request scope: repeated reads in one request never hit Redis
+    - Process cache: entries younger than `ttl` are served as is; older
+      ones are revalidated with a single HGET of the meta version, which
+      every meta mutation bumps
+
+    Writes made through this process drop the game's entries immediately,
+    so other workers see a change at most `ttl` seconds late.
+    """
+
+    def __init__(self, ttl: float = None, max_games: int = None):
+        self.ttl = Config.META_CACHE_TTL_SECONDS if ttl is None else ttl
+        self.max_games = Config.META_CACHE_MAX_GAMES if max_games is None else max_games
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def request_scope(self):
+        """Cache meta reads for the duration of a request"""
+        scope = {}
+        token = _request_meta.set(scope)
+        try:
+            yield scope
+        finally:
+            # Background tasks copy the context; make sure they never reuse it
+            scope.clear()
+            scope["closed"] = True
+            _request_meta.reset(token)
+
+    @staticmethod
+    def _scope() -> Optional[Dict[str, Any]]:
+        scope = _request_meta.get()
+        return None if scope is None or scope.get("closed") else scope
+
+    def get_scoped(self, game_id: str) -> Optional[Dict[str, Any]]:
+        """Meta already read in this request"""
+        scope = self._scope()
+        return scope.get(game_id) if scope is not None else None
+
+    def get(self, game_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """Process-cached meta and whether it is still within the TTL"""
+        with self._lock:
+            entry = self._entries.get(game_id)
+        if entry is None:
+            return None, False
+        fetched_at, meta = entry
+        return meta, time.monotonic() - fetched_at < self.ttl
+
+    def put(self, game_id: str, meta: Dict[str, Any]):
+        """Cache freshly read (or revalidated) meta"""
+        scope = self._scope()
+        if scope is not None:
+            scope[game_id] = meta
+
+        with self._lock:
+            self._entries[game_id] = (time.monotonic(), meta)
+            self._entries.move_to_end(game_id)
+            while len(self._entries) > self.max_games:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, game_id: str):
+        """Drop a game's meta after this process changed it"""
+        scope = self._scope()
+        if scope is not None:
+            scope.pop(game_id, None)
+
+        with self._lock:
+            self._entries.pop(game_id, None)
+
+
 class RedisClient:
     """Redis connection and data access layer for game state management"""
 
-    def __init__(self, redis_url: str = None):
+    def __init__(self, redis_url: str = None, cluster: bool = None):
         """Initialize Redis connection"""
         self.redis_url = redis_url or Config.REDIS_URL
+        self.cluster = Config.REDIS_CLUSTER if cluster is None else cluster
         self._client = None
+        self._raw_client = None
+        self._scripts = {}
+        self.codec = codec.get_codec()
+        self.meta_cache = GameMetaCache()
 
     @property
     def client(self) -> redis.Redis:
         """Get Redis client connection (lazy initialization)"""
         if self._client is None:
-            self._client = redis.from_url(
-                self.redis_url,
-                decode_responses=True,
-                encoding='utf-8'
-            )
+            if self.cluster:
+                # Games are sharded across nodes by their hash-tagged game_id
+                self._client = redis.RedisCluster.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    encoding='utf-8'
+                )
+            else:
+                self._client = redis.from_url(
+                    self.redis_url,
+                    decode_responses=True,
+                    encoding='utf-8'
+                )
         return self._client
 
+    @property
+    def raw_client(self) -> redis.Redis:
+        """
+        Client returning bytes (lazy initialization)
+
+        Used for values written through the codec (moves, results, maps,
+        receipts, history); everything else uses `client`.
+        """
+        if self._raw_client is None:
+            if self.cluster:
+                self._raw_client = redis.RedisCluster.from_url(self.redis_url, decode_responses=False)
+            else:
+                self._raw_client = redis.from_url(self.redis_url, decode_responses=False)
+        return self._raw_client
+
+    def connect_to(self, redis_url: str):
+        """Point the client at another Redis, dropping open connections and scripts bound to them"""
+        self.redis_url = redis_url
+        self._client = None
+        self._raw_client = None
+        self._scripts = {}
+        self.meta_cache = GameMetaCache()
+
+    def _raw_pipeline(self, transaction: bool = False):
+        """Pipeline on the bytes client (see pipeline())"""
+        return self.raw_client.pipeline(transaction=transaction and not self.cluster)
+
+    @staticmethod
+    def _decode_fields(raw: Dict[bytes, bytes]) -> Dict[str, Any]:
+        """Decode every value of a hash read with the raw client"""
+        return {field.decode(): codec.decode(value) for field, value in raw.items()}
+
+    @staticmethod
+    def _decode_snapshot_moves(snapshot: Optional[bytes]) -> Dict[str, Any]:
+        """Decode a history moves snapshot (legacy snapshots hold one JSON string per player)"""
+        moves = codec.decode(snapshot) or {}
+        return {
+            player_id: json.loads(move) if isinstance(move, str) else move
+            for player_id, move in moves.items()
+        }
+
+    def pipeline(self, transaction: bool = False):
+        """
+        Create a pipeline
+
+        Cluster pipelines cannot be MULTI/EXEC transactions, so `transaction`
+        is only honoured in single-node mode. Commands still run in order,
+        and keys built with game_key() for one game all live on one node.
+        """
+        return self.client.pipeline(transaction=transaction and not self.cluster)
+
+    def _script(self, source: str):
+        """Get a registered Lua script (EVALSHA with automatic fallback to EVAL)"""
+        if source not in self._scripts:
+            self._scripts[source] = self.client.register_script(source)
+        return self._scripts[source]
+
+    def _queue_script(self, pipe, source: str, keys: List[str], args: List[Any]):
+        """
+        Queue a Lua script on a pipeline
+
+        Single-node pipelines load their scripts before executing, so they
+        survive SCRIPT FLUSH or a failover. Cluster pipelines do not (and
+        the script would have to be loaded on each node), so they queue a
+        plain EVAL instead.
+        """
+        if self.cluster:
+            pipe.eval(source, len(keys), *keys, *args)
+        else:
+            self._script(source)(keys=keys, args=args, client=pipe)
+
     def health_check(self) -> bool:
         """Check if Redis connection is healthy"""
         try:
@@ -32,25 +437,73 @@ class RedisClient:
 
     # ==================== Game Metadata ====================
 
-    def get_game_meta(self, game_id: str) -> Optional[Dict[str, Any]]:
-        """Get game metadata from Redis"""
-        key = f"game:{game_id}:meta"
-        data = self.client.hgetall(key)
+    def get_game_meta(self, game_id: str, fresh: bool = False) -> Optional[Dict[str, Any]]:
+        """
+        Get game metadata
+
+        Served from the request scope or the process cache when possible
+        (see GameMetaCache). Pass fresh=True where a decision must see the
+        latest committed state; the result still refreshes the caches.
+        Returns a copy, so callers may modify it.
+        """
+        key = game_key(game_id, "meta")
+
+        if not fresh:
+            meta = self.meta_cache.get_scoped(game_id)
+            if meta is not None:
+                return dict(meta)
+
+            meta, live = self.meta_cache.get(game_id)
+            if meta is not None and (live or self.client.hget(key, "version") == str(meta["version"])):
+                self.meta_cache.put(game_id, meta)
+                return dict(meta)
+
+        return self._cache_game_meta(game_id, self.client.hgetall(key))
+
+    def _cache_game_meta(self, game_id: str, data: Dict[str, str]) -> Optional[Dict[str, Any]]:
+        """Parse a raw meta hash, store it in the meta cache and return a copy"""
         if not data:
+            self.meta_cache.invalidate(game_id)
             return None
 
         # Convert string values to appropriate types
-        return {
+        meta = {
             "state": data.get("state"),
             "current_turn": int(data.get("current_turn", 0)),
             "player_count": int(data.get("player_count", 0)),
             "max_players": int(data.get("max_players", 4)),
-            "created_at": data.get("created_at")
+            "created_at": data.get("created_at"),
+            "version": int(data.get("version", 0)),
+            "tenant": data.get("tenant")
         }
+        self.meta_cache.put(game_id, meta)
+        return dict(meta)
+
+    def get_game_context(self, game_id: str, player_id: str) -> Tuple[Optional[Dict[str, Any]], bool]:
+        """
+        Get fresh game meta and the player's membership in one round trip
+
+        Returns:
+            Tuple of (meta or None if the game does not exist, is member)
+        """
+        return self.get_game_contexts([game_id], player_id)[0]
+
+    def get_game_contexts(self, game_ids: List[str], player_id: str) -> List[Tuple[Optional[Dict[str, Any]], bool]]:
+        """get_game_context for many games in one pipelined round trip"""
+        pipe = self.pipeline()
+        for game_id in game_ids:
+            pipe.hgetall(game_key(game_id, "meta"))
+            pipe.sismember(game_key(game_id, "players"), player_id)
+        raw = pipe.execute()
+
+        return [
+            (self._cache_game_meta(game_id, raw[2 * i]), bool(raw[2 * i + 1]))
+            for i, game_id in enumerate(game_ids)
+        ]
 
     def set_game_meta(self, game_id: str, data: Dict[str, Any], ttl: int = None):
         """Store game metadata in Redis with TTL"""
-        key = f"game:{game_id}:meta"
+        key = game_key(game_id, "meta")
 
         # Convert all values to strings for Redis hash
         redis_data = {
@@ -60,161 +513,1092 @@ class RedisClient:
             "max_players": str(data.get("max_players", 4)),
             "created_at": data.get("created_at", "")
         }
+        if data.get("tenant"):
+            redis_data["tenant"] = data["tenant"]
 
-        self.client.hset(key, mapping=redis_data)
+        pipe = self.pipeline()
+        pipe.hset(key, mapping=redis_data)
+        pipe.hincrby(key, "version", 1)
+        pipe.execute()
+        self.meta_cache.invalidate(game_id)
+        self._register_game_keys(game_id, key)
 
         # Set TTL if provided
         if ttl:
             self.client.expire(key, ttl)
 
+        self._index_game_state(game_id, redis_data["state"], redis_data["created_at"])
+
     def update_game_state(self, game_id: str, state: str):
         """Update game state"""
-        key = f"game:{game_id}:meta"
-        self.client.hset(key, "state", state)
-        self._refresh_game_ttl(game_id)
+        key = game_key(game_id, "meta")
+        pipe = self.pipeline()
+        pipe.hset(key, "state", state)
+        pipe.hincrby(key, "version", 1)
+        pipe.hget(key, "created_at")
+        _, _, created_at = pipe.execute()
+        self._state_changed(game_id, state, created_at)
+
+    def _state_changed(self, game_id: str, state: str, created_at: Optional[str]):
+        """Caches, indexes and TTLs to update after the game's state was set to `state`"""
+        self.meta_cache.invalidate(game_id)
+
+        self._index_game_state(game_id, state, created_at)
+        self._refresh_game_ttl(game_id, state)
+
+        if state == "complete":
+            self.remove_game_from_players(game_id, self.get_game_players(game_id))
 
     def increment_turn(self, game_id: str) -> int:
         """Increment current turn and return new turn number"""
-        key = f"game:{game_id}:meta"
-        new_turn = self.client.hincrby(key, "current_turn", 1)
+        key = game_key(game_id, "meta")
+        pipe = self.pipeline()
+        pipe.hincrby(key, "current_turn", 1)
+        pipe.hincrby(key, "version", 1)
+        pipe.hdel(key, "turn_failures")
+        new_turn, _, _ = pipe.execute()
+        self.meta_cache.invalidate(game_id)
+
         self._refresh_game_ttl(game_id)
         return new_turn
 
-    def _refresh_game_ttl(self, game_id: str):
-        """Refresh TTL for all game-related keys"""
-        meta = self.get_game_meta(game_id)
-        if not meta:
-            return
+    def _refresh_game_ttl(self, game_id: str, state: str = None):
+        """Refresh TTL for all game-related keys (pass `state` when the caller already knows it)"""
+        if state is None:
+            meta = self.get_game_meta(game_id)
+            if not meta:
+                return
+            state = meta["state"]
 
         # Determine TTL based on game state
-        if meta["state"] == "complete":
-            ttl = Config.TTL_COMPLETED_GAME
+        if state == "complete":
+            # Kept for the exporter when exports are on (the sweeper deletes them once exported)
+            ttl = Config.TTL_UNEXPORTED_GAME if Config.EXPORT_COMPLETED_GAMES else Config.TTL_COMPLETED_GAME
         else:
             ttl = Config.TTL_ACTIVE_GAME
 
-        # Refresh TTL for all game keys
-        keys_to_refresh = [
-            f"game:{game_id}:meta",
-            f"game:{game_id}:players",
-            f"game:{game_id}:map"
-        ]
+        # Refresh TTL for every registered game key (EXPIRE is a no-op on
+        # missing keys). The base keys are always included so games created
+        # before the registry existed are still covered.
+        keys_to_refresh = set(self.client.smembers(self._registry_key(game_id)))
+        keys_to_refresh.update([
+            game_key(game_id, "meta"),
+            game_key(game_id, "players"),
+            game_key(game_id, "map"),
+            self._registry_key(game_id)
+        ])
 
+        pipe = self.pipeline()
         for key in keys_to_refresh:
-            if self.client.exists(key):
-                self.client.expire(key, ttl)
+            pipe.expire(key, ttl)
+        pipe.execute()
+
+    # ==================== Key Registry ====================
+
+    @staticmethod
+    def _registry_key(game_id: str) -> str:
+        """Set of every key belonging to a game"""
+        return game_key(game_id, "keys")
+
+    @staticmethod
+    def _history_key(game_id: str) -> str:
+        """Hash snapshot of compacted turns ({turn}:moves / {turn}:results → JSON)"""
+        return game_key(game_id, "history")
+
+    def _register_game_keys(self, game_id: str, *keys: str):
+        """Record keys in the game's registry so they can be refreshed and deleted without KEYS"""
+        self.client.sadd(self._registry_key(game_id), *keys)
+
+    # ==================== Game Indexes ====================
+
+    @staticmethod
+    def _state_index_key(state: str) -> str:
+        """Sorted set of game_ids in a given state, scored by created_at"""
+        return f"games:state:{state}"
+
+    @staticmethod
+    def _completed_index_key() -> str:
+        """Sorted set of completed game_ids, scored by completion time"""
+        return "games:completed"
+
+    @staticmethod
+    def _created_at_score(created_at: Optional[str]) -> float:
+        """Convert ISO created_at timestamp to a sorted set score"""
+        try:
+            return datetime.fromisoformat(created_at).timestamp()
+        except (TypeError, ValueError):
+            return 0.0
+
+    def _index_game_state(self, game_id: str, state: str, created_at: Optional[str]):
+        """Move game_id into the index for its current state"""
+        pipe = self.pipeline()
+        for other_state in GAME_STATES:
+            if other_state != state:
+                pipe.zrem(self._state_index_key(other_state), game_id)
+        pipe.zadd(self._state_index_key(state), {game_id: self._created_at_score(created_at)})
+        if state == "complete":
+            pipe.zadd(self._completed_index_key(), {game_id: time.time()})
+        pipe.execute()
+
+    def _unindex_game(self, game_id: str):
+        """Remove game_id from all state indexes"""
+        pipe = self.pipeline()
+        for state in GAME_STATES:
+            pipe.zrem(self._state_index_key(state), game_id)
+        pipe.zrem(self._completed_index_key(), game_id)
+        pipe.zrem(self._deadline_index_key(), game_id)
+        pipe.zrem(self._lease_index_key(), game_id)
+        pipe.execute()
+
+    def list_games_by_state(self, state: str, offset: int = 0, limit: int = 20) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Page through games in a given state, oldest first
+
+        Cost is O(log N + limit) on the state index plus one pipelined
+        HGETALL per returned game, independent of the total number of games.
+        Index entries whose game has expired are pruned lazily, so a page
+        may contain fewer than `limit` games.
+
+        Returns:
+            Tuple of (games on this page, total games in the index)
+        """
+        index_key = self._state_index_key(state)
+        game_ids = self.client.zrange(index_key, offset, offset + limit - 1)
+        total = self.client.zcard(index_key)
+
+        if not game_ids:
+            return [], total
+
+        pipe = self.pipeline()
+        for game_id in game_ids:
+            pipe.hgetall(game_key(game_id, "meta"))
+        raw_metas = pipe.execute()
+
+        games = []
+        stale = []
+        for game_id, data in zip(game_ids, raw_metas):
+            if not data:
+                stale.append(game_id)
+                continue
+            games.append({
+                "game_id": game_id,
+                "state": data.get("state"),
+                "current_turn": int(data.get("current_turn", 0)),
+                "player_count": int(data.get("player_count", 0)),
+                "max_players": int(data.get("max_players", 4)),
+                "created_at": data.get("created_at")
+            })
+
+        if stale:
+            self.client.zrem(index_key, *stale)
+
+        return games, total
 
     # ==================== Game Players ====================
 
-    def add_player_to_game(self, game_id: str, player_id: str):
-        """Add player to game's player set"""
-        key = f"game:{game_id}:players"
-        self.client.sadd(key, player_id)
+    @staticmethod
+    def _slots_key(game_id: str) -> str:
+        """Hash of assigned spawn slots ({slot} → player_id)"""
+        return game_key(game_id, "slots")
 
-        # Update player count in metadata
-        meta_key = f"game:{game_id}:meta"
-        self.client.hincrby(meta_key, "player_count", 1)
+    def add_player_to_game(self, game_id: str, player_id: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Add a player to a waiting game in one atomic script
 
-        self._refresh_game_ttl(game_id)
+        Reserves the lowest free spawn slot, adds the player, bumps
+        player_count and moves the game to in_progress when it becomes full,
+        so concurrent joins can neither overfill a game nor start it twice.
+        The caller whose join filled the game (state "in_progress" in the
+        result) must start it; see lobby.start_game.
+
+        Returns:
+            Tuple of (error, result): error is None or one of "not_found",
+            "not_accepting", "already_joined", "full"; result holds slot,
+            player_count, max_players and state
+        """
+        result = self._script(JOIN_GAME_SCRIPT)(
+            keys=[
+                game_key(game_id, "meta"),
+                game_key(game_id, "players"),
+                self._slots_key(game_id),
+                self._registry_key(game_id)
+            ],
+            args=[player_id, Config.TTL_ACTIVE_GAME]
+        )
+        if not result[0]:
+            return result[1], {}
+
+        self.meta_cache.invalidate(game_id)
+        slot, player_count, max_players, state = result
+        self._refresh_game_ttl(game_id, state)
+        return None, {
+            "slot": int(slot),
+            "player_count": int(player_count),
+            "max_players": int(max_players),
+            "state": state
+        }
+
+    def get_game_slots(self, game_id: str) -> Dict[int, str]:
+        """Get the game's assigned spawn slots (slot → player_id)"""
+        return {int(slot): player_id for slot, player_id in self.client.hgetall(self._slots_key(game_id)).items()}
 
     def get_game_players(self, game_id: str) -> List[str]:
         """Get all players in a game"""
-        key = f"game:{game_id}:players"
+        key = game_key(game_id, "players")
         return list(self.client.smembers(key))
 
     def is_player_in_game(self, game_id: str, player_id: str) -> bool:
         """Check if player is in the game"""
-        key = f"game:{game_id}:players"
+        key = game_key(game_id, "players")
         return self.client.sismember(key, player_id)
 
+    def add_bot_to_game(self, game_id: str, player_id: str, strategy: str) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Add a server-hosted bot player and register the strategy it plays
+
+        Returns the result of add_player_to_game; the bot is only
+        registered if it joined.
+        """
+        error, joined = self.add_player_to_game(game_id, player_id)
+        if error:
+            return error, joined
+
+        key = game_key(game_id, "bots")
+        pipe = self.pipeline()
+        pipe.hset(key, player_id, strategy)
+        pipe.sadd(self._registry_key(game_id), key)
+        pipe.expire(key, Config.TTL_ACTIVE_GAME)
+        pipe.execute()
+        return error, joined
+
+    def get_game_bots(self, game_id: str) -> Dict[str, str]:
+        """Get the game's server-hosted bots (player_id → strategy name)"""
+        key = game_key(game_id, "bots")
+        return self.client.hgetall(key)
+
+    # ==================== Player Game Index ====================
+
+    @staticmethod
+    def _player_games_key(player_id: str) -> str:
+        """
+        Sorted set of a player's active games: player:{player_id}:games
+
+        Scored by the turn the player owes a move for, or -1 when no move is due.
+        """
+        return player_key(player_id, "games")
+
+    def add_player_game(self, player_id: str, game_id: str):
+        """
+        Index a game the player joined (no move due until a turn opens)
+
+        Never overwrites an existing entry: the player who fills a game is
+        indexed after the game started, and must keep the due marker its
+        first turn set.
+        """
+        key = self._player_games_key(player_id)
+        pipe = self.pipeline()
+        pipe.zadd(key, {game_id: -1}, nx=True)
+        pipe.expire(key, Config.TTL_PLAYER_SESSION)
+        pipe.execute()
+
+    def set_moves_due(self, game_id: str, turn: int, player_ids: List[str]):
+        """Mark a move as due for `turn` in each player's games index"""
+        if not player_ids:
+            return
+
+        pipe = self.pipeline()
+        for player_id in player_ids:
+            key = self._player_games_key(player_id)
+            pipe.zadd(key, {game_id: turn})
+            pipe.expire(key, Config.TTL_PLAYER_SESSION)
+        pipe.execute()
+
+    def clear_move_due(self, player_id: str, game_id: str, turn: int) -> bool:
+        """Mark the player's move for `turn` as submitted; False if the index had moved on"""
+        key = self._player_games_key(player_id)
+        return bool(self._script(CLEAR_MOVE_DUE_SCRIPT)(keys=[key], args=[game_id, turn]))
+
+    def remove_game_from_players(self, game_id: str, player_ids: List[str]):
+        """Drop a finished or deleted game from every player's games index"""
+        if not player_ids:
+            return
+
+        pipe = self.pipeline()
+        for player_id in player_ids:
+            pipe.zrem(self._player_games_key(player_id), game_id)
+        pipe.execute()
+
+    def get_games_awaiting_move(self, player_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        Get the player's games where a move is due, most urgent first
+
+        Two commands whatever the number of games: every due game in the
+        player's index and the turn deadlines of those games (ZMSCORE). The
+        limit applies after sorting by deadline, so the most urgent games
+        are never cut off. Games whose turn is being processed (no
+        deadline) are left out.
+        """
+        due = self.client.zrangebyscore(self._player_games_key(player_id), 0, "+inf", withscores=True)
+        if not due:
+            return []
+
+        deadlines = self.client.zmscore(self._deadline_index_key(), [game_id for game_id, _turn in due])
+        games = [
+            {"game_id": game_id, "turn": int(turn), "deadline": deadline}
+            for (game_id, turn), deadline in zip(due, deadlines)
+            if deadline is not None
+        ]
+        return sorted(games, key=lambda game: game["deadline"])[:limit]
+
     # ==================== Game Map ====================
 
+    @staticmethod
+    def _map_chunks_key(game_id: str) -> str:
+        """Hash of map chunks ({cq}:{cr} → encoded chunk, see map_chunks)"""
+        return game_key(game_id, "map", "chunks")
+
     def store_game_map(self, game_id: str, map_data: Dict[str, Any]):
-        """Store game map as JSON"""
-        key = f"game:{game_id}:map"
-        self.client.set(key, json.dumps(map_data))
+        """
+        Store game map, whole and as chunks
+
+        Maps over MAP_INLINE_MAX_HEXES keep only their header in the map
+        key, so reading it stays cheap however large the map is.
+        """
+        key = game_key(game_id, "map")
+        header = map_chunks.map_header(map_data)
+        stored = header if header["chunked"] else dict(map_data, **header)
+
+        pipe = self._raw_pipeline()
+        pipe.set(key, self.codec.encode(stored))
+        self._queue_map_chunks(pipe, game_id, map_data)
+        pipe.sadd(self._registry_key(game_id), key, self._map_chunks_key(game_id))
+        pipe.execute()
         self._refresh_game_ttl(game_id)
 
-    def get_game_map(self, game_id: str) -> Optional[Dict[str, Any]]:
-        """Retrieve game map"""
-        key = f"game:{game_id}:map"
-        data = self.client.get(key)
-        return json.loads(data) if data else None
+    def _queue_map_chunks(self, pipe, game_id: str, map_data: Dict[str, Any]):
+        """Queue storing a map's chunks on a raw pipeline"""
+        chunks = map_chunks.split_map(map_data)
+        pipe.hset(self._map_chunks_key(game_id), mapping={
+            field: self.codec.encode(chunk) for field, chunk in chunks.items()
+        })
+
+    def get_game_map(self, game_id: str, with_hexes: bool = True) -> Optional[Dict[str, Any]]:
+        """
+        Retrieve game map
+
+        Chunked maps are reassembled from their chunks unless `with_hexes`
+        is False, in which case only the header is returned for them.
+        """
+        key = game_key(game_id, "map")
+        map_data = codec.decode(self.raw_client.get(key))
+        if not map_data or not map_data.get("chunked") or not with_hexes:
+            return map_data
+
+        hexes = []
+        for chunk in self._decode_fields(self.raw_client.hgetall(self._map_chunks_key(game_id))).values():
+            hexes.extend(chunk["hexes"])
+        hexes.sort(key=lambda hex_data: (hex_data["q"], hex_data["r"]))
+        return dict(map_data, hexes=hexes)
+
+    def iter_map_hexes(self, game_id: str) -> Iterator[Dict[str, Any]]:
+        """
+        Hexes of a chunked map, one chunk in memory at a time (unordered)
+
+        For maps too large to reassemble whole, see get_game_map.
+        """
+        for _field, chunk in self.raw_client.hscan_iter(self._map_chunks_key(game_id)):
+            yield from codec.decode(chunk)["hexes"]
+
+    def get_map_chunk(self, game_id: str, cq: int, cr: int) -> Optional[bytes]:
+        """
+        Get one encoded map chunk (decode with codec.decode)
+
+        Maps stored before chunking are split on first use.
+        """
+        field = map_chunks.chunk_field(cq, cr)
+        data = self.raw_client.hget(self._map_chunks_key(game_id), field)
+        if data is not None:
+            return data
+
+        map_data = self.get_game_map(game_id)
+        if not map_data or map_data.get("chunked") or self.raw_client.exists(self._map_chunks_key(game_id)):
+            return None
+
+        pipe = self._raw_pipeline()
+        self._queue_map_chunks(pipe, game_id, map_data)
+        pipe.sadd(self._registry_key(game_id), self._map_chunks_key(game_id))
+        pipe.execute()
+        self._refresh_game_ttl(game_id)
+        return self.raw_client.hget(self._map_chunks_key(game_id), field)
+
+    # ==================== Units ====================
+
+    def store_units(self, game_id: str, blob: bytes):
+        """Store the game's unit table blob (see units.UnitTable) in one command"""
+        key = game_key(game_id, "units")
+        self.raw_client.set(key, blob, ex=Config.TTL_ACTIVE_GAME)
+        self._register_game_keys(game_id, key)
+
+    def get_units(self, game_id: str) -> Optional[bytes]:
+        """Get the game's unit table blob, or None for games without one"""
+        return self.raw_client.get(game_key(game_id, "units"))
+
+    # ==================== Bulk Game Creation ====================
+
+    def create_games(self, games: List[Tuple[str, str, Optional[str]]], meta: Dict[str, Any],
+                     map_data: Dict[str, Any]):
+        """
+        Store many new games, each with its creator, in pipelined batches
+
+        Stores per game its meta, map and chunks, players and slot 1 for the
+        creator, state index, registry, TTLs, the creator's games index and
+        session. A batch is one MULTI/EXEC on a single node, so no game is
+        ever seen without its creator (on a cluster, where the keys span
+        slots, meta is written last). The map and its chunks are encoded once
+        and shared by every game. A batch holds at most BULK_CREATE_BATCH_SIZE
+        games and is sent once it holds about BULK_CREATE_PIPELINE_BYTES of
+        map data, so large maps do not build huge pipelines.
+
+        Args:
+            games: (game_id, creator player_id, api_key) per game; api_key is
+                None when the creator already has a session
+            meta: Metadata for every game; player_count becomes 1 and tenant
+                the game's creator
+            map_data: Map stored for every game
+        """
+        header = map_chunks.map_header(map_data)
+        encoded_map = self.codec.encode(header if header["chunked"] else dict(map_data, **header))
+        encoded_chunks = {
+            field: self.codec.encode(chunk) for field, chunk in map_chunks.split_map(map_data).items()
+        }
+        created_score = self._created_at_score(meta.get("created_at"))
+        map_bytes = len(encoded_map) + sum(len(chunk) for chunk in encoded_chunks.values())
+        batch_size = max(1, min(Config.BULK_CREATE_BATCH_SIZE, Config.BULK_CREATE_PIPELINE_BYTES // map_bytes))
+
+        for start in range(0, len(games), batch_size):
+            self._create_games_batch(games[start:start + batch_size], meta, created_score, encoded_map, encoded_chunks)
+
+    def _create_games_batch(self, games: List[Tuple[str, str, Optional[str]]], meta: Dict[str, Any],
+                            created_score: float, encoded_map: bytes, encoded_chunks: Dict[str, bytes]):
+        """Store one batch of create_games in one pipeline (a transaction on a single node)"""
+        pipe = self._raw_pipeline(transaction=True)
+        for game_id, player_id, api_key in games:
+            meta_key = game_key(game_id, "meta")
+            map_key = game_key(game_id, "map")
+            players_key = game_key(game_id, "players")
+            chunks_key = self._map_chunks_key(game_id)
+            slots_key = self._slots_key(game_id)
+            registry_key = self._registry_key(game_id)
+            player_games_key = self._player_games_key(player_id)
+
+            pipe.set(map_key, encoded_map)
+            pipe.hset(chunks_key, mapping=encoded_chunks)
+            pipe.sadd(players_key, player_id)
+            pipe.hset(slots_key, "1", player_id)
+            pipe.hset(meta_key, mapping={
+                "state": meta["state"],
+                "current_turn": str(meta["current_turn"]),
+                "player_count": "1",
+                "max_players": str(meta["max_players"]),
+                "created_at": meta["created_at"],
+                "version": "1",
+                "tenant": player_id
+            })
+            pipe.sadd(registry_key, meta_key, map_key, chunks_key, players_key, slots_key)
+            for key in (meta_key, map_key, chunks_key, players_key, slots_key, registry_key):
+                pipe.expire(key, Config.TTL_ACTIVE_GAME)
+            pipe.zadd(self._state_index_key(meta["state"]), {game_id: created_score})
+            pipe.zadd(player_games_key, {game_id: -1})
+            pipe.expire(player_games_key, Config.TTL_PLAYER_SESSION)
+            if api_key:
+                self._queue_script(
+                    pipe, SESSION_SCRIPT,
+                    [self._session_bucket_key(api_key)],
+                    [api_key, Config.TTL_PLAYER_SESSION, player_id, game_id]
+                )
+        pipe.execute()
 
     # ==================== Turn Moves ====================
 
-    def store_move(self, game_id: str, turn: int, player_id: str, move_data: Dict[str, Any]):
-        """Store player's move for a specific turn"""
-        key = f"game:{game_id}:turn:{turn}:moves"
-        self.client.hset(key, player_id, json.dumps(move_data))
+    def store_move(self, game_id: str, turn: int, player_id: str, move_data: Dict[str, Any],
+                   idempotency_key: str = None):
+        """
+        Store player's move for a specific turn
+
+        With an `idempotency_key`, a pending submission receipt (response
+        None) is written in the same transaction, so a retry of a request
+        that failed after the move landed can finish it rather than get 409.
+        """
+        key = game_key(game_id, "turn", turn, "moves")
+        keys = [key]
+
+        pipe = self._raw_pipeline(transaction=True)
+        pipe.hset(key, player_id, self.codec.encode(move_data))
+        if idempotency_key:
+            receipts_key = game_key(game_id, "turn", turn, "receipts")
+            receipt = {"idempotency_key": idempotency_key, "response": None}
+            pipe.hset(receipts_key, player_id, self.codec.encode(receipt))
+            keys.append(receipts_key)
+        pipe.sadd(self._registry_key(game_id), *keys)
 
         # Set TTL for move data
-        self.client.expire(key, Config.TTL_ACTIVE_GAME)
+        for stored_key in keys:
+            pipe.expire(stored_key, Config.TTL_ACTIVE_GAME)
+        pipe.execute()
         self._refresh_game_ttl(game_id)
 
+    def store_submission_receipt(self, game_id: str, turn: int, player_id: str,
+                                 idempotency_key: str, response: Dict[str, Any]):
+        """Store the response returned for a move submission so retries can replay it"""
+        key = game_key(game_id, "turn", turn, "receipts")
+        receipt = {"idempotency_key": idempotency_key, "response": response}
+        self.raw_client.hset(key, player_id, self.codec.encode(receipt))
+        self._register_game_keys(game_id, key)
+        self.client.expire(key, Config.TTL_ACTIVE_GAME)
+
+    def get_submission_receipt(self, game_id: str, turn: int, player_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the stored submission receipt ({idempotency_key, response}) for a
+        player's turn; response is None while the submission is unfinished
+        """
+        key = game_key(game_id, "turn", turn, "receipts")
+        return codec.decode(self.raw_client.hget(key, player_id))
+
     def has_player_submitted_move(self, game_id: str, turn: int, player_id: str) -> bool:
         """Check if player has already submitted a move for this turn"""
-        key = f"game:{game_id}:turn:{turn}:moves"
+        key = game_key(game_id, "turn", turn, "moves")
         return self.client.hexists(key, player_id)
 
     def get_turn_moves(self, game_id: str, turn: int) -> Dict[str, Any]:
         """Get all moves for a specific turn"""
-        key = f"game:{game_id}:turn:{turn}:moves"
-        moves_raw = self.client.hgetall(key)
+        key = game_key(game_id, "turn", turn, "moves")
+        moves_raw = self.raw_client.hgetall(key)
 
-        # Parse JSON for each player's move
-        moves = {}
-        for player_id, move_json in moves_raw.items():
-            moves[player_id] = json.loads(move_json)
+        # Fall back to the history snapshot for compacted turns
+        if not moves_raw:
+            return self._decode_snapshot_moves(self.raw_client.hget(self._history_key(game_id), f"{turn}:moves"))
 
-        return moves
+        return self._decode_fields(moves_raw)
 
     def count_turn_moves(self, game_id: str, turn: int) -> int:
         """Count how many moves have been submitted for a turn"""
-        key = f"game:{game_id}:turn:{turn}:moves"
+        key = game_key(game_id, "turn", turn, "moves")
         return self.client.hlen(key)
 
+    def count_turn_moves_many(self, game_turns: List[Tuple[str, int]]) -> List[int]:
+        """count_turn_moves for many (game_id, turn) pairs in one pipelined round trip"""
+        pipe = self.pipeline()
+        for game_id, turn in game_turns:
+            pipe.hlen(game_key(game_id, "turn", turn, "moves"))
+        return pipe.execute()
+
+    def store_moves_batch(self, submissions: List[Tuple[str, int, str, Dict[str, Any]]]) -> List[Tuple[bool, int]]:
+        """
+        Store moves for many games in one pipelined round trip
+
+        `submissions` are (game_id, turn, player_id, move_data). Each move is
+        written with HSETNX, so an existing submission is never replaced, and
+        the player's move is marked as no longer due. Only the base game keys
+        get their TTL refreshed (not the whole registry as store_move does).
+
+        Returns:
+            (stored, moves submitted so far) for each submission
+        """
+        pipe = self._raw_pipeline()
+        for game_id, turn, player_id, move_data in submissions:
+            key = game_key(game_id, "turn", turn, "moves")
+            pipe.hsetnx(key, player_id, self.codec.encode(move_data))
+            pipe.hlen(key)
+            pipe.sadd(self._registry_key(game_id), key)
+            for base_key in (key, game_key(game_id, "meta"), game_key(game_id, "players"),
+                             game_key(game_id, "map"), self._registry_key(game_id)):
+                pipe.expire(base_key, Config.TTL_ACTIVE_GAME)
+            self._queue_script(pipe, CLEAR_MOVE_DUE_SCRIPT, keys=[self._player_games_key(player_id)], args=[game_id, turn])
+        raw = pipe.execute()
+
+        # 9 commands were queued per submission
+        return [(bool(raw[9 * i]), raw[9 * i + 1]) for i in range(len(submissions))]
+
+    def fill_missing_moves(self, game_id: str, turn: int, player_ids: List[str], move_data: Dict[str, Any]) -> int:
+        """
+        Store `move_data` for every listed player that has not submitted yet
+
+        Uses HSETNX so a real move that lands concurrently is never overwritten.
+
+        Returns:
+            Number of players whose move was filled in
+        """
+        key = game_key(game_id, "turn", turn, "moves")
+        encoded = self.codec.encode(move_data)
+        pipe = self._raw_pipeline()
+        for player_id in player_ids:
+            pipe.hsetnx(key, player_id, encoded)
+        filled = sum(pipe.execute())
+
+        self._register_game_keys(game_id, key)
+        self.client.expire(key, Config.TTL_ACTIVE_GAME)
+        return filled
+
+    # ==================== Turn Deadlines ====================
+
+    @staticmethod
+    def _deadline_index_key() -> str:
+        """Sorted set of game_ids with an open turn, scored by the turn's due time"""
+        return "games:turn_deadlines"
+
+    def set_turn_deadline(self, game_id: str, due_at: float):
+        """Set (or reset) the deadline of the game's open turn"""
+        self.client.zadd(self._deadline_index_key(), {game_id: due_at})
+
+    def clear_turn_deadline(self, game_id: str):
+        """Remove the game's turn deadline"""
+        self.client.zrem(self._deadline_index_key(), game_id)
+
+    def get_overdue_games(self, now: float, limit: int = 100) -> List[str]:
+        """Get up to `limit` game_ids whose turn deadline is at or before `now`"""
+        return self.client.zrangebyscore(self._deadline_index_key(), "-inf", now, start=0, num=limit)
+
+    def claim_turn_deadline(self, game_id: str, now: float, retry_at: float) -> bool:
+        """
+        Claim an overdue deadline; only one caller across all workers gets True
+
+        The deadline is pushed back to `retry_at` rather than removed, so a
+        claimer that fails before starting the turn (begin_turn_processing
+        clears the deadline) leaves it to be claimed again.
+        """
+        return self._script(CLAIM_DUE_SCRIPT)(
+            keys=[self._deadline_index_key()], args=[game_id, now, retry_at]
+        ) == 1
+
+    def record_turn_failure(self, game_id: str) -> int:
+        """Count a failed attempt at processing the current turn; returns the attempts so far"""
+        return self.client.hincrby(game_key(game_id, "meta"), "turn_failures", 1)
+
+    def begin_turn_processing(self, game_id: str, turn: int, lease: str, expires_at: float,
+                              take_over: bool = False) -> bool:
+        """
+        Atomically switch the game from in_progress to processing_turn
+
+        `lease` is the caller's token, required to renew the lease and to
+        finish the turn (see finish_turn_processing); it expires at
+        `expires_at` unless renewed. With `take_over`, a game already in
+        processing_turn for `turn` is claimed too if its lease expired; the
+        previous claimer can then no longer finish the turn.
+
+        The lease expiry kept in meta is authoritative; the lease index
+        (set_processing_lease) only tells the deadline scheduler when to look.
+
+        Returns:
+            True if this caller won the transition for `turn`
+        """
+        meta_key = game_key(game_id, "meta")
+        started = self._script(BEGIN_TURN_PROCESSING_SCRIPT)(
+            keys=[meta_key], args=[turn, lease, "1" if take_over else "0", time.time(), expires_at]
+        )
+        if not started:
+            return False
+
+        self.meta_cache.invalidate(game_id)
+        self._index_game_state(game_id, "processing_turn", self.client.hget(meta_key, "created_at"))
+        self._refresh_game_ttl(game_id, "processing_turn")
+        return True
+
+    def holds_turn_processing(self, game_id: str, lease: str) -> bool:
+        """Whether `lease` still holds the processing of the game's turn"""
+        return self.client.hget(game_key(game_id, "meta"), "processing_lease") == lease
+
+    def renew_turn_processing(self, game_id: str, lease: str, expires_at: float) -> bool:
+        """
+        Extend the lease on the game's turn processing to `expires_at`, if
+        `lease` still holds it; False (and nothing changed) if it was taken over
+        """
+        renewed = self._script(RENEW_LEASE_SCRIPT)(
+            keys=[game_key(game_id, "meta")], args=[lease or "", expires_at]
+        )
+        if not renewed:
+            return False
+
+        self.set_processing_lease(game_id, expires_at)
+        return True
+
+    def finish_turn_processing(self, game_id: str, turn: int, lease: str, state: str,
+                               advance: bool) -> Optional[int]:
+        """
+        Leave processing_turn for `state`, if `lease` still holds the turn
+
+        Advances current_turn first when `advance` is set, and drops the
+        processing lease.
+
+        Returns:
+            The game's current turn afterwards, or None if the lease was
+            lost (the turn was taken over; nothing is changed)
+        """
+        meta_key = game_key(game_id, "meta")
+        current_turn = self._script(FINISH_TURN_PROCESSING_SCRIPT)(
+            keys=[meta_key], args=[turn, lease or "", state, "1" if advance else "0"]
+        )
+        if current_turn < 0:
+            return None
+
+        self.clear_processing_lease(game_id)
+        self._state_changed(game_id, state, self.client.hget(meta_key, "created_at"))
+        return current_turn
+
+    # ==================== Processing Leases ====================
+
+    @staticmethod
+    def _lease_index_key() -> str:
+        """Sorted set of game_ids whose turn is being processed, scored by lease expiry"""
+        return "games:processing_leases"
+
+    def set_processing_lease(self, game_id: str, expires_at: float, only_if_missing: bool = False):
+        """Set (or renew) the lease on the game's turn processing"""
+        self.client.zadd(self._lease_index_key(), {game_id: expires_at}, nx=only_if_missing)
+
+    def clear_processing_lease(self, game_id: str):
+        """Remove the game's processing lease"""
+        self.client.zrem(self._lease_index_key(), game_id)
+
+    def get_expired_leases(self, now: float, limit: int = 100) -> List[str]:
+        """Get up to `limit` game_ids whose processing lease expired at or before `now`"""
+        return self.client.zrangebyscore(self._lease_index_key(), "-inf", now, start=0, num=limit)
+
+    def claim_expired_lease(self, game_id: str, now: float, retry_at: float) -> bool:
+        """
+        Claim an expired lease; only one caller across all workers gets True
+
+        Like claim_turn_deadline, the claim postpones the entry to `retry_at`
+        rather than removing it, so the lease is looked at again if the
+        claimer fails before taking the turn over.
+        """
+        return self._script(CLAIM_DUE_SCRIPT)(
+            keys=[self._lease_index_key()], args=[game_id, now, retry_at]
+        ) == 1
+
     # ==================== Turn Results ====================
 
     def store_turn_results(self, game_id: str, turn: int, results: Dict[str, Any]):
         """Store turn processing results"""
-        key = f"game:{game_id}:turn:{turn}:results"
-        self.client.set(key, json.dumps(results))
+        key = game_key(game_id, "turn", turn, "results")
+        self.raw_client.set(key, self.codec.encode(results))
+        self._register_game_keys(game_id, key)
         self.client.expire(key, Config.TTL_ACTIVE_GAME)
         self._refresh_game_ttl(game_id)
 
     def get_turn_results(self, game_id: str, turn: int) -> Optional[Dict[str, Any]]:
         """Get turn processing results if available"""
-        key = f"game:{game_id}:turn:{turn}:results"
-        data = self.client.get(key)
-        return json.loads(data) if data else None
+        key = game_key(game_id, "turn", turn, "results")
+        data = self.raw_client.get(key)
+
+        # Fall back to the history snapshot for compacted turns
+        if not data:
+            data = self.raw_client.hget(self._history_key(game_id), f"{turn}:results")
+
+        return codec.decode(data)
+
+    def get_turn_history(self, game_id: str, turns: List[int]) -> List[Tuple[Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Get (moves, results) for several turns in one round trip
+
+        Reads the live turn keys and the history snapshot together, so
+        compacted and uncompacted turns come back the same way.
+        """
+        if not turns:
+            return []
+
+        history_key = self._history_key(game_id)
+        pipe = self._raw_pipeline()
+        for turn in turns:
+            pipe.hgetall(game_key(game_id, "turn", turn, "moves"))
+            pipe.get(game_key(game_id, "turn", turn, "results"))
+            pipe.hmget(history_key, f"{turn}:moves", f"{turn}:results")
+        raw = pipe.execute()
+
+        history = []
+        for i in range(len(turns)):
+            moves_raw, results_raw, (snapshot_moves, snapshot_results) = raw[3 * i:3 * i + 3]
+            if moves_raw:
+                moves = self._decode_fields(moves_raw)
+            else:
+                moves = self._decode_snapshot_moves(snapshot_moves)
+
+            history.append((moves, codec.decode(results_raw or snapshot_results)))
+
+        return history
+
+    # ==================== Turn Compaction ====================
+
+    def compact_game_turns(self, game_id: str, keep_turns: int = None, max_turns: int = None) -> int:
+        """
+        Fold old per-turn moves/results keys into the game's history snapshot
+
+        Turns older than `current_turn - keep_turns` are copied into
+        game:{game_id}:history and their individual keys are deleted, so the
+        number of live keys per game stays bounded. At most `max_turns` turns
+        are compacted per call.
+
+        Returns:
+            Number of turns compacted
+        """
+        keep_turns = Config.TURN_HISTORY_KEEP if keep_turns is None else keep_turns
+        max_turns = Config.SWEEP_BATCH_SIZE if max_turns is None else max_turns
+
+        meta_key = game_key(game_id, "meta")
+        current_turn, compacted_turn = self.client.hmget(meta_key, "current_turn", "compacted_turn")
+        if current_turn is None:
+            return 0
+
+        first = int(compacted_turn or 0)
+        last = min(int(current_turn) - keep_turns, first + max_turns)
+        turns = list(range(first, last))
+        if not turns:
+            return 0
+
+        pipe = self._raw_pipeline()
+        for turn in turns:
+            pipe.hgetall(game_key(game_id, "turn", turn, "moves"))
+            pipe.get(game_key(game_id, "turn", turn, "results"))
+        raw = pipe.execute()
+
+        snapshot = {}
+        turn_keys = []
+        for i, turn in enumerate(turns):
+            moves_raw, results_raw = raw[2 * i], raw[2 * i + 1]
+            if moves_raw:
+                snapshot[f"{turn}:moves"] = self.codec.encode(self._decode_fields(moves_raw))
+            if results_raw:
+                snapshot[f"{turn}:results"] = results_raw
+            turn_keys.extend([
+                game_key(game_id, "turn", turn, "moves"),
+                game_key(game_id, "turn", turn, "results"),
+                game_key(game_id, "turn", turn, "receipts")
+            ])
+
+        # Write the snapshot before dropping the turn keys
+        pipe = self._raw_pipeline(transaction=True)
+        if snapshot:
+            pipe.hset(self._history_key(game_id), mapping=snapshot)
+            pipe.sadd(self._registry_key(game_id), self._history_key(game_id))
+        pipe.delete(*turn_keys)
+        pipe.srem(self._registry_key(game_id), *turn_keys)
+        pipe.hset(meta_key, "compacted_turn", last)
+        pipe.execute()
+
+        self._refresh_game_ttl(game_id)
+        return len(turns)
+
+    def iter_state_index(self, state: str, cursor: int = 0, count: int = 100) -> Tuple[int, List[str]]:
+        """Incrementally scan a state index; returns (next_cursor, game_ids)"""
+        cursor, members = self.client.zscan(self._state_index_key(state), cursor=cursor, count=count)
+        return cursor, [game_id for game_id, _score in members]
+
+    def prune_state_index(self, state: str, game_ids: List[str]) -> List[str]:
+        """Drop index entries whose game no longer exists; returns the surviving game_ids"""
+        if not game_ids:
+            return []
+
+        pipe = self.pipeline()
+        for game_id in game_ids:
+            pipe.exists(game_key(game_id, "meta"))
+        exists = pipe.execute()
+
+        stale = [game_id for game_id, found in zip(game_ids, exists) if not found]
+        if stale:
+            self.client.zrem(self._state_index_key(state), *stale)
+
+        return [game_id for game_id, found in zip(game_ids, exists) if found]
+
+    def get_completed_games(self, completed_before: float, limit: int = 100) -> List[str]:
+        """Get up to `limit` game_ids that completed before the given epoch timestamp"""
+        return self.client.zrangebyscore(
+            self._completed_index_key(), "-inf", completed_before, start=0, num=limit
+        )
+
+    def get_completed_games_since(self, completed_after: float, limit: int = 100) -> List[Tuple[str, float]]:
+        """Get up to `limit` (game_id, completed_at) pairs completed at or after the given timestamp, oldest first"""
+        return self.client.zrangebyscore(
+            self._completed_index_key(), completed_after, "+inf", start=0, num=limit, withscores=True
+        )
+
+    @staticmethod
+    def _export_watermark_key() -> str:
+        """Completion time up to which every completed game has been exported"""
+        return "games:export_watermark"
+
+    def get_export_watermark(self) -> float:
+        """Completion time up to which every completed game has been exported (0 if never)"""
+        return float(self.client.get(self._export_watermark_key()) or 0)
+
+    def advance_export_watermark(self, completed_at: float) -> float:
+        """Record that every game completed up to `completed_at` was exported; never moves back"""
+        return float(self._script(ADVANCE_WATERMARK_SCRIPT)(
+            keys=[self._export_watermark_key()], args=[completed_at]
+        ))
+
+    # ==================== Turn Timings ====================
+
+    @staticmethod
+    def _timings_key(game_id: str) -> str:
+        """Hash of recent turn timings ({turn} → encoded stage timings)"""
+        return game_key(game_id, "timings")
+
+    @staticmethod
+    def _global_timings_key() -> str:
+        """List of recent turn timings across all games, newest first"""
+        return "metrics:turn_timings"
+
+    def record_turn_timings(self, game_id: str, turn: int, timings: Dict[str, float]):
+        """
+        Record a processed turn's stage timings in one round trip
+
+        Keeps the last TURN_TIMINGS_KEEP turns per game and the last
+        TURN_TIMINGS_GLOBAL_KEEP turns across all games.
+        """
+        key = self._timings_key(game_id)
+
+        pipe = self._raw_pipeline()
+        pipe.hset(key, str(turn), self.codec.encode(timings))
+        if turn >= Config.TURN_TIMINGS_KEEP:
+            pipe.hdel(key, str(turn - Config.TURN_TIMINGS_KEEP))
+        pipe.sadd(self._registry_key(game_id), key)
+        pipe.expire(key, Config.TTL_ACTIVE_GAME)
+        pipe.lpush(self._global_timings_key(), self.codec.encode({"game_id": game_id, "turn": turn, **timings}))
+        pipe.ltrim(self._global_timings_key(), 0, Config.TURN_TIMINGS_GLOBAL_KEEP - 1)
+        pipe.execute()
+
+    def get_game_turn_timings(self, game_id: str) -> List[Dict[str, Any]]:
+        """Recent turn timings of one game, oldest turn first"""
+        timings = self._decode_fields(self.raw_client.hgetall(self._timings_key(game_id)))
+        return [
+            {"game_id": game_id, "turn": int(turn), **timings[turn]}
+            for turn in sorted(timings, key=int)
+        ]
+
+    def get_recent_turn_timings(self, limit: int = None) -> List[Dict[str, Any]]:
+        """Recent turn timings across all games, newest first"""
+        limit = limit or Config.TURN_TIMINGS_GLOBAL_KEEP
+        return [codec.decode(data) for data in self.raw_client.lrange(self._global_timings_key(), 0, limit - 1)]
 
     # ==================== Player Sessions ====================
 
-    def set_player_current_game(self, player_id: str, game_id: str):
-        """Set player's current active game"""
-        key = f"player:{player_id}:current_game"
-        self.client.set(key, game_id, ex=Config.TTL_PLAYER_SESSION)
+    @staticmethod
+    def _session_bucket_key(api_key: str) -> str:
+        """
+        Bucket hash holding an API key's session: sessions:{prefix}
+
+        Buckets are small enough to stay listpack-encoded, so a session
+        costs one compact hash field instead of several keys with TTLs.
+        """
+        digest = hashlib.md5(api_key.encode()).hexdigest()
+        return f"sessions:{{{digest[:Config.SESSION_BUCKET_CHARS]}}}"
+
+    def _session(self, api_key: str, player_id: str = "", game_id: str = "") -> Optional[Tuple[str, Optional[str]]]:
+        result = self._script(SESSION_SCRIPT)(
+            keys=[self._session_bucket_key(api_key)],
+            args=[api_key, Config.TTL_PLAYER_SESSION, player_id, game_id]
+        )
+        if not result:
+            return None
+        player_id, game_id = result
+        return player_id, game_id or None
+
+    def create_session(self, api_key: str, player_id: str, game_id: str = None):
+        """Store a new session for an API key (optionally with the player's current game)"""
+        self._session(api_key, player_id=player_id, game_id=game_id or "")
+
+    def touch_session(self, api_key: str) -> Optional[Tuple[str, Optional[str]]]:
+        """
+        Read and refresh a session in one command
 
-    def get_player_current_game(self, player_id: str) -> Optional[str]:
-        """Get player's current active game"""
-        key = f"player:{player_id}:current_game"
-        return self.client.get(key)
+        Returns:
+            Tuple of (player_id, current game_id or None), or None if the
+            key is unknown or expired
+        """
+        return self._session(api_key)
+
+    def set_session_game(self, api_key: str, game_id: str) -> bool:
+        """Set the session's current game (refreshes it); False if the session expired"""
+        return self._session(api_key, game_id=game_id) is not None
+
+    def session_bucket_count(self) -> int:
+        """Number of session buckets"""
+        return 16 ** Config.SESSION_BUCKET_CHARS
+
+    def purge_expired_sessions(self, start: int, count: int) -> Tuple[int, int]:
+        """
+        Drop expired records from `count` buckets starting at bucket `start`,
+        in one pipelined round trip
+
+        Returns:
+            Tuple of (next start, wrapping to 0 after the last bucket; records purged)
+        """
+        total = self.session_bucket_count()
+        end = min(start + count, total)
+
+        pipe = self.pipeline()
+        for bucket in range(start, end):
+            prefix = format(bucket, f"0{Config.SESSION_BUCKET_CHARS}x")
+            self._queue_script(pipe, SESSION_PURGE_SCRIPT, keys=[f"sessions:{{{prefix}}}"], args=[])
+        purged = sum(pipe.execute()) if end > start else 0
+
+        return (0 if end >= total else end), purged
+
+    # ==================== Rate Limiting ====================
+
+    def take_rate_limit_token(self, client_key: str, route: str, rate: float, burst: int) -> Tuple[bool, float]:
+        """
+        Take one token from the client's bucket for a route
+
+        Returns:
+            Tuple of (allowed, seconds until a token is available)
+        """
+        key = f"ratelimit:{{{client_key}}}:{route}"
+        allowed, retry_after = self._script(TOKEN_BUCKET_SCRIPT)(keys=[key], args=[rate, burst])
+        return bool(allowed), float(retry_after)
 
     # ==================== Utility Functions ====================
 
     def game_exists(self, game_id: str) -> bool:
         """Check if game exists in Redis"""
-        key = f"game:{game_id}:meta"
+        key = game_key(game_id, "meta")
         return self.client.exists(key) > 0
 
-    def delete_game(self, game_id: str):
-        """Delete all game-related keys (cleanup)"""
-        # Find all keys related to this game
-        pattern = f"game:{game_id}:*"
-        keys = self.client.keys(pattern)
+    def delete_game(self, game_id: str, batch_size: int = None):
+        """
+        Delete all game-related keys (cleanup)
+
+        Keys are found through the game's key registry, or with an
+        incremental SCAN for games created before the registry existed,
+        and deleted in batches of `batch_size` so Redis is never blocked.
+        """
+        batch_size = batch_size or Config.SWEEP_BATCH_SIZE
+        registry_key = self._registry_key(game_id)
+        players = self.get_game_players(game_id)
+
+        if self.client.exists(registry_key):
+            keys = self.client.sscan_iter(registry_key, count=batch_size)
+        else:
+            keys = self.client.scan_iter(match=game_key(game_id, "*"), count=batch_size)
+
+        # Base keys may be missing from the registry of legacy games
+        batch = [
+            game_key(game_id, "meta"),
+            game_key(game_id, "players"),
+            game_key(game_id, "map"),
+            self._history_key(game_id)
+        ]
+        for key in keys:
+            batch.append(key)
+            if len(batch) >= batch_size:
+                self.client.delete(*batch)
+                batch = []
+
+        batch.append(registry_key)
+        self.client.delete(*batch)
 
-        if keys:
-            self.client.delete(*keys)
+        self.meta_cache.invalidate(game_id)
+        self.remove_game_from_players(game_id, players)
+        self._unindex_game(game_id)
 
 
 # Global Redis client instance
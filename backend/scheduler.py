@@ -0,0 +1,136 @@
+import asyncio
+import heapq
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+
+
+class TurnScheduler:
+    """
+    Runs claimed turns with bounded concurrency, fairly across tenants
+
+    A tenant is the player who created the game, so one client running
+    many games cannot crowd out everyone else. Each tenant has its own
+    queue, ordered by how long the game's players have been waiting
+    (a game has at most one claimed turn, so per-game fairness follows).
+    The next turn comes from the tenant with the least processing time
+    used (start-time fair queueing, so heavy games cost their tenant
+    more), except that any turn waiting longer than `max_wait` seconds
+    goes first, oldest first. At most `concurrency` turns run at once,
+    and at most `per_tenant` per tenant.
+    """
+
+    def __init__(self, process: Callable[[str, int], Awaitable[Any]], concurrency: int = None,
+                 per_tenant: int = None, max_wait: float = None):
+        self.process = process
+        self.concurrency = concurrency or Config.TURN_PROCESSING_CONCURRENCY
+        self.per_tenant = per_tenant or Config.TURN_PROCESSING_PER_TENANT
+        self.max_wait = max_wait if max_wait is not None else Config.TURN_SCHEDULER_MAX_WAIT_SECONDS
+
+        # tenant → heap of (waiting_since, sequence, game_id, turn)
+        self._queues: Dict[str, List[Tuple[float, int, str, int]]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._virtual_time: Dict[str, float] = {}
+        self._sequence = 0
+        self._ready: Optional[asyncio.Event] = None  # Created by run() on its event loop
+
+        self.processed = 0
+        self.max_queue_wait = 0.0
+
+    def submit(self, game_id: str, turn: int, tenant: str, waiting_since: float = None):
+        """
+        Queue a claimed turn
+
+        Args:
+            game_id: Game identifier
+            turn: Claimed turn
+            tenant: Player who created the game (the game_id for legacy games)
+            waiting_since: time.time() since which the players have been
+                waiting (default now)
+        """
+        if tenant not in self._queues and tenant not in self._in_flight:
+            # An idle tenant rejoins at the current virtual time instead of
+            # spending credit saved while it was idle
+            self._virtual_time[tenant] = max(self._virtual_time.get(tenant, 0.0), self._min_virtual_time())
+
+        waiting_since = waiting_since or time.time()
+        heapq.heappush(self._queues.setdefault(tenant, []), (waiting_since, self._sequence, game_id, turn))
+        self._sequence += 1
+        if self._ready:
+            self._ready.set()
+
+    def _min_virtual_time(self) -> float:
+        """Lowest virtual time among tenants with queued or running turns"""
+        active = set(self._queues) | set(self._in_flight)
+        return min((self._virtual_time[tenant] for tenant in active), default=0.0)
+
+    def _next(self) -> Optional[Tuple[str, Tuple[float, int, str, int]]]:
+        """Pop the next turn to run, or None if nothing may run now"""
+        eligible = [
+            tenant for tenant in self._queues
+            if self._in_flight.get(tenant, 0) < self.per_tenant
+        ]
+        if not eligible:
+            return None
+
+        oldest = min(eligible, key=lambda tenant: self._queues[tenant][0][0])
+        if time.time() - self._queues[oldest][0][0] >= self.max_wait:
+            tenant = oldest
+        else:
+            tenant = min(eligible, key=lambda tenant: (self._virtual_time[tenant], self._queues[tenant][0][0]))
+
+        entry = heapq.heappop(self._queues[tenant])
+        if not self._queues[tenant]:
+            del self._queues[tenant]
+        return tenant, entry
+
+    async def _worker(self):
+        """Run queued turns one at a time, forever"""
+        while True:
+            picked = self._next()
+            if picked is None:
+                self._ready.clear()
+                await self._ready.wait()
+                continue
+
+            tenant, (waiting_since, _sequence, game_id, turn) = picked
+            self.max_queue_wait = max(self.max_queue_wait, time.time() - waiting_since)
+            self._in_flight[tenant] = self._in_flight.get(tenant, 0) + 1
+            started = time.perf_counter()
+            try:
+                await self.process(game_id, turn)
+            except Exception as e:
+                print(f"Error running turn {turn} for game {game_id}: {str(e)}")
+            finally:
+                self._virtual_time[tenant] += time.perf_counter() - started
+                self._in_flight[tenant] -= 1
+                if not self._in_flight[tenant]:
+                    del self._in_flight[tenant]
+                    if tenant not in self._queues:
+                        del self._virtual_time[tenant]
+                self.processed += 1
+                # A tenant below its cap may now have work that can run
+                self._ready.set()
+
+    async def run(self):
+        """Run `concurrency` workers forever"""
+        self._ready = asyncio.Event()
+        self._ready.set()
+        await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput counters for this worker"""
+        now = time.time()
+        heads = [queue[0][0] for queue in self._queues.values()]
+        return {
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "running": sum(self._in_flight.values()),
+            "tenants_queued": len(self._queues),
+            "tenants_running": len(self._in_flight),
+            "oldest_wait_seconds": round(now - min(heads), 3) if heads else 0.0,
+            "max_queue_wait_seconds": round(self.max_queue_wait, 3),
+            "processed": self.processed,
+            "concurrency": self.concurrency,
+            "per_tenant": self.per_tenant
+        }
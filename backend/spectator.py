@@ -0,0 +1,157 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from redis_client import redis_client, RedisClient
+from models import SpectatorResponse, SpectatorTurn
+from config import Config
+
+
+class SpectatorFeed:
+    """Cached view of one game shared by every spectator served by this worker"""
+
+    def __init__(self, game_id: str):
+        self.game_id = game_id
+        self.meta: Optional[Dict[str, Any]] = None
+        self.map: Optional[Dict[str, Any]] = None
+        self.turns: "OrderedDict[int, SpectatorTurn]" = OrderedDict()
+        self.checked_at = 0.0
+        self.lock = asyncio.Lock()
+        # Rendered JSON payloads for the current turn, by (since_turn, include_map)
+        self.rendered: Dict[tuple, bytes] = {}
+
+    @property
+    def etag(self) -> str:
+        """Version of the feed; changes whenever a turn resolves or the state changes"""
+        return f'"{self.meta["current_turn"]}-{self.meta["state"]}"'
+
+
+class SpectatorCache:
+    """
+    Per-worker cache of spectator feeds
+
+    Each game's feed is refreshed at most once every SPECTATOR_REFRESH_SECONDS
+    (one meta read), and turn results are fetched once per turn, however
+    many spectators are watching. Rendered responses are reused until the
+    next turn, so serving a viewer costs no Redis round trip.
+    """
+
+    def __init__(self, client: RedisClient = None):
+        self.client = client or redis_client
+        self.feeds: "OrderedDict[str, SpectatorFeed]" = OrderedDict()
+
+    async def get_feed(self, game_id: str, include_map: bool = False) -> Optional[SpectatorFeed]:
+        """Get an up-to-date feed for a game, or None if the game does not exist"""
+        feed = self.feeds.get(game_id)
+        if feed is None:
+            feed = SpectatorFeed(game_id)
+            self.feeds[game_id] = feed
+            while len(self.feeds) > Config.SPECTATOR_MAX_GAMES:
+                self.feeds.popitem(last=False)
+        self.feeds.move_to_end(game_id)
+
+        if self._is_stale(feed) or (include_map and feed.map is None):
+            async with feed.lock:
+                # Only the first waiter refreshes; the rest reuse its result
+                if self._is_stale(feed) or (include_map and feed.map is None):
+                    loaded = await asyncio.to_thread(self._load, feed, include_map)
+                    self._swap(feed, *loaded)
+
+        if feed.meta is None:
+            self.feeds.pop(game_id, None)
+            return None
+        return feed
+
+    @staticmethod
+    def _is_stale(feed: SpectatorFeed) -> bool:
+        return time.monotonic() - feed.checked_at >= Config.SPECTATOR_REFRESH_SECONDS
+
+    def _load(self, feed: SpectatorFeed, include_map: bool) -> tuple:
+        """
+        Read meta, and any turn results not yet cached, into new objects
+
+        Runs in a worker thread, so it never touches the feed's fields;
+        _swap installs the result on the event loop.
+        """
+        # The feed is its own cache; bypass the meta cache so it is not stale twice over
+        meta = self.client.get_game_meta(feed.game_id, fresh=True)
+        checked_at = time.monotonic()
+        game_map, turns = feed.map, OrderedDict(feed.turns)
+        if meta is None:
+            return meta, game_map, turns, checked_at
+
+        if include_map and game_map is None:
+            # The header alone for chunked maps: spectators fetch their chunks
+            game_map = self.client.get_game_map(feed.game_id, with_hexes=False)
+
+        # Results exist for every turn before current_turn (and for it once complete)
+        last_turn = meta["current_turn"] if meta["state"] == "complete" else meta["current_turn"] - 1
+        first_turn = max(0, last_turn - Config.SPECTATOR_HISTORY_TURNS + 1)
+        if turns:
+            first_turn = max(first_turn, next(reversed(turns)) + 1)
+
+        for turn in range(first_turn, last_turn + 1):
+            results = self.client.get_turn_results(feed.game_id, turn)
+            if results is None:
+                break
+            turns[turn] = SpectatorTurn(
+                turn=turn,
+                updates=results.get("updates", []),
+                events=results.get("events", [])
+            )
+
+        while len(turns) > Config.SPECTATOR_HISTORY_TURNS:
+            turns.popitem(last=False)
+        return meta, game_map, turns, checked_at
+
+    @staticmethod
+    def _swap(feed: SpectatorFeed, meta, game_map, turns, checked_at: float):
+        """
+        Install a loaded refresh in one step
+
+        Called on the event loop, where render() also runs, so readers see
+        either the old feed or the new one, never a mix.
+        """
+        if meta != feed.meta:
+            feed.rendered = {}
+        feed.meta, feed.map, feed.turns = meta, game_map, turns
+        feed.checked_at = checked_at
+
+    @staticmethod
+    def _window_start(feed: SpectatorFeed, since_turn: Optional[int]) -> Optional[int]:
+        """
+        Clamp since_turn to the turns the feed keeps
+
+        None stands for every kept turn; values past the newest turn all
+        select none. So a feed has at most SPECTATOR_HISTORY_TURNS + 2
+        variants per include_map, whatever clients send.
+        """
+        if since_turn is None or not feed.turns or since_turn <= next(iter(feed.turns)):
+            return None
+        return min(since_turn, next(reversed(feed.turns)) + 1)
+
+    @classmethod
+    def render(cls, feed: SpectatorFeed, since_turn: Optional[int], include_map: bool) -> bytes:
+        """JSON payload for a spectator request, rendered once per turn per variant"""
+        since_turn = cls._window_start(feed, since_turn)
+        cache_key = (since_turn, include_map)
+        payload = feed.rendered.get(cache_key)
+        if payload is None:
+            turns = [t for t in feed.turns.values() if since_turn is None or t.turn >= since_turn]
+            payload = SpectatorResponse(
+                game_id=feed.game_id,
+                state=feed.meta["state"],
+                current_turn=feed.meta["current_turn"],
+                player_count=feed.meta["player_count"],
+                max_players=feed.meta["max_players"],
+                oldest_turn=next(iter(feed.turns)) if feed.turns else None,
+                turns=turns,
+                map=feed.map if include_map else None
+            ).model_dump_json().encode()
+            feed.rendered[cache_key] = payload
+        return payload
+
+
+# Global spectator cache instance (one per worker process)
+spectator_cache = SpectatorCache()
@@ -0,0 +1,83 @@
+import asyncio
+import time
+from typing import Dict
+from redis_client import redis_client, RedisClient, GAME_STATES
+from config import Config
+
+
+class GameSweeper:
+    """
+    Incremental background garbage collector for game keys
+
+    Each pass does a bounded amount of work:
+    - Scans the next slice of every state index (ZSCAN), dropping entries
+      for games whose keys have expired
+    - Compacts old turn keys of in-progress games into their history snapshot
+    - Makes sure every game in processing_turn has a processing lease
+    - Deletes completed games past their grace period (and exported, when
+      EXPORT_COMPLETED_GAMES is on), in bounded batches
+    - Purges expired records from the next slice of session buckets
+    """
+
+    def __init__(self, client: RedisClient = None, batch_size: int = None, interval: int = None):
+        self.client = client or redis_client
+        self.batch_size = batch_size or Config.SWEEP_BATCH_SIZE
+        self.interval = interval or Config.SWEEP_INTERVAL_SECONDS
+        self._cursors = {state: 0 for state in GAME_STATES}
+        self._session_bucket = 0
+
+    def sweep_once(self) -> Dict[str, int]:
+        """Run one bounded sweep pass and return counters for what was done"""
+        stats = {"pruned": 0, "compacted_turns": 0, "deleted_games": 0, "purged_sessions": 0}
+
+        for state in GAME_STATES:
+            cursor, game_ids = self.client.iter_state_index(
+                state, cursor=self._cursors[state], count=self.batch_size
+            )
+            self._cursors[state] = cursor
+
+            live = self.client.prune_state_index(state, game_ids)
+            stats["pruned"] += len(game_ids) - len(live)
+
+            if state == "in_progress":
+                for game_id in live:
+                    stats["compacted_turns"] += self.client.compact_game_turns(game_id)
+
+            # Turns claimed before processing leases existed have none; give
+            # them one so the deadline scheduler takes them over when it expires
+            if state == "processing_turn":
+                for game_id in live:
+                    self.client.set_processing_lease(
+                        game_id, time.time() + Config.TURN_PROCESSING_LEASE_SECONDS, only_if_missing=True
+                    )
+
+        # Completed games are removed once their results have had time to be
+        # read, and, with exports on, once exported (or TTL_UNEXPORTED_GAME old)
+        now = time.time()
+        cutoff = now - Config.TTL_COMPLETED_GAME
+        if Config.EXPORT_COMPLETED_GAMES:
+            cutoff = max(min(cutoff, self.client.get_export_watermark()), now - Config.TTL_UNEXPORTED_GAME)
+        for game_id in self.client.get_completed_games(cutoff, limit=self.batch_size):
+            self.client.delete_game(game_id, batch_size=self.batch_size)
+            stats["deleted_games"] += 1
+
+        # Expired session records are also dropped lazily when read
+        self._session_bucket, stats["purged_sessions"] = self.client.purge_expired_sessions(
+            self._session_bucket, Config.SESSION_PURGE_BUCKETS_PER_SWEEP
+        )
+
+        return stats
+
+    async def run(self):
+        """Run sweep passes forever, one every `interval` seconds"""
+        while True:
+            try:
+                await asyncio.to_thread(self.sweep_once)
+            except Exception as e:
+                print(f"Error during game sweep: {str(e)}")
+
+            await asyncio.sleep(self.interval)
+
+
+# Global sweeper instance
+game_sweeper = GameSweeper()
@@ -0,0 +1,190 @@
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from config import Config
+
+
+# Defaults for terrain_data keys
+DEFAULT_TERRAIN = {
+    "water_ratio": 0.12,   # Fraction of hexes that are water
+    "forest_ratio": 0.2,   # Fraction of land hexes that are forest
+    "scale": 8.0,          # Feature size of the noise, in hexes
+    "octaves": 3,          # Noise layers summed at halving scale
+    "spawn_count": 4,      # Number of spawn points
+    "spawn_radius": 2,     # Hexes around each spawn forced to open grass
+}
+
+
+def _value_noise(rng: np.random.Generator, width: int, height: int, scale: float, octaves: int) -> np.ndarray:
+    """
+    Fractal value noise over a width x height grid, normalised to [0, 1)
+
+    Each octave is a random lattice bilinearly interpolated (with smoothstep
+    easing) over the whole grid in one broadcast operation.
+    """
+    q = np.arange(width, dtype=np.float64)[:, None]
+    r = np.arange(height, dtype=np.float64)[None, :]
+    total = np.zeros((width, height))
+    amplitude = 1.0
+
+    for _ in range(octaves):
+        step = max(scale, 1.0)
+        lattice = rng.random((int(width / step) + 2, int(height / step) + 2))
+
+        fq, fr = q / step, r / step
+        iq, ir = fq.astype(np.intp), fr.astype(np.intp)
+        tq, tr = fq - iq, fr - ir
+        tq = tq * tq * (3 - 2 * tq)
+        tr = tr * tr * (3 - 2 * tr)
+
+        top = lattice[iq, ir] * (1 - tq) + lattice[iq + 1, ir] * tq
+        bottom = lattice[iq, ir + 1] * (1 - tq) + lattice[iq + 1, ir + 1] * tq
+        total += amplitude * (top * (1 - tr) + bottom * tr)
+
+        amplitude *= 0.5
+        scale /= 2
+
+    return (total - total.min()) / (np.ptp(total) + 1e-12)
+
+
+def _spawn_points(width: int, height: int, count: int, inset: int) -> List[Tuple[int, int]]:
+    """Spread spawn points evenly around the map border, inset from the edge"""
+    inset = min(inset, (width - 1) // 4, (height - 1) // 4)
+    q_min, q_max = min(inset, width - 1), max(width - 1 - inset, 0)
+    r_min, r_max = min(inset, height - 1), max(height - 1 - inset, 0)
+
+    # Corners first, then edge midpoints, for up to 8 balanced positions
+    candidates = [
+        (q_min, r_min), (q_max, r_max), (q_max, r_min), (q_min, r_max),
+        ((q_min + q_max) // 2, r_min), ((q_min + q_max) // 2, r_max),
+        (q_min, (r_min + r_max) // 2), (q_max, (r_min + r_max) // 2),
+    ]
+    return candidates[:count]
+
+
+class MapCache:
+    """
+    Generated maps kept for reuse, bounded by their total number of hexes
+
+    Least recently used maps are dropped first; a map larger than the whole
+    budget is never kept.
+    """
+
+    def __init__(self, max_hexes: int = None):
+        self.max_hexes = Config.TERRAIN_CACHE_MAX_HEXES if max_hexes is None else max_hexes
+        self.hexes = 0
+        self._entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> Dict[str, Any]:
+        """Cached map for `key`, or None"""
+        with self._lock:
+            map_data = self._entries.get(key)
+            if map_data is not None:
+                self._entries.move_to_end(key)
+            return map_data
+
+    def put(self, key: tuple, map_data: Dict[str, Any]):
+        """Keep a map, evicting the least recently used ones over budget"""
+        size = len(map_data["hexes"])
+        if size > self.max_hexes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = map_data
+            self.hexes += size
+            while self.hexes > self.max_hexes:
+                _key, evicted = self._entries.popitem(last=False)
+                self.hexes -= len(evicted["hexes"])
+
+
+# Maps generated from an explicit seed (random seeds are never asked for again)
+_map_cache = MapCache()
+
+
+def _generate(seed: int, width: int, height: int, params: Tuple[Tuple[str, Any], ...]) -> Dict[str, Any]:
+    """Generate a terrain map; see generate_terrain_map"""
+    options = dict(DEFAULT_TERRAIN, **dict(params))
+    rng = np.random.default_rng(seed)
+
+    elevation = _value_noise(rng, width, height, float(options["scale"]), int(options["octaves"]))
+    moisture = _value_noise(rng, width, height, float(options["scale"]), int(options["octaves"]))
+
+    # Thresholds from quantiles so the requested ratios are met exactly
+    water = elevation < np.quantile(elevation, options["water_ratio"])
+    land_moisture = np.where(water, -1.0, moisture)
+    forest_cutoff = np.quantile(moisture[~water], 1 - options["forest_ratio"]) if (~water).any() else 2.0
+    forest = land_moisture >= forest_cutoff
+
+    # Spawn balancing: every spawn gets the same open grass area around it
+    radius = int(options["spawn_radius"])
+    spawns = _spawn_points(width, height, int(options["spawn_count"]), radius)
+    q = np.arange(width)[:, None]
+    r = np.arange(height)[None, :]
+    for sq, sr in spawns:
+        dq, dr = q - sq, r - sr
+        near = (np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2 <= radius
+        water &= ~near
+        forest &= ~near
+
+    terrain = np.where(water, "water", np.where(forest, "forest", "grass"))
+
+    hexes = [
+        {"q": hq, "r": hr, "terrain": t, "passable": t != "water", "occupied_by": None}
+        for hq, hr, t in zip(
+            np.repeat(np.arange(width), height).tolist(),
+            np.tile(np.arange(height), width).tolist(),
+            terrain.ravel().tolist()
+        )
+    ]
+
+    return {
+        "width": width,
+        "height": height,
+        "seed": seed,
+        "hexes": hexes,
+        "spawn_points": [
+            {"q": sq, "r": sr, "player_slot": slot}
+            for slot, (sq, sr) in enumerate(spawns, start=1)
+        ]
+    }
+
+
+def generate_terrain_map(width: int, height: int, terrain_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Generate a seeded, noise-based hex map
+
+    Maps generated from an explicit seed are cached by (seed, width,
+    height, params), up to TERRAIN_CACHE_MAX_HEXES hexes in all, so repeat
+    configurations are free. The returned map may be shared between
+    callers and must be treated as read-only.
+
+    Args:
+        width: Map width in hexes
+        height: Map height in hexes
+        terrain_data: Terrain configuration: seed (random if omitted) plus any
+            of the DEFAULT_TERRAIN keys
+
+    Returns:
+        Map data structure (same layout as generate_default_map, plus seed)
+    """
+    params = tuple(sorted(
+        (key, terrain_data[key]) for key in DEFAULT_TERRAIN if terrain_data.get(key) is not None
+    ))
+
+    seed = terrain_data.get("seed")
+    if seed is None:
+        return _generate(random.getrandbits(32), width, height, params)
+
+    key = (int(seed), width, height, params)
+    map_data = _map_cache.get(key)
+    if map_data is None:
+        map_data = _generate(*key)
+        _map_cache.put(key, map_data)
+    return map_data
@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""
+Parallel tournament runner for server-side bot strategies
+
+Plays round-robin or single-elimination series of bot-vs-bot games through
+the normal game lifecycle (lobby create/join, move recording, process_turn),
+one game per worker process at a time, and reports Elo ratings, per-game
+timings and total games per hour. Games are played in their own Redis
+(--redis-url, default TOURNAMENT_REDIS_URL), never the game server's.
+
+Usage:
+    python tournament.py                                   # Round robin, all strategies
+    python tournament.py --format bracket --turns 30
+    python tournament.py --entrants random rusher --rounds 50 --workers 16
+"""
+
+import argparse
+import asyncio
+import itertools
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Any, Dict, List
+
+from config import Config
+from models import MapConfig
+from redis_client import redis_client
+from bots import STRATEGIES, build_map_view, compute_game_moves
+from turns import record_moves, process_turn
+import lobby
+import units
+
+
+# Points per game outcome used to decide the winner of a game: per enemy
+# unit killed, per point of damage dealt, per own unit alive at the end,
+# and for the winner (last player with units, or most units then health left)
+OUTCOME_POINTS = {
+    "kill": 10.0,
+    "damage": 0.1,
+    "survivor": 5.0,
+    "win": 25.0,
+}
+
+
+# ==================== Scoring ====================
+
+class MatchScore:
+    """
+    Scores the outcome of one game as the game logic resolved it
+
+    Kills and damage are tallied from each turn's attack_hit and
+    unit_destroyed events (game_logic.resolve_combat); survivors and
+    health left are read from the game's unit table at the end.
+    """
+
+    def __init__(self, players: List[str]):
+        self.damage = {player_id: 0 for player_id in players}
+        self.kills = {player_id: 0 for player_id in players}
+
+    def record(self, events: List[Dict[str, Any]]):
+        """Tally a turn's combat events"""
+        for event in events:
+            if event.get("type") == "attack_hit" and event.get("player_id") in self.damage:
+                self.damage[event["player_id"]] += event["damage"]
+            elif event.get("type") == "unit_destroyed" and event.get("destroyed_by") in self.kills:
+                self.kills[event["destroyed_by"]] += 1
+
+    def scores(self, table: units.UnitTable) -> Dict[str, float]:
+        """Outcome score per player (see OUTCOME_POINTS)"""
+        owner, health = table.columns["owner"], table.columns["health"]
+        survivors, health_left = {}, {}
+        for slot, player_id in enumerate(table.owners, start=1):
+            if player_id in self.damage:
+                alive = (owner == slot) & (health > 0)
+                survivors[player_id] = int(alive.sum())
+                health_left[player_id] = int(health[alive].sum())
+
+        scores = {
+            player_id: (self.kills[player_id] * OUTCOME_POINTS["kill"] +
+                        self.damage[player_id] * OUTCOME_POINTS["damage"] +
+                        survivors[player_id] * OUTCOME_POINTS["survivor"])
+            for player_id in survivors
+        }
+
+        ranked = sorted(scores, key=lambda player_id: (survivors[player_id], health_left[player_id]), reverse=True)
+        if len(ranked) == 1 or (survivors[ranked[0]], health_left[ranked[0]]) != (survivors[ranked[1]], health_left[ranked[1]]):
+            scores[ranked[0]] += OUTCOME_POINTS["win"]
+        return scores
+
+
+# ==================== Playing Games ====================
+
+async def _play_match(entrants: List[str], max_turns: int, width: int, height: int) -> Dict[str, Any]:
+    """Play one game between strategies and return its scores and timings"""
+    start = time.perf_counter()
+
+    created = lobby.create_game(len(entrants), MapConfig(width=width, height=height))
+    game_id = created.game_id
+    players = [created.creator_player_id]
+    for _ in entrants[1:]:
+        players.append(lobby.join_game(game_id).player_id)
+
+    strategy_of = dict(zip(players, entrants))
+    map_view = build_map_view(redis_client.get_game_map(game_id))
+    score = MatchScore(players)
+    setup_done = time.perf_counter()
+
+    turns_played = 0
+    for turn in range(max_turns):
+        table = units.load(redis_client.get_units(game_id))
+        view = dict(map_view, game_id=game_id, turn=turn, players=players, units=table.to_units())
+        claimed = False
+        for player_id, moves in compute_game_moves(view, list(strategy_of.items())).items():
+            _moves_submitted, player_claimed = record_moves(game_id, turn, player_id, moves, len(players))
+            claimed = claimed or player_claimed
+
+        if not claimed:
+            raise RuntimeError(f"Turn {turn} of {game_id} was not claimed for processing")
+
+        await process_turn(game_id, turn, settle_delay=0)
+        turns_played += 1
+
+        score.record((redis_client.get_turn_results(game_id, turn) or {}).get("events", []))
+
+        # The game logic completes the game once one player has units left
+        if redis_client.get_game_meta(game_id, fresh=True)["state"] == "complete":
+            break
+
+    scores = score.scores(units.load(redis_client.get_units(game_id)))
+
+    # Finish games stopped at the turn limit so the deadline scheduler leaves them alone
+    redis_client.update_game_state(game_id, "complete")
+    redis_client.clear_turn_deadline(game_id)
+    end = time.perf_counter()
+
+    return {
+        "game_id": game_id,
+        "entrants": entrants,
+        # By seat, like entrants, so a strategy playing itself keeps both scores
+        "scores": [scores[player_id] for player_id in players],
+        "turns": turns_played,
+        "timings": {
+            "setup": setup_done - start,
+            "play": end - setup_done,
+            "total": end - start,
+            "per_turn": (end - setup_done) / max(turns_played, 1)
+        }
+    }
+
+
+def use_redis(redis_url: str):
+    """Pool worker initializer: play games in the tournament's Redis"""
+    redis_client.connect_to(redis_url)
+
+
+def play_match(entrants: List[str], max_turns: int, width: int, height: int) -> Dict[str, Any]:
+    """Play one game (entry point for pool workers)"""
+    return asyncio.run(_play_match(entrants, max_turns, width, height))
+
+
+def match_winner(result: Dict[str, Any]):
+    """Entrant with the unique highest score, or None for a draw"""
+    ranked = sorted(zip(result["entrants"], result["scores"]), key=lambda item: item[1], reverse=True)
+    if len(ranked) > 1 and ranked[0][1] == ranked[1][1]:
+        return None
+    return ranked[0][0]
+
+
+# ==================== Ratings ====================
+
+class EloRatings:
+    """Elo ratings updated pairwise from game scores (multi-player games count every pair)"""
+
+    def __init__(self, entrants: List[str], k: float = 32.0, initial: float = 1500.0):
+        self.k = k
+        self.ratings = {entrant: initial for entrant in entrants}
+        self.record = {entrant: {"wins": 0, "draws": 0, "losses": 0} for entrant in entrants}
+
+    def update(self, result: Dict[str, Any]):
+        """Apply one game's result (seats of the same entrant are not rated against each other)"""
+        seats = list(zip(result["entrants"], result["scores"]))
+        k = self.k / max(len(seats) - 1, 1)
+        deltas = {entrant: 0.0 for entrant, _score in seats}
+
+        for (a, score_a), (b, score_b) in itertools.combinations(seats, 2):
+            if a == b:
+                continue
+            expected_a = 1 / (1 + 10 ** ((self.ratings[b] - self.ratings[a]) / 400))
+            actual_a = 1.0 if score_a > score_b else 0.5 if score_a == score_b else 0.0
+            deltas[a] += k * (actual_a - expected_a)
+            deltas[b] -= k * (actual_a - expected_a)
+
+        for entrant, delta in deltas.items():
+            self.ratings[entrant] += delta
+
+        winner = match_winner(result)
+        for entrant in deltas:
+            if winner is None:
+                self.record[entrant]["draws"] += 1
+            elif entrant == winner:
+                self.record[entrant]["wins"] += 1
+            else:
+                self.record[entrant]["losses"] += 1
+
+    def standings(self) -> List[str]:
+        """Entrants ordered by rating, best first"""
+        return sorted(self.ratings, key=self.ratings.get, reverse=True)
+
+
+# ==================== Formats ====================
+
+def run_games(pool: ProcessPoolExecutor, pairings: List[List[str]], args, ratings: EloRatings) -> List[Dict[str, Any]]:
+    """Play a set of independent games in parallel, rating them in completion order"""
+    futures = [pool.submit(play_match, entrants, args.turns, args.width, args.height) for entrants in pairings]
+    results = []
+    for future in as_completed(futures):
+        result = future.result()
+        ratings.update(result)
+        results.append(result)
+    return results
+
+
+def run_round_robin(pool: ProcessPoolExecutor, args, ratings: EloRatings) -> List[Dict[str, Any]]:
+    """Every group of `players` entrants meets `rounds` times, alternating seats"""
+    groups = list(itertools.combinations(args.entrants, args.players))
+    pairings = [
+        list(group) if r % 2 == 0 else list(reversed(group))
+        for r in range(args.rounds)
+        for group in groups
+    ]
+    return run_games(pool, pairings, args, ratings)
+
+
+def run_bracket(pool: ProcessPoolExecutor, args, ratings: EloRatings) -> List[Dict[str, Any]]:
+    """Single elimination seeded by rating; draws go to the higher-rated entrant"""
+    remaining = ratings.standings()
+    results = []
+
+    while len(remaining) > 1:
+        # Top seed gets the bye when the field is odd
+        advancing = [remaining.pop(0)] if len(remaining) % 2 else []
+        pairings = [[remaining[i], remaining[-1 - i]] for i in range(len(remaining) // 2)]
+        round_results = run_games(pool, pairings, args, ratings)
+
+        for result in round_results:
+            winner = match_winner(result) or max(result["entrants"], key=ratings.ratings.get)
+            advancing.append(winner)
+        results.extend(round_results)
+        remaining = sorted(advancing, key=ratings.ratings.get, reverse=True)
+
+    print(f"Champion: {remaining[0]}")
+    return results
+
+
+# ==================== Report ====================
+
+def print_report(results: List[Dict[str, Any]], ratings: EloRatings, elapsed: float):
+    """Print standings and throughput"""
+    totals = [result["timings"]["total"] for result in results]
+    per_turn = [result["timings"]["per_turn"] for result in results]
+
+    print(f"\n{'Entrant':<16}{'Rating':>8}{'W':>6}{'D':>6}{'L':>6}")
+    for entrant in ratings.standings():
+        record = ratings.record[entrant]
+        print(f"{entrant:<16}{ratings.ratings[entrant]:>8.0f}{record['wins']:>6}{record['draws']:>6}{record['losses']:>6}")
+
+    print(f"\nGames played:     {len(results)}")
+    print(f"Wall time:        {elapsed:.2f}s")
+    print(f"Games per hour:   {len(results) / elapsed * 3600:,.0f}")
+    if results:
+        print(f"Game time:        mean {statistics.mean(totals) * 1000:.1f} ms, max {max(totals) * 1000:.1f} ms")
+        print(f"Turn time:        mean {statistics.mean(per_turn) * 1000:.2f} ms")
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--format", choices=["round-robin", "bracket"], default="round-robin")
+    parser.add_argument("--entrants", nargs="+", choices=sorted(STRATEGIES), default=sorted(STRATEGIES))
+    parser.add_argument("--players", type=int, default=2, help="Players per game (round robin)")
+    parser.add_argument("--rounds", type=int, default=10, help="Times each group meets (round robin)")
+    parser.add_argument("--turns", type=int, default=20, help="Turn limit per game")
+    parser.add_argument("--width", type=int, default=15)
+    parser.add_argument("--height", type=int, default=15)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--redis-url", default=Config.TOURNAMENT_REDIS_URL,
+                        help="Redis to play in (default TOURNAMENT_REDIS_URL); must not be REDIS_URL")
+    args = parser.parse_args()
+
+    if args.redis_url == Config.REDIS_URL:
+        parser.error("refusing to play tournament games in the game server's Redis (REDIS_URL); "
+                     "pass another --redis-url")
+
+    ratings = EloRatings(args.entrants)
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.workers, initializer=use_redis, initargs=(args.redis_url,)) as pool:
+        if args.format == "bracket":
+            results = run_bracket(pool, args, ratings)
+        else:
+            results = run_round_robin(pool, args, ratings)
+
+    print_report(results, ratings, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
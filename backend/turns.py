@@ -0,0 +1,288 @@
+import asyncio
+import time
+import uuid
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+from redis_client import redis_client
+from game_logic import calculate_turn_results, check_win_condition, resolve_combat
+from bots import compute_bot_moves
+from config import Config
+from metrics import TurnTimer
+from scheduler import TurnScheduler
+import units
+
+
+# Strong references to in-flight tasks so they are not garbage collected
+_processing_tasks = set()
+
+# When each claimed turn was claimed, for process_turn's queue timing
+_claimed_at: Dict[Tuple[str, int], float] = {}
+
+# Lease token of each turn claimed by this worker, needed to finish it
+_leases: Dict[Tuple[str, int], str] = {}
+
+
+def open_turn(game_id: str, turn: int):
+    """
+    Open a turn for move submission
+
+    - Arms the turn deadline so a stalled turn is resolved by the deadline scheduler
+    - Marks the move as due in every human player's games index
+    - Starts computing moves for any server-hosted bots in the game
+    """
+    due_at = time.time() + Config.TURN_TIMEOUT_SECONDS
+    redis_client.set_turn_deadline(game_id, due_at)
+
+    bots = redis_client.get_game_bots(game_id)
+    players = redis_client.get_game_players(game_id)
+    redis_client.set_moves_due(game_id, turn, [player_id for player_id in players if player_id not in bots])
+
+    if bots:
+        _spawn(play_bot_turn(game_id, turn, bots))
+
+
+def retry_delay(failures: int) -> float:
+    """Seconds before a turn that failed `failures` times in a row is retried"""
+    return min(Config.TURN_RETRY_BASE_SECONDS * 2 ** (failures - 1), Config.TURN_RETRY_MAX_SECONDS)
+
+
+def record_moves(game_id: str, turn: int, player_id: str,
+                 moves: List[Dict[str, Any]], moves_required: int,
+                 idempotency_key: str = None) -> Tuple[int, bool]:
+    """
+    Store a player's moves for a turn
+
+    `moves` must already be in compact form (see models.compact_move). An
+    `idempotency_key` is recorded with the moves (see
+    RedisClient.store_move).
+
+    Returns:
+        Tuple of (moves submitted so far, whether this call claimed turn
+        processing). The caller must run process_turn when the claim is True.
+    """
+    move_data = {
+        "turn": turn,
+        "moves": moves,
+        "submitted_at": datetime.utcnow().isoformat()
+    }
+    redis_client.store_move(game_id, turn, player_id, move_data, idempotency_key)
+    return claim_if_complete(game_id, turn, moves_required)
+
+
+def claim_if_complete(game_id: str, turn: int, moves_required: int) -> Tuple[int, bool]:
+    """
+    Claim turn processing if every move of the turn is in
+
+    Returns:
+        Tuple of (moves submitted so far, whether this call claimed turn
+        processing), as record_moves
+    """
+    moves_submitted = redis_client.count_turn_moves(game_id, turn)
+    claimed = moves_submitted >= moves_required and begin_processing(game_id, turn)
+    return moves_submitted, claimed
+
+
+def record_moves_batch(submissions: List[Tuple[str, int, str, List[Dict[str, Any]], int]]) -> List[Tuple[bool, int, bool]]:
+    """
+    Store many players' moves in one pipelined round trip
+
+    `submissions` are (game_id, turn, player_id, moves, moves_required),
+    moves in compact form.
+
+    Returns:
+        (stored, moves submitted so far, claimed) per submission; stored is
+        False if the player had already submitted for that turn. The caller
+        must run process_turn for every claimed turn.
+    """
+    submitted_at = datetime.utcnow().isoformat()
+    stored = redis_client.store_moves_batch([
+        (game_id, turn, player_id, {"turn": turn, "moves": moves, "submitted_at": submitted_at})
+        for game_id, turn, player_id, moves, _moves_required in submissions
+    ])
+
+    results = []
+    for (game_id, turn, _player_id, _moves, moves_required), (was_stored, moves_submitted) in zip(submissions, stored):
+        claimed = was_stored and moves_submitted >= moves_required and begin_processing(game_id, turn)
+        results.append((was_stored, moves_submitted, claimed))
+    return results
+
+
+async def play_bot_turn(game_id: str, turn: int, bots: Dict[str, str]):
+    """
+    Compute and submit moves for the server-hosted bots of a game
+
+    Moves are computed in the bot worker pool and recorded directly,
+    without going through HTTP or API key authentication.
+    """
+    try:
+        bot_moves = await compute_bot_moves(game_id, turn, bots)
+
+        meta = redis_client.get_game_meta(game_id, fresh=True)
+        if not meta or meta["current_turn"] != turn:
+            return
+
+        for player_id, moves in bot_moves.items():
+            _moves_submitted, claimed = record_moves(game_id, turn, player_id, moves, meta["player_count"])
+            if claimed:
+                schedule_processing(game_id, turn)
+
+    except Exception as e:
+        print(f"Error playing bot turn {turn} for game {game_id}: {str(e)}")
+
+
+def begin_processing(game_id: str, turn: int, take_over: bool = False) -> bool:
+    """
+    Claim processing of a turn
+
+    Returns True for exactly one caller per turn; that caller must then
+    run process_turn for it. The claim is a lease: it expires
+    TURN_PROCESSING_LEASE_SECONDS after the claim (renewed when processing
+    starts), and the deadline scheduler then takes the turn over
+    (`take_over`), so a worker that dies with claimed turns in its queue
+    cannot leave them stuck in processing_turn.
+    """
+    lease = uuid.uuid4().hex
+    expires_at = time.time() + Config.TURN_PROCESSING_LEASE_SECONDS
+    if not redis_client.begin_turn_processing(game_id, turn, lease, expires_at, take_over=take_over):
+        return False
+
+    _leases[(game_id, turn)] = lease
+    _claimed_at[(game_id, turn)] = time.time()
+    redis_client.set_processing_lease(game_id, expires_at)
+    redis_client.clear_turn_deadline(game_id)
+    return True
+
+
+def _spawn(coro):
+    """Run a coroutine as a task on the running event loop, keeping a reference to it"""
+    task = asyncio.create_task(coro)
+    _processing_tasks.add(task)
+    task.add_done_callback(_processing_tasks.discard)
+
+
+def schedule_processing(game_id: str, turn: int, tenant: str = None):
+    """
+    Queue a claimed turn on the worker's turn scheduler
+
+    The turn is queued after TURN_SETTLE_DELAY, so moves still in flight
+    are stored without holding a processing slot. `tenant` is the game's
+    creator (looked up when not given; the game_id for legacy games).
+    Must be called from the event loop.
+    """
+    if tenant is None:
+        meta = redis_client.get_game_meta(game_id)
+        tenant = meta.get("tenant") if meta else None
+
+    asyncio.get_running_loop().call_later(
+        Config.TURN_SETTLE_DELAY, turn_scheduler.submit,
+        game_id, turn, tenant or game_id, _claimed_at.get((game_id, turn))
+    )
+
+
+@lru_cache(maxsize=64)
+def _passable_grid(game_id: str):
+    """Where a game's units may move (units.passable_grid), built once per worker: maps never change"""
+    return units.passable_grid(redis_client.get_game_map(game_id))
+
+
+async def process_turn(game_id: str, turn: int, settle_delay: float = None):
+    """
+    Background task to process a turn
+
+    - Fetches all moves
+    - Calls game logic to calculate results
+    - Applies them to the game's unit table (units.UnitTable) column-wise,
+      then resolves combat (game_logic.resolve_combat) on it
+    - Stores results and the unit table in Redis, unless the turn was
+      taken over by another worker (this one outlived its lease)
+    - Increments turn counter and updates game state, again only while
+      holding the lease
+    - Records stage timings (see metrics.STAGES): the stages up to
+      calculate are attached to the results as "timings", and every stage
+      goes to the game's and the global timings windows
+
+    `settle_delay` (default TURN_SETTLE_DELAY) is waited first so moves
+    still in flight are stored; in-process callers that already stored
+    every move can pass 0.
+    """
+    timer = TurnTimer(_claimed_at.pop((game_id, turn), None))
+    lease = _leases.pop((game_id, turn), None)
+    try:
+        # Small delay to ensure all moves are stored
+        with timer.stage("settle"):
+            await asyncio.sleep(Config.TURN_SETTLE_DELAY if settle_delay is None else settle_delay)
+
+        # Fetch all moves and the unit table for this turn
+        with timer.stage("fetch"):
+            moves = redis_client.get_turn_moves(game_id, turn)
+            unit_table = units.load(redis_client.get_units(game_id), writable=True)
+
+        # Calculate turn results using game logic (games started before
+        # unit tables existed have none)
+        with timer.stage("calculate"):
+            results = calculate_turn_results(moves, game_id)
+            if unit_table is not None:
+                units.apply_updates(unit_table, results["updates"], _passable_grid(game_id))
+                combat = resolve_combat(unit_table, results["events"])
+                results["updates"].extend(combat["updates"])
+                results["events"].extend(combat["events"])
+
+        if not redis_client.holds_turn_processing(game_id, lease):
+            print(f"Turn {turn} for game {game_id} was taken over; dropping its results")
+            return
+
+        # Store results
+        results["timings"] = timer.as_dict()
+        with timer.stage("store"):
+            redis_client.store_turn_results(game_id, turn, results)
+            if unit_table is not None:
+                redis_client.store_units(game_id, unit_table.to_bytes())
+
+        # Check win condition
+        with timer.stage("win_check"):
+            game_complete = check_win_condition(game_id, unit_table)
+
+        redis_client.record_turn_timings(game_id, turn, timer.as_dict())
+
+        if game_complete:
+            # Game is complete
+            redis_client.finish_turn_processing(game_id, turn, lease, "complete", advance=False)
+        else:
+            # Increment turn and continue game
+            next_turn = redis_client.finish_turn_processing(game_id, turn, lease, "in_progress", advance=True)
+            if next_turn is not None:
+                open_turn(game_id, next_turn)
+
+    except Exception as e:
+        # Log error and update game state
+        print(f"Error processing turn {turn} for game {game_id}: {str(e)}")
+
+        # Set game back to in_progress and re-arm only the deadline, with
+        # backoff, so the deadline scheduler retries the turn; re-opening it
+        # would mark submitted moves as due again and replay bots at once
+        if redis_client.finish_turn_processing(game_id, turn, lease, "in_progress", advance=False) is not None:
+            failures = redis_client.record_turn_failure(game_id)
+            redis_client.set_turn_deadline(game_id, time.time() + retry_delay(failures))
+
+
+async def _process_scheduled_turn(game_id: str, turn: int):
+    """
+    Process a turn from the scheduler (the settle delay was waited before
+    queueing), renewing its lease first for time spent queued
+
+    A turn whose lease expired while queued and was taken over by another
+    worker is skipped: renewing would extend the new holder's lease.
+    """
+    lease = _leases.get((game_id, turn))
+    if not redis_client.renew_turn_processing(game_id, lease, time.time() + Config.TURN_PROCESSING_LEASE_SECONDS):
+        _leases.pop((game_id, turn), None)
+        _claimed_at.pop((game_id, turn), None)
+        print(f"Turn {turn} for game {game_id} was taken over while queued; skipping it")
+        return
+    await process_turn(game_id, turn, settle_delay=0)
+
+
+# Global turn scheduler instance (started with the application)
+turn_scheduler = TurnScheduler(_process_scheduled_turn)
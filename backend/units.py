@@ -0,0 +1,240 @@
+"""
+Per-game unit table
+
+A game's units are kept as a structure of arrays: one NumPy column per
+field (COLUMNS), stored together as one binary blob in game:{game_id}:units.
+Loading wraps the blob without copying or parsing per unit, turn
+resolution works on whole columns, and the table is written back with one
+SET.
+
+Blob layout (little-endian):
+    MAGIC | uint32 unit count | uint32 owners byte length |
+    owners (player_id of each spawn slot, "\\n"-joined, UTF-8) |
+    each column in COLUMNS order, every section padded to 8 bytes
+
+A unit is identified by its owner's spawn slot and its index among that
+player's units; its public unit_id is "{player_id}_unit_{id}", as created
+by game_logic.initialize_player_units.
+"""
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from game_logic import initialize_player_units, spawn_point_for_slot
+
+
+MAGIC = b"SOA1"
+_HEADER = struct.Struct("<4sII")
+_ALIGN = 8
+
+# (column, dtype) in blob order
+COLUMNS = (
+    ("id", np.dtype("<i4")),
+    ("owner", np.dtype("u1")),
+    ("q", np.dtype("<i2")),
+    ("r", np.dtype("<i2")),
+    ("health", np.dtype("<i2")),
+    ("attack", np.dtype("<i2")),
+    ("defense", np.dtype("<i2")),
+    ("movement", np.dtype("i1"))
+)
+
+
+def _padding(size: int) -> int:
+    """Bytes needed after `size` bytes to reach the next aligned offset"""
+    return -size % _ALIGN
+
+
+class UnitTable:
+    """
+    Units of one game as parallel NumPy arrays
+
+    `owners[slot - 1]` is the player_id holding spawn slot `slot` (empty for
+    unassigned slots). Columns loaded with from_bytes() are read-only views
+    of the blob unless `writable` is requested.
+    """
+
+    def __init__(self, owners: List[str], columns: Dict[str, np.ndarray]):
+        self.owners = owners
+        self.columns = columns
+
+    def __len__(self) -> int:
+        return len(self.columns["id"])
+
+    # ==================== Construction ====================
+
+    @classmethod
+    def from_units(cls, owners: List[str], units: List[Dict[str, Any]]) -> "UnitTable":
+        """Build a table from unit dicts (the initialize_player_units format)"""
+        slots = {player_id: slot for slot, player_id in enumerate(owners, start=1) if player_id}
+        rows = [
+            (
+                int(unit["unit_id"].rsplit("_unit_", 1)[1]),
+                slots[unit["player_id"]],
+                unit["position"]["q"],
+                unit["position"]["r"],
+                unit["health"],
+                unit["attack"],
+                unit["defense"],
+                unit["movement_range"]
+            )
+            for unit in units
+        ]
+        values = list(zip(*rows)) if rows else [()] * len(COLUMNS)
+        return cls(owners, {
+            name: np.array(column, dtype=dtype)
+            for (name, dtype), column in zip(COLUMNS, values)
+        })
+
+    @classmethod
+    def spawn(cls, slots: Dict[int, str], spawn_points: List[Dict[str, Any]]) -> "UnitTable":
+        """
+        Starting units of a game: initialize_player_units for every player
+        at the spawn point of their slot
+
+        Args:
+            slots: Spawn slot → player_id (RedisClient.get_game_slots)
+            spawn_points: The map's spawn points ({q, r, player_slot})
+        """
+        owners = [slots.get(slot, "") for slot in range(1, max(slots, default=0) + 1)]
+
+        units = []
+        for slot, player_id in sorted(slots.items()):
+            units.extend(initialize_player_units(player_id, spawn_point_for_slot(spawn_points, slot)))
+        return cls.from_units(owners, units)
+
+    # ==================== Serialization ====================
+
+    def to_bytes(self) -> bytes:
+        """Encode the table as one blob"""
+        owners = "\n".join(self.owners).encode()
+        parts = [_HEADER.pack(MAGIC, len(self), len(owners)), owners, b"\0" * _padding(_HEADER.size + len(owners))]
+        for name, dtype in COLUMNS:
+            data = self.columns[name].astype(dtype, copy=False).tobytes()
+            parts.append(data)
+            parts.append(b"\0" * _padding(len(data)))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, writable: bool = False) -> "UnitTable":
+        """
+        Decode a blob without copying: columns are views of `data`
+
+        Pass writable=True to resolve a turn in place; the blob is then
+        copied once as a whole.
+        """
+        if writable:
+            data = bytearray(data)
+
+        magic, count, owners_size = _HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ValueError("Not a unit table blob")
+
+        offset = _HEADER.size
+        owners = bytes(data[offset:offset + owners_size]).decode().split("\n") if owners_size else []
+        offset += owners_size + _padding(offset + owners_size)
+
+        columns = {}
+        for name, dtype in COLUMNS:
+            columns[name] = np.frombuffer(data, dtype=dtype, count=count, offset=offset)
+            size = count * dtype.itemsize
+            offset += size + _padding(size)
+        return cls(owners, columns)
+
+    # ==================== Lookup ====================
+
+    def rows_of(self, player_ids: List[str], unit_ids: List[str]) -> np.ndarray:
+        """
+        Row of each (player_id, unit_id), or -1 when the player does not
+        own such a unit
+        """
+        slots = {player_id: slot for slot, player_id in enumerate(self.owners, start=1) if player_id}
+        wanted = np.full(len(unit_ids), -1, dtype=np.int64)
+        for i, (player_id, unit_id) in enumerate(zip(player_ids, unit_ids)):
+            prefix, _, index = str(unit_id).rpartition("_unit_")
+            if prefix == player_id and player_id in slots and index.isdigit():
+                wanted[i] = (slots[player_id] << 32) | int(index)
+
+        keys = (self.columns["owner"].astype(np.int64) << 32) | self.columns["id"].astype(np.int64)
+        order = np.argsort(keys, kind="stable")
+        positions = np.searchsorted(keys[order], wanted)
+        positions = np.minimum(positions, max(len(keys) - 1, 0))
+
+        rows = np.full(len(unit_ids), -1, dtype=np.int64)
+        if len(keys):
+            found = (wanted >= 0) & (keys[order][positions] == wanted)
+            rows[found] = order[positions[found]]
+        return rows
+
+    def to_units(self) -> List[Dict[str, Any]]:
+        """Unit dicts (the initialize_player_units format) for API responses"""
+        units = []
+        for row in range(len(self)):
+            player_id = self.owners[self.columns["owner"][row] - 1]
+            units.append({
+                "unit_id": f"{player_id}_unit_{self.columns['id'][row]}",
+                "player_id": player_id,
+                "health": int(self.columns["health"][row]),
+                "attack": int(self.columns["attack"][row]),
+                "defense": int(self.columns["defense"][row]),
+                "movement_range": int(self.columns["movement"][row]),
+                "position": {"q": int(self.columns["q"][row]), "r": int(self.columns["r"][row])}
+            })
+        return units
+
+
+def passable_grid(map_data: Dict[str, Any]) -> np.ndarray:
+    """(width, height) boolean grid of the hexes units may move onto"""
+    grid = np.zeros((map_data["width"], map_data["height"]), dtype=bool)
+    cells = np.array([
+        (hex_data["q"], hex_data["r"])
+        for hex_data in map_data["hexes"]
+        if hex_data.get("passable", True)
+    ], dtype=np.intp).reshape(-1, 2)
+    grid[cells[:, 0], cells[:, 1]] = True
+    return grid
+
+
+def apply_updates(table: UnitTable, updates: List[Dict[str, Any]], passable: np.ndarray) -> int:
+    """
+    Apply a turn's unit_moved updates to a writable table, column-wise
+
+    Updates naming a unit the player does not own, or a target that is
+    not a [q, r] position, are ignored, as are moves off the map, onto an
+    impassable hex (`passable`, see passable_grid) or farther than the
+    unit's movement range.
+
+    Returns:
+        Number of units moved
+    """
+    moved = [
+        update for update in updates
+        if update.get("type") == "unit_moved"
+        and isinstance(update.get("new_position"), (list, tuple)) and len(update["new_position"]) == 2
+        and all(isinstance(coord, int) for coord in update["new_position"])
+    ]
+    if not moved:
+        return 0
+
+    rows = table.rows_of([update["player_id"] for update in moved], [update["unit_id"] for update in moved])
+    positions = np.array([update["new_position"] for update in moved], dtype=np.int64)
+    q, r = positions[:, 0], positions[:, 1]
+    width, height = passable.shape
+
+    valid = (rows >= 0) & (q >= 0) & (q < width) & (r >= 0) & (r < height)
+    valid[valid] = passable[q[valid], r[valid]]
+
+    # Hex distance from the unit's position (see visibility.hex_distance)
+    dq = q[valid] - table.columns["q"][rows[valid]]
+    dr = r[valid] - table.columns["r"][rows[valid]]
+    valid[valid] = (np.abs(dq) + np.abs(dr) + np.abs(dq + dr)) // 2 <= table.columns["movement"][rows[valid]]
+
+    table.columns["q"][rows[valid]] = q[valid]
+    table.columns["r"][rows[valid]] = r[valid]
+    return int(valid.sum())
+
+
+def load(data: Optional[bytes], writable: bool = False) -> Optional[UnitTable]:
+    """UnitTable.from_bytes, passing None through (games without a unit table)"""
+    return UnitTable.from_bytes(data, writable=writable) if data else None
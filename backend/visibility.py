@@ -0,0 +1,208 @@
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Dict, Hashable, Iterable, Tuple
+
+import numpy as np
+
+
+# Terrain types that block line of sight (the blocking hex itself is still visible)
+SIGHT_BLOCKING_TERRAIN = frozenset({"forest"})
+
+# Default sight radius of a unit, in hexes
+DEFAULT_SIGHT_RADIUS = 5
+
+
+def _cube_round(x: float, y: float, z: float) -> Tuple[int, int]:
+    """Round fractional cube coordinates to the nearest hex, returned as axial (q, r)"""
+    rx, ry, rz = round(x), round(y), round(z)
+    dx, dy, dz = abs(rx - x), abs(ry - y), abs(rz - z)
+
+    if dx > dy and dx > dz:
+        rx = -ry - rz
+    elif dy > dz:
+        ry = -rx - rz
+
+    return rx, ry
+
+
+def hex_distance(dq: int, dr: int) -> int:
+    """Hex distance of an axial offset"""
+    return (abs(dq) + abs(dr) + abs(dq + dr)) // 2
+
+
+def hex_line_between(dq: int, dr: int) -> list:
+    """
+    Axial offsets of the hexes strictly between (0, 0) and (dq, dr)
+
+    Uses cube-coordinate interpolation, nudged slightly so lines running
+    exactly along hex edges resolve consistently.
+    """
+    n = hex_distance(dq, dr)
+    cells = []
+    for i in range(1, n):
+        t = i / n
+        x = dq * t + 1e-6
+        y = dr * t + 1e-6
+        cells.append(_cube_round(x, y, -x - y))
+    return cells
+
+
+@lru_cache(maxsize=16)
+def ray_table(radius: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Precomputed rays to every hex within `radius`
+
+    Rays are translation invariant, so one table serves every origin on
+    every map.
+
+    Returns:
+        Tuple of (offsets (K, 2), line cells (K, L, 2), line cell mask (K, L))
+        where line cells are padded to the longest ray L and the mask marks
+        real cells
+    """
+    offsets = [
+        (dq, dr)
+        for dq in range(-radius, radius + 1)
+        for dr in range(-radius, radius + 1)
+        if hex_distance(dq, dr) <= radius
+    ]
+    lines = [hex_line_between(dq, dr) for dq, dr in offsets]
+    longest = max(1, max(len(line) for line in lines))
+
+    cells = np.zeros((len(offsets), longest, 2), dtype=np.intp)
+    mask = np.zeros((len(offsets), longest), dtype=bool)
+    for k, line in enumerate(lines):
+        if line:
+            cells[k, :len(line)] = line
+            mask[k, :len(line)] = True
+
+    return np.array(offsets, dtype=np.intp), cells, mask
+
+
+class VisibilityMap:
+    """
+    Line-of-sight queries for one map
+
+    Holds the map's sight-blocking mask padded by the sight radius, so ray
+    lookups for units near the border need no bounds checks. Positions
+    off the map (such as units moved out of bounds) see nothing.
+    """
+
+    def __init__(self, blocked: np.ndarray, radius: int = DEFAULT_SIGHT_RADIUS):
+        self.width, self.height = blocked.shape
+        self.radius = radius
+        self.blocked = np.pad(blocked, radius, constant_values=False)
+        self.offsets, self.line_cells, self.line_mask = ray_table(radius)
+
+    def on_map(self, positions: np.ndarray) -> np.ndarray:
+        """Which (q, r) rows of `positions` (shape (..., 2)) lie on the map"""
+        return (
+            (positions[..., 0] >= 0) & (positions[..., 0] < self.width) &
+            (positions[..., 1] >= 0) & (positions[..., 1] < self.height)
+        )
+
+    def visible_mask(self, origins: Iterable[Tuple[int, int]]) -> np.ndarray:
+        """
+        Hexes visible from any of the given origins
+
+        Args:
+            origins: (q, r) positions, e.g. all units of one player
+
+        Returns:
+            Boolean array of shape (width, height)
+        """
+        mask = np.zeros((self.width, self.height), dtype=bool)
+        origins = np.asarray(list(origins), dtype=np.intp).reshape(-1, 2)
+        origins = origins[self.on_map(origins)]
+        if not len(origins):
+            return mask
+
+        # (U, K, L, 2) cells along every ray from every origin, in padded coordinates
+        cells = origins[:, None, None, :] + self.line_cells[None] + self.radius
+        sight_blocked = (self.blocked[cells[..., 0], cells[..., 1]] & self.line_mask[None]).any(axis=2)
+
+        targets = origins[:, None, :] + self.offsets[None]
+        visible = targets[~sight_blocked & self.on_map(targets)]
+        mask[visible[:, 0], visible[:, 1]] = True
+        return mask
+
+    def player_visibility(self, positions_by_player: Dict[str, Iterable[Tuple[int, int]]]) -> Dict[str, np.ndarray]:
+        """Visible-hex mask per player from their units' positions"""
+        return {
+            player_id: self.visible_mask(positions)
+            for player_id, positions in positions_by_player.items()
+        }
+
+    def can_see(self, origin: Tuple[int, int], target: Tuple[int, int]) -> bool:
+        """Whether `target` is within sight radius of `origin` with a clear line"""
+        if not self.on_map(np.array([origin, target])).all():
+            return False
+
+        dq, dr = target[0] - origin[0], target[1] - origin[1]
+        if hex_distance(dq, dr) > self.radius:
+            return False
+
+        for lq, lr in hex_line_between(dq, dr):
+            if self.blocked[origin[0] + lq + self.radius, origin[1] + lr + self.radius]:
+                return False
+        return True
+
+
+def pack_mask(mask: np.ndarray) -> bytes:
+    """Pack a visibility mask into a compact bitmask (row-major over q, then r)"""
+    return np.packbits(mask.ravel()).tobytes()
+
+
+def sight_blocking_grid(map_data: Dict[str, Any]) -> np.ndarray:
+    """Boolean (width, height) grid of hexes that block line of sight"""
+    blocked = np.zeros((map_data["width"], map_data["height"]), dtype=bool)
+    cells = np.array([
+        (hex_data["q"], hex_data["r"])
+        for hex_data in map_data["hexes"]
+        if hex_data["terrain"] in SIGHT_BLOCKING_TERRAIN
+    ], dtype=np.intp).reshape(-1, 2)
+    blocked[cells[:, 0], cells[:, 1]] = True
+    return blocked
+
+
+@lru_cache(maxsize=256)
+def _cached_visibility_map(terrain_key: bytes, width: int, height: int, radius: int) -> VisibilityMap:
+    """Build a VisibilityMap from a packed blocking mask (memoized by terrain)"""
+    blocked = np.unpackbits(np.frombuffer(terrain_key, dtype=np.uint8), count=width * height).astype(bool)
+    return VisibilityMap(blocked.reshape(width, height), radius)
+
+
+# VisibilityMaps by caller-supplied map key (e.g. game_id) and radius
+_keyed_maps: "OrderedDict[Tuple[Hashable, int], VisibilityMap]" = OrderedDict()
+_keyed_lock = threading.Lock()
+KEYED_CACHE_SIZE = 256
+
+
+def get_visibility_map(map_data: Dict[str, Any], radius: int = DEFAULT_SIGHT_RADIUS,
+                       map_key: Hashable = None) -> VisibilityMap:
+    """
+    Get the VisibilityMap for a map
+
+    Maps with the same sight-blocking terrain share one cached instance,
+    so the precomputation is paid once per terrain, not once per turn.
+    Pass a `map_key` identifying the map (maps never change once created)
+    to also skip rebuilding the blocking grid on every call.
+    """
+    if map_key is not None:
+        with _keyed_lock:
+            cached = _keyed_maps.get((map_key, radius))
+            if cached is not None:
+                _keyed_maps.move_to_end((map_key, radius))
+                return cached
+
+    blocked = sight_blocking_grid(map_data)
+    vis_map = _cached_visibility_map(pack_mask(blocked), blocked.shape[0], blocked.shape[1], radius)
+
+    if map_key is not None:
+        with _keyed_lock:
+            _keyed_maps[(map_key, radius)] = vis_map
+            while len(_keyed_maps) > KEYED_CACHE_SIZE:
+                _keyed_maps.popitem(last=False)
+    return vis_map
+
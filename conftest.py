@@ -0,0 +1,27 @@
+"""Make the backend modules importable from unit tests at the project root"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "backend"))
+
+# test_api.py is an integration script run against a live server (python test_api.py URL)
+collect_ignore = ["test_api.py"]
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """
+    Point the global redis_client at a fresh in-memory server (both decoded
+    and raw views); tests using it are skipped unless fakeredis is installed
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    from redis_client import redis_client
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis_client, "_client", fakeredis.FakeRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(redis_client, "_raw_client", fakeredis.FakeRedis(server=server, decode_responses=False))
+    # Registered scripts are bound to the client they were registered on
+    monkeypatch.setattr(redis_client, "_scripts", {})
+    return redis_client
@@ -0,0 +1,152 @@
+"""
+Unit tests for the batch endpoints (POST /batch/status, /batch/submit) and
+the pipelined move-due bookkeeping behind them, against an in-memory Redis
+
+Usage:
+    python -m pytest test_batch.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import lobby
+import main
+from auth import generate_api_key, generate_player_id, store_player_key
+from models import MapConfig
+from redis_client import redis_client
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+MOVES = [{"unit_id": "x_unit_0", "action": "defend"}]
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    """Turns handed to turn processing by the batch routes"""
+    calls = []
+    monkeypatch.setattr(main, "schedule_processing", lambda game_id, turn, tenant=None: calls.append((game_id, turn)))
+    return calls
+
+
+@pytest.fixture
+def player():
+    """A player (player_id, api_key) in two started games, and each game's opponent"""
+    player_id, api_key = generate_player_id(), generate_api_key()
+    store_player_key(player_id, api_key)
+
+    games, opponents = [], {}
+    for _ in range(2):
+        game_id = lobby.create_game(2, MapConfig(width=10, height=10), player=(player_id, api_key)).game_id
+        opponents[game_id] = lobby.join_game(game_id)
+        games.append(game_id)
+    return player_id, api_key, games, opponents
+
+
+def post(client, path, api_key, body):
+    return client.post(path, json=body, headers={"X-API-Key": api_key})
+
+
+def due(player_id):
+    return [game["game_id"] for game in redis_client.get_games_awaiting_move(player_id)]
+
+
+def test_status_reports_each_game_in_request_order(client, player):
+    _player_id, api_key, (game_a, game_b), _opponents = player
+    other = lobby.create_game(2, MapConfig(width=10, height=10)).game_id
+
+    response = post(client, "/batch/status", api_key, {"game_ids": [game_b, "game_missing", other, game_a]})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [(item["game_id"], item["status_code"]) for item in results] == [
+        (game_b, 200), ("game_missing", 404), (other, 403), (game_a, 200)
+    ]
+    assert results[0]["status"] == {
+        "game_id": game_b, "state": "in_progress", "current_turn": 0,
+        "moves_submitted": 0, "moves_required": 2, "all_moves_in": False
+    }
+
+
+def test_status_requires_valid_key(client, player):
+    assert post(client, "/batch/status", generate_api_key(), {"game_ids": player[2]}).status_code == 401
+
+
+def test_submit_stores_moves_and_clears_due(client, player, scheduled):
+    player_id, api_key, (game_a, game_b), opponents = player
+    assert sorted(due(player_id)) == sorted([game_a, game_b])
+
+    response = post(client, "/batch/submit", api_key, {"submissions": [
+        {"game_id": game_a, "turn": 0, "moves": MOVES},
+        {"game_id": game_b, "turn": 0, "moves": MOVES},
+    ]})
+
+    assert response.status_code == 200
+    assert [item["status_code"] for item in response.json()["results"]] == [200, 200]
+    assert response.json()["results"][0]["result"] == {
+        "success": True, "turn": 0, "moves_submitted": 1, "moves_required": 2, "processing": False
+    }
+    assert due(player_id) == []
+    assert due(opponents[game_a].player_id) == [game_a]
+    assert scheduled == []
+
+
+def test_submit_reports_per_item_errors(client, player, scheduled):
+    _player_id, api_key, (game_a, game_b), _opponents = player
+    assert post(client, "/batch/submit", api_key, {"submissions": [{"game_id": game_a, "turn": 0, "moves": MOVES}]}).status_code == 200
+
+    response = post(client, "/batch/submit", api_key, {"submissions": [
+        {"game_id": game_a, "turn": 0, "moves": MOVES},
+        {"game_id": game_b, "turn": 3, "moves": MOVES},
+        {"game_id": "game_missing", "turn": 0, "moves": MOVES},
+    ]})
+
+    assert [item["status_code"] for item in response.json()["results"]] == [409, 409, 404]
+    assert redis_client.count_turn_moves(game_a, 0) == 1
+    assert redis_client.count_turn_moves(game_b, 0) == 0
+
+
+def test_submit_completing_turn_starts_processing(client, player, scheduled):
+    _player_id, api_key, (game_a, _game_b), opponents = player
+    post(client, "/batch/submit", opponents[game_a].api_key, {"submissions": [{"game_id": game_a, "turn": 0, "moves": MOVES}]})
+
+    response = post(client, "/batch/submit", api_key, {"submissions": [{"game_id": game_a, "turn": 0, "moves": MOVES}]})
+
+    assert response.json()["results"][0]["result"]["processing"] is True
+    assert scheduled == [(game_a, 0)]
+    assert redis_client.get_game_meta(game_a, fresh=True)["state"] == "processing_turn"
+
+
+def test_duplicate_games_in_batch_rejected(client, player):
+    _player_id, api_key, (game_a, _game_b), _opponents = player
+    submission = {"game_id": game_a, "turn": 0, "moves": MOVES}
+    assert post(client, "/batch/submit", api_key, {"submissions": [submission, submission]}).status_code == 422
+
+
+@pytest.mark.parametrize("cluster", [False, True])
+def test_clear_due_on_pipelines(player, monkeypatch, cluster):
+    """
+    The clear-due script queued on a pipeline (loaded scripts on one node,
+    plain EVAL on a cluster) clears only the turn it was queued for
+    """
+    monkeypatch.setattr(redis_client, "cluster", cluster)
+    player_id, _api_key, (game_a, game_b), _opponents = player
+    # Scripts must be reloaded by the pipeline, not assumed cached
+    redis_client.client.script_flush()
+    # game_b has moved on to turn 1 since the submission for turn 0 was made
+    games_index = redis_client._player_games_key(player_id)
+    redis_client.client.zadd(games_index, {game_b: 1})
+
+    stored = redis_client.store_moves_batch([
+        (game_a, 0, player_id, {"turn": 0, "moves": []}),
+        (game_b, 0, player_id, {"turn": 0, "moves": []}),
+    ])
+
+    assert stored == [(True, 1), (True, 1)]
+    assert redis_client.client.zscore(games_index, game_a) == -1
+    assert redis_client.client.zscore(games_index, game_b) == 1
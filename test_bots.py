@@ -0,0 +1,85 @@
+"""
+Unit tests for server-hosted bot strategies (backend/bots.py)
+
+Usage:
+    python -m pytest test_bots.py
+"""
+
+import pytest
+
+import bots
+from config import Config
+from game_logic import generate_default_map, initialize_player_units
+from models import ACTION_CODES, ActionType
+
+
+def board_view(players=("bot_a", "bot_b"), passable=None, units=()):
+    """Shared view of a 10x10 game as compute_bot_moves builds it"""
+    view = dict(
+        bots.build_map_view(generate_default_map(10, 10)),
+        game_id="game_test",
+        turn=3,
+        players=list(players),
+        units=list(units)
+    )
+    if passable is not None:
+        view["passable"] = passable
+    return view
+
+
+def all_units(dead=()):
+    """Starting units of bot_a and bot_b, with `dead` unit_ids at 0 health"""
+    board = initialize_player_units("bot_a", {"q": 0, "r": 0}) + initialize_player_units("bot_b", {"q": 8, "r": 8})
+    for unit in board:
+        unit.pop("type")
+        if unit["unit_id"] in dead:
+            unit["health"] = 0
+    return board
+
+
+def test_base_strategy_is_abstract():
+    with pytest.raises(TypeError):
+        bots.BotStrategy("seed")
+
+
+def test_every_strategy_moves_only_living_own_units():
+    view = board_view(units=all_units(dead={"bot_a_unit_1"}))
+    for name in bots.STRATEGIES:
+        moves = bots.compute_game_moves(view, [("bot_a", name)])["bot_a"]
+        assert [move[1] for move in moves] == ["bot_a_unit_0", "bot_a_unit_2"], name
+
+
+def test_moves_are_deterministic_per_turn():
+    view = board_view(units=all_units())
+    assert bots.compute_game_moves(view, [("bot_a", "random")]) == bots.compute_game_moves(view, [("bot_a", "random")])
+
+
+def test_random_bot_without_passable_hexes_defends():
+    moves = bots.compute_game_moves(board_view(passable=[], units=all_units()), [("bot_a", "random")])["bot_a"]
+    assert {move[0] for move in moves} == {ACTION_CODES[ActionType.DEFEND]}
+
+
+def test_rusher_targets_living_enemy_unit():
+    view = board_view(units=all_units(dead={"bot_b_unit_0", "bot_b_unit_1"}))
+    attack, *advances = bots.compute_game_moves(view, [("bot_a", "rusher")])["bot_a"]
+
+    assert attack == [ACTION_CODES[ActionType.ATTACK], "bot_a_unit_0", "bot_b_unit_2"]
+    assert all(move[2] == [8, 8] for move in advances)
+
+
+def test_rusher_without_unit_table_uses_spawn_points():
+    view = dict(board_view(), units=None)
+    attack, *_advances = bots.compute_game_moves(view, [("bot_a", "rusher")])["bot_a"]
+    assert attack[2] == "bot_b_unit_0"
+
+
+def test_map_view_samples_large_maps(monkeypatch):
+    monkeypatch.setattr(Config, "BOT_VIEW_MAX_HEXES", 50)
+    map_data = generate_default_map(30, 30)
+    passable = {(hex_data["q"], hex_data["r"]) for hex_data in map_data["hexes"] if hex_data["passable"]}
+
+    view = bots.build_map_view(map_data)
+
+    assert len(view["passable"]) == 50
+    assert set(view["passable"]) <= passable
+    assert bots.build_map_view(map_data) == view
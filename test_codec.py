@@ -0,0 +1,62 @@
+"""
+Unit tests for the stored value codecs (backend/codec.py)
+
+Usage:
+    python -m pytest test_codec.py
+"""
+
+import json
+
+import pytest
+
+import codec
+
+
+VALUE = {"turn": 3, "moves": [[1, "p_unit_0", [4, 5]]], "passed": False, "note": "héx"}
+
+
+def test_decode_legacy_json_without_magic():
+    """Values written before codecs existed are plain JSON bytes"""
+    legacy = json.dumps(VALUE).encode()
+    assert not legacy.startswith(codec.MSGPACK_MAGIC)
+    assert codec.decode(legacy) == VALUE
+
+
+def test_decode_legacy_json_str():
+    """The decoded client returns legacy values as str"""
+    assert codec.decode(json.dumps(VALUE)) == VALUE
+
+
+def test_decode_none():
+    assert codec.decode(None) is None
+
+
+def test_json_codec_matches_legacy_format():
+    """JSON writes stay byte-identical to the compact JSON stored before codecs"""
+    encoded = codec.get_codec("json").encode(VALUE)
+    assert encoded == json.dumps(VALUE, separators=(",", ":")).encode()
+    assert codec.decode(encoded) == VALUE
+
+
+def test_msgpack_round_trip():
+    encoded = codec.get_codec("msgpack").encode(VALUE)
+    assert encoded.startswith(codec.MSGPACK_MAGIC)
+    assert codec.decode(encoded) == VALUE
+    assert codec.get_codec("msgpack").decode(encoded) == VALUE
+
+
+def test_msgpack_integer_map_keys():
+    """Chunk and history maps may have non-string keys"""
+    encoded = codec.get_codec("msgpack").encode({1: "a", 2: [1, 2]})
+    assert codec.decode(encoded) == {1: "a", 2: [1, 2]}
+
+
+def test_values_stay_readable_after_switching_codec():
+    """Either codec's values decode whichever codec is configured"""
+    for name in codec.CODECS:
+        assert codec.decode(codec.get_codec(name).encode(VALUE)) == VALUE
+
+
+def test_unknown_codec():
+    with pytest.raises(ValueError):
+        codec.get_codec("yaml")
@@ -0,0 +1,164 @@
+"""
+Unit tests for the turn deadline scheduler (backend/deadlines.py) against an
+in-memory Redis
+
+Usage:
+    python -m pytest test_deadlines.py
+"""
+
+import asyncio
+import time
+
+import pytest
+
+import lobby
+import turns
+from config import Config
+from deadlines import TurnDeadlineScheduler
+from models import MapConfig
+from redis_client import redis_client
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+
+def started_game():
+    """A two-player game with its first turn open and already overdue"""
+    game = lobby.create_game(2, MapConfig(width=10, height=10))
+    lobby.join_game(game.game_id)
+    redis_client.set_turn_deadline(game.game_id, time.time() - 1)
+    return game.game_id
+
+
+def deadline(game_id: str):
+    return redis_client.client.zscore("games:turn_deadlines", game_id)
+
+
+def test_overdue_turn_resolved_with_passes():
+    game_id = started_game()
+
+    claimed = TurnDeadlineScheduler().collect_overdue_turns()
+
+    assert claimed == [(game_id, 0)]
+    assert redis_client.count_turn_moves(game_id, 0) == 2
+    assert redis_client.get_game_meta(game_id, fresh=True)["state"] == "processing_turn"
+    assert deadline(game_id) is None
+
+
+def test_deadline_claimed_once():
+    game_id = started_game()
+    now = time.time()
+
+    assert redis_client.claim_turn_deadline(game_id, now, now + 30)
+    assert not redis_client.claim_turn_deadline(game_id, now, now + 30)
+
+
+def test_failure_after_claim_keeps_deadline(monkeypatch):
+    """A tick failing after the claim leaves the turn to be claimed again, not frozen"""
+    game_id = started_game()
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("lost Redis")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(redis_client, "fill_missing_moves", fail)
+        with pytest.raises(ConnectionError):
+            TurnDeadlineScheduler().collect_overdue_turns()
+
+    assert redis_client.get_game_meta(game_id, fresh=True)["state"] == "in_progress"
+    assert deadline(game_id) > time.time() + Config.DEADLINE_CLAIM_RETRY_SECONDS - 5
+
+    # Once the postponed deadline is due, the next tick resolves the turn
+    redis_client.set_turn_deadline(game_id, time.time() - 1)
+    assert TurnDeadlineScheduler().collect_overdue_turns() == [(game_id, 0)]
+
+
+def test_deadline_of_finished_game_dropped():
+    game_id = started_game()
+    redis_client.update_game_state(game_id, "complete")
+
+    assert TurnDeadlineScheduler().collect_overdue_turns() == []
+    assert deadline(game_id) is None
+
+
+# ==================== Processing Leases ====================
+
+def processing_game():
+    """A game whose turn 0 this worker claimed, lease and all"""
+    game_id = started_game()
+    assert turns.begin_processing(game_id, 0)
+    return game_id
+
+
+def lease_expiry(game_id: str):
+    return redis_client.client.zscore("games:processing_leases", game_id)
+
+
+def expire_lease(game_id: str):
+    """Let the game's lease run out, in meta and in the lease index"""
+    redis_client.client.hset(f"game:{{{game_id}}}:meta", "lease_expires", time.time() - 1)
+    redis_client.set_processing_lease(game_id, time.time() - 1)
+
+
+def test_only_holder_renews_lease():
+    game_id = processing_game()
+    expires = lease_expiry(game_id)
+
+    assert not redis_client.renew_turn_processing(game_id, "not-the-lease", expires + 100)
+    assert lease_expiry(game_id) == expires
+
+    assert redis_client.renew_turn_processing(game_id, turns._leases[(game_id, 0)], expires + 100)
+    assert lease_expiry(game_id) == expires + 100
+
+
+def test_live_lease_not_taken_over():
+    """A stale lease index entry does not let another worker take a renewed turn"""
+    game_id = processing_game()
+    redis_client.set_processing_lease(game_id, time.time() - 1)
+
+    assert TurnDeadlineScheduler().collect_overdue_turns() == []
+    assert redis_client.holds_turn_processing(game_id, turns._leases[(game_id, 0)])
+
+
+def test_turn_taken_over_while_queued_is_skipped(monkeypatch):
+    game_id = processing_game()
+    expire_lease(game_id)
+    assert redis_client.begin_turn_processing(game_id, 0, "new-holder", time.time() + 30, take_over=True)
+    redis_client.set_processing_lease(game_id, time.time() + 30)
+    expires = lease_expiry(game_id)
+
+    processed = []
+    monkeypatch.setattr(turns, "process_turn", lambda *args, **kwargs: processed.append(args))
+    asyncio.run(turns._process_scheduled_turn(game_id, 0))
+
+    assert processed == []
+    assert lease_expiry(game_id) == expires
+    assert redis_client.holds_turn_processing(game_id, "new-holder")
+
+
+def test_failure_after_lease_claim_keeps_lease(monkeypatch):
+    game_id = processing_game()
+    expire_lease(game_id)
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("lost Redis")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(redis_client, "get_game_meta", fail)
+        with pytest.raises(ConnectionError):
+            TurnDeadlineScheduler().collect_overdue_turns()
+
+    assert lease_expiry(game_id) > time.time() + Config.DEADLINE_CLAIM_RETRY_SECONDS - 5
+
+    redis_client.set_processing_lease(game_id, time.time() - 1)
+    assert TurnDeadlineScheduler().collect_overdue_turns() == [(game_id, 0)]
+
+
+def test_lease_of_finished_turn_dropped():
+    game_id = processing_game()
+    lease = turns._leases.pop((game_id, 0))
+    redis_client.finish_turn_processing(game_id, 0, lease, "in_progress", advance=True)
+    redis_client.set_processing_lease(game_id, time.time() - 1)
+
+    assert TurnDeadlineScheduler().collect_overdue_turns() == []
+    assert lease_expiry(game_id) is None
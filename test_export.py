@@ -0,0 +1,87 @@
+"""
+Unit tests for completed-game retention around exports (backend/export.py,
+backend/sweeper.py) against an in-memory Redis
+
+Usage:
+    python -m pytest test_export.py
+"""
+
+import time
+
+import pytest
+
+import export
+import lobby
+from config import Config
+from models import MapConfig
+from redis_client import redis_client
+from sweeper import GameSweeper
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+
+class NullWriter:
+    def write(self, table, arrays):
+        pass
+
+    def close(self):
+        pass
+
+
+def completed_game(hours_ago: float) -> str:
+    game = lobby.create_game(2, MapConfig(width=10, height=10))
+    lobby.join_game(game.game_id)
+    redis_client.update_game_state(game.game_id, "complete")
+    redis_client.client.zadd("games:completed", {game.game_id: time.time() - hours_ago * 3600})
+    return game.game_id
+
+
+def exists(game_id: str) -> bool:
+    return redis_client.get_game_meta(game_id, fresh=True) is not None
+
+
+def test_completed_games_deleted_after_grace_without_exports(monkeypatch):
+    monkeypatch.setattr(Config, "EXPORT_COMPLETED_GAMES", False)
+    old, recent = completed_game(2), completed_game(0)
+
+    GameSweeper().sweep_once()
+
+    assert not exists(old) and exists(recent)
+
+
+def test_unexported_games_kept_until_exported(monkeypatch):
+    monkeypatch.setattr(Config, "EXPORT_COMPLETED_GAMES", True)
+    first, second = completed_game(3), completed_game(2)
+
+    GameSweeper().sweep_once()
+    assert exists(first) and exists(second)
+
+    stats = export.export_completed_games(NullWriter())
+    assert stats["games"] == 2
+    assert redis_client.get_export_watermark() == stats["next_since"]
+
+    GameSweeper().sweep_once()
+    assert not exists(first) and not exists(second)
+
+
+def test_export_from_later_start_keeps_watermark(monkeypatch):
+    """A run skipping older games must not mark them exported"""
+    monkeypatch.setattr(Config, "EXPORT_COMPLETED_GAMES", True)
+    skipped = completed_game(3)
+    completed_game(1)
+
+    export.export_completed_games(NullWriter(), since=time.time() - 2 * 3600)
+
+    assert redis_client.get_export_watermark() == 0
+    GameSweeper().sweep_once()
+    assert exists(skipped)
+
+
+def test_unexported_games_dropped_after_hard_limit(monkeypatch):
+    monkeypatch.setattr(Config, "EXPORT_COMPLETED_GAMES", True)
+    game_id = completed_game(Config.TTL_UNEXPORTED_GAME / 3600 + 1)
+
+    GameSweeper().sweep_once()
+
+    assert not exists(game_id)
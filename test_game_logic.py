@@ -0,0 +1,84 @@
+"""
+Unit tests for combat resolution and win conditions (backend/game_logic.py)
+
+Usage:
+    python -m pytest test_game_logic.py
+"""
+
+import asyncio
+
+import pytest
+
+import tournament
+import units
+from game_logic import check_win_condition, initialize_player_units, resolve_combat
+from redis_client import redis_client
+
+
+def table(a_at=(0, 0), b_at=(2, 0)):
+    """bot_a and bot_b with 3 units each (100 health, attack 10, defense 5, movement 3)"""
+    board = (initialize_player_units("bot_a", {"q": a_at[0], "r": a_at[1]}) +
+             initialize_player_units("bot_b", {"q": b_at[0], "r": b_at[1]}))
+    return units.UnitTable.from_units(["bot_a", "bot_b"], board)
+
+
+def attack(player_id, unit_id, target):
+    return {"type": "attack_attempted", "player_id": player_id, "unit_id": unit_id, "target": target}
+
+
+def health(unit_table):
+    return {unit["unit_id"]: unit["health"] for unit in unit_table.to_units()}
+
+
+def test_attack_in_range_deals_damage():
+    board = table()
+    combat = resolve_combat(board, [attack("bot_a", "bot_a_unit_0", "bot_b_unit_1")])
+
+    assert health(board)["bot_b_unit_1"] == 95
+    assert combat["updates"] == [{"type": "unit_damaged", "player_id": "bot_b", "unit_id": "bot_b_unit_1", "health": 95}]
+    assert [event["type"] for event in combat["events"]] == ["attack_hit"]
+    assert combat["events"][0]["damage"] == 5
+
+
+def test_attacks_that_cannot_land_are_ignored():
+    board = table(b_at=(9, 0))
+    combat = resolve_combat(board, [
+        attack("bot_a", "bot_a_unit_0", "bot_b_unit_0"),   # out of range
+        attack("bot_a", "bot_a_unit_0", "bot_a_unit_1"),   # own unit
+        attack("bot_a", "bot_b_unit_0", "bot_b_unit_1"),   # not bot_a's unit
+        attack("bot_a", "bot_a_unit_0", "nobody_unit_0"),  # no such unit
+    ])
+
+    assert combat == {"updates": [], "events": []}
+    assert set(health(board).values()) == {100}
+
+
+def test_last_blow_destroys_and_ends_game():
+    board = table()
+    board.columns["health"][board.columns["owner"] == 2] = [3, 0, 0]
+
+    combat = resolve_combat(board, [
+        attack("bot_a", "bot_a_unit_0", "bot_b_unit_0"),
+        attack("bot_a", "bot_a_unit_1", "bot_b_unit_0"),   # already dead
+    ])
+
+    assert [event["type"] for event in combat["events"]] == ["attack_hit", "unit_destroyed"]
+    assert combat["events"][0]["damage"] == 3
+    assert combat["events"][1]["destroyed_by"] == "bot_a"
+    assert check_win_condition("game_test", board)
+    assert not check_win_condition("game_test", table())
+    assert not check_win_condition("game_test")
+
+
+@pytest.mark.usefixtures("fake_redis")
+def test_tournament_scores_the_game_outcome(monkeypatch):
+    """A mirror match plays to the end in the game logic and keeps both seats' scores"""
+    result = asyncio.run(tournament._play_match(["rusher", "rusher"], 60, 6, 6))
+
+    assert result["entrants"] == ["rusher", "rusher"]
+    assert len(result["scores"]) == 2
+    assert redis_client.get_game_meta(result["game_id"], fresh=True)["state"] == "complete"
+
+    ratings = tournament.EloRatings(["rusher"])
+    ratings.update(result)
+    assert ratings.ratings["rusher"] == 1500.0
@@ -0,0 +1,104 @@
+"""
+Unit tests for joining games (backend/lobby.py) against an in-memory Redis
+
+Usage:
+    python -m pytest test_lobby.py
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+import lobby
+import units
+from models import MapConfig
+from redis_client import redis_client
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+
+def new_game(max_players: int):
+    return lobby.create_game(max_players, MapConfig(width=10, height=10, terrain_data={"spawn_count": 8}))
+
+
+def awaiting(player_id: str):
+    return [game["game_id"] for game in redis_client.get_games_awaiting_move(player_id)]
+
+
+def test_player_filling_game_has_move_due():
+    """The last joiner starts the game; its first turn must be due for them too"""
+    game = new_game(2)
+    joined = lobby.join_game(game.game_id)
+
+    assert joined.state == "in_progress"
+    assert awaiting(joined.player_id) == [game.game_id]
+    assert awaiting(game.creator_player_id) == [game.game_id]
+
+
+def test_concurrent_joins_fill_game_exactly():
+    """500 simultaneous joins: exactly the free slots are taken, once each"""
+    game = new_game(8)
+
+    def join(_):
+        try:
+            return lobby.join_game(game.game_id)
+        except HTTPException as e:
+            return e.status_code
+
+    with ThreadPoolExecutor(64) as executor:
+        results = list(executor.map(join, range(500)))
+
+    joined = [result for result in results if not isinstance(result, int)]
+    assert sorted(result.spawn_slot for result in joined) == list(range(2, 9))
+    assert set(result for result in results if isinstance(result, int)) == {409}
+
+    meta = redis_client.get_game_meta(game.game_id, fresh=True)
+    assert meta["player_count"] == 8
+    assert meta["state"] == "in_progress"
+    for player_id in [game.creator_player_id] + [result.player_id for result in joined]:
+        assert awaiting(player_id) == [game.game_id]
+
+
+def test_created_game_has_creator_from_the_start(monkeypatch):
+    """Nothing of the game is visible before it is stored with its creator"""
+    store = redis_client.create_games
+    stored = []
+
+    def create_games(games, meta, map_data):
+        assert redis_client.get_game_meta(games[0][0], fresh=True) is None
+        store(games, meta, map_data)
+        stored.extend(game_id for game_id, _player_id, _api_key in games)
+
+    monkeypatch.setattr(redis_client, "create_games", create_games)
+    game = new_game(2)
+    assert stored == [game.game_id]
+
+    meta = redis_client.get_game_meta(game.game_id, fresh=True)
+    assert meta["player_count"] == 1 and meta["tenant"] == game.creator_player_id
+    assert redis_client.get_game_slots(game.game_id) == {1: game.creator_player_id}
+    assert redis_client.touch_session(game.api_key) == (game.creator_player_id, game.game_id)
+    assert redis_client.client.zscore(redis_client._player_games_key(game.creator_player_id), game.game_id) == -1
+
+
+def test_existing_player_creates_game():
+    first = new_game(2)
+    second = lobby.create_game(2, MapConfig(width=10, height=10), player=(first.creator_player_id, first.api_key))
+
+    assert second.api_key == first.api_key
+    assert redis_client.touch_session(first.api_key) == (first.creator_player_id, second.game_id)
+    assert redis_client.get_game_slots(second.game_id) == {1: first.creator_player_id}
+
+
+def test_join_reports_spawn_point_units_start_at():
+    """With more players than spawn points, join and unit placement agree on each slot's point"""
+    game = lobby.create_game(8, MapConfig(width=10, height=10))
+    joined = [lobby.join_game(game.game_id) for _ in range(7)]
+
+    table = units.load(redis_client.get_units(game.game_id))
+    start = {unit["player_id"]: unit["position"] for unit in table.to_units()}
+    assert len(redis_client.get_game_map(game.game_id, with_hexes=False)["spawn_points"]) == 4
+    for result in joined:
+        assert result.spawn_point is not None
+        assert {"q": result.spawn_point["q"], "r": result.spawn_point["r"]} == start[result.player_id]
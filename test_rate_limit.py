@@ -0,0 +1,120 @@
+"""
+Unit tests for rate limits and admission control (backend/rate_limit.py)
+
+Usage:
+    python -m pytest test_rate_limit.py
+"""
+
+import asyncio
+import uuid
+
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+import rate_limit
+from auth import store_player_key
+from config import Config
+from rate_limit import AdmissionControl, client_address
+
+
+def request_from(host: str, forwarded: str = None, path: str = "/x") -> Request:
+    headers = [(b"x-forwarded-for", forwarded.encode())] if forwarded else []
+    return Request({"type": "http", "method": "GET", "path": path, "headers": headers, "client": (host, 1234)})
+
+
+def test_client_address_without_proxies(monkeypatch):
+    monkeypatch.setattr(Config, "TRUSTED_PROXY_HOPS", 0)
+    assert client_address(request_from("10.0.0.1", "6.6.6.6")) == "10.0.0.1"
+
+
+def test_client_address_behind_proxy(monkeypatch):
+    """Only the entry appended by the trusted proxy counts, not ones the client sent"""
+    monkeypatch.setattr(Config, "TRUSTED_PROXY_HOPS", 1)
+    assert client_address(request_from("10.0.0.1", "6.6.6.6, 203.0.113.7")) == "203.0.113.7"
+    assert client_address(request_from("10.0.0.1")) == "10.0.0.1"
+
+
+@pytest.fixture
+def limited_app(fake_redis, monkeypatch):
+    """An app with one route allowing a burst of 2 requests"""
+    monkeypatch.setitem(Config.RATE_LIMITS, "test", (0.001, 2))
+    app = FastAPI()
+
+    @app.get("/limited", dependencies=[Depends(rate_limit.rate_limit("test"))])
+    async def limited():
+        return {}
+
+    return TestClient(app)
+
+
+def test_burst_then_throttled(limited_app):
+    assert [limited_app.get("/limited").status_code for _ in range(3)] == [200, 200, 429]
+    assert int(limited_app.get("/limited").headers["Retry-After"]) >= 1
+
+
+def test_made_up_keys_share_address_bucket(limited_app):
+    """A fresh random X-API-Key per request does not get a fresh budget"""
+    codes = [
+        limited_app.get("/limited", headers={"X-API-Key": str(uuid.uuid4())}).status_code
+        for _ in range(3)
+    ]
+    assert codes == [200, 200, 429]
+
+
+def test_valid_key_has_own_bucket(limited_app):
+    api_key = str(uuid.uuid4())
+    store_player_key("player_test", api_key)
+    limited_app.get("/limited")
+    limited_app.get("/limited")
+
+    assert limited_app.get("/limited").status_code == 429
+    assert limited_app.get("/limited", headers={"X-API-Key": api_key}).status_code == 200
+
+
+@pytest.fixture
+def admitted_app():
+    app = FastAPI()
+    app.middleware("http")(AdmissionControl(max_concurrent=4, wait_seconds=0.1))
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    return TestClient(app)
+
+
+def test_declared_body_too_large(admitted_app):
+    response = admitted_app.post("/echo", content=b"x" * (Config.MAX_REQUEST_BODY_BYTES + 1))
+    assert response.status_code == 413
+
+
+def test_chunked_body_rejected(admitted_app):
+    """A streamed body has no Content-Length to check, so it is refused"""
+    def chunks():
+        for _ in range(4):
+            yield b"x" * Config.MAX_REQUEST_BODY_BYTES
+
+    assert admitted_app.post("/echo", content=chunks()).status_code == 411
+    assert admitted_app.post("/echo", content=b"small").json() == {"size": 5}
+
+
+def test_overload_sheds_with_503():
+    """Requests that cannot get a slot in time get 503, and slots are released"""
+    control = AdmissionControl(max_concurrent=1, wait_seconds=0.01)
+
+    async def slow(request):
+        await asyncio.sleep(0.1)
+        return "done"
+
+    async def main():
+        first, second = await asyncio.gather(control(request_from("a"), slow), control(request_from("b"), slow))
+        third = await control(request_from("c"), slow)
+        return first, second, third
+
+    first, second, third = asyncio.run(main())
+    assert first == "done"
+    assert second.status_code == 503 and second.headers["Retry-After"] == "1"
+    assert third == "done"
+    assert control.rejected == 1 and control.in_flight == 0
@@ -0,0 +1,88 @@
+"""
+Unit tests for the turn scheduler (backend/scheduler.py)
+
+Usage:
+    python -m pytest test_scheduler.py
+"""
+
+import asyncio
+
+from scheduler import TurnScheduler
+
+
+def run_turns(scheduler: TurnScheduler, turns, expected: int):
+    """Submit (game_id, tenant) turns, then run the scheduler until `expected` turns finished"""
+    async def main():
+        for game_id, tenant in turns:
+            scheduler.submit(game_id, 1, tenant)
+        runner = asyncio.ensure_future(scheduler.run())
+        while scheduler.processed < expected:
+            await asyncio.sleep(0.001)
+        runner.cancel()
+
+    asyncio.run(main())
+
+
+class Recorder:
+    """Fake process_turn recording order and concurrency"""
+
+    def __init__(self, tenants, duration: float = 0.005):
+        self.tenants = tenants  # game_id → tenant
+        self.duration = duration
+        self.order = []
+        self.running = {}
+        self.max_running = 0
+        self.max_running_per_tenant = 0
+
+    async def __call__(self, game_id: str, turn: int):
+        tenant = self.tenants[game_id]
+        self.running[tenant] = self.running.get(tenant, 0) + 1
+        self.max_running = max(self.max_running, sum(self.running.values()))
+        self.max_running_per_tenant = max(self.max_running_per_tenant, self.running[tenant])
+        try:
+            await asyncio.sleep(self.duration)
+            self.order.append(game_id)
+        finally:
+            self.running[tenant] -= 1
+
+
+def test_light_tenant_not_starved_by_heavy_tenant():
+    """A tenant with one game is served long before a busy tenant's queue drains"""
+    turns = [(f"heavy_{i}", "heavy") for i in range(50)] + [("light_0", "light")]
+    recorder = Recorder(dict(turns))
+    scheduler = TurnScheduler(recorder, concurrency=2, per_tenant=2, max_wait=60)
+
+    run_turns(scheduler, turns, len(turns))
+
+    assert len(recorder.order) == len(turns)
+    assert recorder.order.index("light_0") < 4
+
+
+def test_concurrency_bounds():
+    """Never more than `concurrency` turns at once, nor `per_tenant` per tenant"""
+    turns = [(f"{tenant}_{i}", tenant) for tenant in ("a", "b", "c") for i in range(10)]
+    recorder = Recorder(dict(turns))
+    scheduler = TurnScheduler(recorder, concurrency=4, per_tenant=2, max_wait=60)
+
+    run_turns(scheduler, turns, len(turns))
+
+    assert len(recorder.order) == len(turns)
+    assert recorder.max_running == 4
+    assert recorder.max_running_per_tenant == 2
+    assert scheduler.stats()["running"] == 0
+
+
+def test_failing_turn_releases_its_slot():
+    """A turn that raises still frees its tenant's slot for the next one"""
+    async def process(game_id: str, turn: int):
+        if game_id == "bad":
+            raise RuntimeError("boom")
+        done.append(game_id)
+
+    done = []
+    scheduler = TurnScheduler(process, concurrency=1, per_tenant=1, max_wait=60)
+
+    run_turns(scheduler, [("bad", "t"), ("good", "t")], 2)
+
+    assert done == ["good"]
+    assert scheduler.stats()["running"] == 0
@@ -0,0 +1,97 @@
+"""
+Unit tests for bucketed player sessions (backend/auth.py,
+RedisClient session methods) against an in-memory Redis
+
+Usage:
+    python -m pytest test_sessions.py
+"""
+
+import time
+
+import pytest
+
+from auth import authenticate, generate_api_key, store_player_key
+from config import Config
+from redis_client import redis_client
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+
+def bucket_of(api_key: str) -> str:
+    return redis_client._session_bucket_key(api_key)
+
+
+def bucket_number(api_key: str) -> int:
+    """Index of the key's bucket, as purge_expired_sessions counts them"""
+    return int(bucket_of(api_key).removeprefix("sessions:{").removesuffix("}"), 16)
+
+
+def expire_record(api_key: str):
+    """Rewrite a session record as already expired"""
+    bucket = bucket_of(api_key)
+    player_id, game_id, _expires = redis_client.client.hget(bucket, api_key).split("\t")
+    redis_client.client.hset(bucket, api_key, f"{player_id}\t{game_id}\t{int(time.time()) - 1}")
+
+
+def test_session_created_and_refreshed():
+    api_key = generate_api_key()
+    store_player_key("player_a", api_key, "game_1")
+
+    assert redis_client.touch_session(api_key) == ("player_a", "game_1")
+    assert authenticate(api_key) == "player_a"
+
+    _player, _game, expires = redis_client.client.hget(bucket_of(api_key), api_key).split("\t")
+    assert int(expires) >= int(time.time()) + Config.TTL_PLAYER_SESSION - 5
+    assert redis_client.client.ttl(bucket_of(api_key)) > 0
+
+
+def test_session_game_updated():
+    api_key = generate_api_key()
+    store_player_key("player_a", api_key)
+    assert redis_client.touch_session(api_key) == ("player_a", None)
+
+    assert redis_client.set_session_game(api_key, "game_2")
+    assert redis_client.touch_session(api_key) == ("player_a", "game_2")
+    assert not redis_client.set_session_game(generate_api_key(), "game_2")
+
+
+def test_unknown_and_expired_keys_rejected():
+    assert authenticate(generate_api_key()) is None
+
+    api_key = generate_api_key()
+    store_player_key("player_a", api_key)
+    expire_record(api_key)
+
+    assert authenticate(api_key) is None
+    assert not redis_client.client.hexists(bucket_of(api_key), api_key)
+
+
+def test_legacy_key_migrated_on_first_use():
+    api_key = generate_api_key()
+    redis_client.client.set(f"api_key:{api_key}", "player_old")
+
+    assert authenticate(api_key) == "player_old"
+    assert redis_client.client.get(f"api_key:{api_key}") is None
+    assert redis_client.touch_session(api_key) == ("player_old", None)
+    assert authenticate(api_key) == "player_old"
+
+
+def test_purge_drops_only_expired_records(monkeypatch):
+    monkeypatch.setattr(Config, "SESSION_BUCKET_CHARS", 1)
+    live, expired = generate_api_key(), generate_api_key()
+    store_player_key("player_live", live)
+    store_player_key("player_expired", expired)
+    expire_record(expired)
+
+    # One pass per call over a bounded slice of buckets, wrapping at the end
+    start, purged = redis_client.purge_expired_sessions(0, 10)
+    assert start == 10
+    assert purged == (bucket_number(expired) < 10)
+
+    start, purged_rest = redis_client.purge_expired_sessions(start, 10)
+    assert start == 0
+    assert purged + purged_rest == 1
+
+    assert not redis_client.client.hexists(bucket_of(expired), expired)
+    assert redis_client.touch_session(live) == ("player_live", None)
@@ -0,0 +1,74 @@
+"""
+Unit tests for the per-worker spectator cache (backend/spectator.py)
+
+Usage:
+    python -m pytest test_spectator.py
+"""
+
+import asyncio
+import json
+import threading
+
+from config import Config
+from spectator import SpectatorCache
+
+
+class ScriptedGame:
+    """Stands in for RedisClient: one game whose turn results can be held back"""
+
+    def __init__(self):
+        self.meta = {"state": "in_progress", "current_turn": 1, "player_count": 2, "max_players": 2}
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.release.set()
+
+    def get_game_meta(self, game_id, fresh=False):
+        return dict(self.meta)
+
+    def get_game_map(self, game_id, with_hexes=True):
+        return {"width": 10, "height": 10}
+
+    def get_turn_results(self, game_id, turn):
+        self.started.set()
+        assert self.release.wait(5)
+        return {"updates": [], "events": [{"turn": turn}]}
+
+
+def rendered(cache, feed):
+    payload = json.loads(cache.render(feed, None, False))
+    return payload["current_turn"], [turn["turn"] for turn in payload["turns"]]
+
+
+def test_readers_never_see_half_refreshed_feed(monkeypatch):
+    monkeypatch.setattr(Config, "SPECTATOR_REFRESH_SECONDS", 0)
+    game = ScriptedGame()
+    cache = SpectatorCache(client=game)
+
+    async def main():
+        feed = await cache.get_feed("game_x")
+        assert rendered(cache, feed) == (1, [0])
+
+        # The next refresh stalls while fetching turn results...
+        game.meta["current_turn"] = 3
+        game.started.clear()
+        game.release.clear()
+        refresh = asyncio.create_task(cache.get_feed("game_x"))
+        await asyncio.to_thread(game.started.wait, 5)
+
+        # ...and meanwhile readers still get the old turn, meta and results together
+        assert rendered(cache, feed) == (1, [0])
+        assert feed.etag == '"1-in_progress"'
+
+        game.release.set()
+        assert await refresh is feed
+        assert rendered(cache, feed) == (3, [0, 1, 2])
+
+    asyncio.run(main())
+
+
+def test_missing_game_has_no_feed():
+    game = ScriptedGame()
+    game.meta = None
+    game.get_game_meta = lambda game_id, fresh=False: None
+
+    assert asyncio.run(SpectatorCache(client=game).get_feed("game_x")) is None
@@ -0,0 +1,80 @@
+"""
+Unit tests for move submission and Idempotency-Key replays (POST
+/game/{game_id}/submit) against an in-memory Redis
+
+Usage:
+    python -m pytest test_submit.py
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import lobby
+import main
+from models import MapConfig
+from redis_client import redis_client
+
+
+pytestmark = pytest.mark.usefixtures("fake_redis")
+
+MOVES = {"turn": 0, "moves": [{"unit_id": "x_unit_0", "action": "defend"}]}
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app, raise_server_exceptions=False)
+
+
+@pytest.fixture
+def game():
+    """A started two-player game: (game_id, creator api_key)"""
+    created = lobby.create_game(2, MapConfig(width=10, height=10))
+    lobby.join_game(created.game_id)
+    return created.game_id, created.api_key
+
+
+def submit(client, game, idempotency_key=None):
+    game_id, api_key = game
+    headers = {"X-API-Key": api_key}
+    if idempotency_key:
+        headers["Idempotency-Key"] = idempotency_key
+    return client.post(f"/game/{game_id}/submit", json=MOVES, headers=headers)
+
+
+def test_retry_with_same_key_replays_response(client, game):
+    first = submit(client, game, "key-1")
+    retry = submit(client, game, "key-1")
+
+    assert first.status_code == 200
+    assert retry.status_code == 200
+    assert retry.json() == first.json() == {
+        "success": True, "turn": 0, "moves_submitted": 1, "moves_required": 2, "processing": False
+    }
+
+
+def test_duplicate_without_matching_key_conflicts(client, game):
+    assert submit(client, game, "key-1").status_code == 200
+    assert submit(client, game, "key-2").status_code == 409
+    assert submit(client, game).status_code == 409
+
+
+def test_retry_finishes_submission_that_failed_after_storing(client, game, monkeypatch):
+    """A request failing after its moves landed is finished by its retry, not refused"""
+    game_id, _api_key = game
+
+    def fail(*args, **kwargs):
+        raise ConnectionError("lost Redis")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(redis_client, "clear_move_due", fail)
+        assert submit(client, game, "key-1").status_code == 500
+
+    creator = redis_client.get_game_slots(game_id)[1]
+    assert redis_client.get_submission_receipt(game_id, 0, creator) == {
+        "idempotency_key": "key-1", "response": None
+    }
+
+    retry = submit(client, game, "key-1")
+    assert retry.status_code == 200
+    assert retry.json()["moves_submitted"] == 1
+    assert submit(client, game, "key-1").json() == retry.json()
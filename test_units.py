@@ -0,0 +1,160 @@
+"""
+Unit tests for the per-game unit table (backend/units.py)
+
+Usage:
+    python -m pytest test_units.py
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+import units
+from game_logic import UNITS_PER_PLAYER, initialize_player_units
+
+
+OWNERS = ["alice", "", "bob"]
+
+
+def legacy_units():
+    """Units as stored before unit tables: a JSON list of initialize_player_units dicts"""
+    stored = json.dumps(
+        initialize_player_units("alice", {"q": 1, "r": 2}) + initialize_player_units("bob", {"q": 7, "r": 8})
+    )
+    return json.loads(stored)
+
+
+def without_type(unit_list):
+    """Unit dicts minus the fields a table does not keep"""
+    return [{key: value for key, value in unit.items() if key != "type"} for unit in unit_list]
+
+
+def test_round_trip():
+    table = units.UnitTable.from_units(OWNERS, legacy_units())
+    decoded = units.UnitTable.from_bytes(table.to_bytes())
+
+    assert decoded.owners == OWNERS
+    assert len(decoded) == 2 * UNITS_PER_PLAYER
+    for name, _dtype in units.COLUMNS:
+        assert np.array_equal(decoded.columns[name], table.columns[name])
+    assert decoded.to_units() == table.to_units()
+
+
+def test_legacy_json_units():
+    """from_units takes legacy unit dicts; to_units gives them back (without type)"""
+    table = units.UnitTable.from_units(OWNERS, legacy_units())
+
+    assert table.to_units() == without_type(legacy_units())
+    assert list(table.columns["owner"]) == [1] * UNITS_PER_PLAYER + [3] * UNITS_PER_PLAYER
+
+
+def test_empty_table():
+    table = units.UnitTable.from_units([], [])
+    decoded = units.UnitTable.from_bytes(table.to_bytes())
+
+    assert len(decoded) == 0
+    assert decoded.owners == []
+    assert decoded.to_units() == []
+    assert list(decoded.rows_of(["alice"], ["alice_unit_0"])) == [-1]
+
+
+def test_dead_units_kept():
+    """Units at zero or negative health stay in the table, health intact"""
+    unit_list = legacy_units()
+    unit_list[0]["health"] = 0
+    unit_list[4]["health"] = -12
+    decoded = units.UnitTable.from_bytes(units.UnitTable.from_units(OWNERS, unit_list).to_bytes())
+
+    assert [unit["health"] for unit in decoded.to_units()] == [0, 100, 100, 100, -12, 100]
+    assert list(decoded.rows_of(["alice", "bob"], ["alice_unit_0", "bob_unit_1"])) == [0, 4]
+
+
+def test_load_none():
+    assert units.load(None) is None
+    assert units.load(b"") is None
+
+
+def test_bad_magic():
+    data = bytearray(units.UnitTable.from_units(OWNERS, legacy_units()).to_bytes())
+    data[:4] = b"JUNK"
+
+    with pytest.raises(ValueError):
+        units.UnitTable.from_bytes(bytes(data))
+
+
+def test_read_only_unless_writable():
+    blob = units.UnitTable.from_units(OWNERS, legacy_units()).to_bytes()
+
+    with pytest.raises(ValueError):
+        units.load(blob).columns["q"][0] = 0
+
+    table = units.load(blob, writable=True)
+    table.columns["q"][0] = 0
+    assert units.load(blob).columns["q"][0] == 1
+
+
+def move(player_id, unit_id, target):
+    return {"type": "unit_moved", "player_id": player_id, "unit_id": unit_id, "new_position": target}
+
+
+def writable_table():
+    """alice's units at (1, 2) and bob's at (7, 8), movement range 3"""
+    return units.load(units.UnitTable.from_units(OWNERS, legacy_units()).to_bytes(), writable=True)
+
+
+OPEN_MAP = np.ones((10, 10), dtype=bool)
+
+
+def test_apply_updates():
+    table = writable_table()
+    moved = units.apply_updates(table, [
+        move("alice", "alice_unit_2", [3, 3]),
+        move("alice", "bob_unit_0", [6, 8]),
+        move("bob", "bob_unit_0", "nowhere"),
+        {"type": "unit_attacked", "player_id": "bob", "unit_id": "bob_unit_1"}
+    ], OPEN_MAP)
+
+    assert moved == 1
+    positions = [unit["position"] for unit in table.to_units()]
+    assert positions[2] == {"q": 3, "r": 3}
+    assert positions[3] == {"q": 7, "r": 8}
+
+
+def test_apply_updates_rejects_bad_targets():
+    """Moves off the map, onto impassable hexes or beyond movement range leave the unit in place"""
+    passable = OPEN_MAP.copy()
+    passable[2, 2] = False
+    table = writable_table()
+    before = table.to_units()
+
+    moved = units.apply_updates(table, [
+        move("alice", "alice_unit_0", [9999, 9999]),   # off the map (valid AxialCoord)
+        move("bob", "bob_unit_0", [7, 10]),            # one past the edge, within range
+        move("alice", "alice_unit_1", [2, 2]),         # impassable
+        move("alice", "alice_unit_2", [5, 2]),         # 4 hexes away
+        move("bob", "bob_unit_1", [-1, 8]),
+    ], passable)
+
+    assert moved == 0
+    assert table.to_units() == before
+
+
+def test_apply_updates_movement_range_is_hex_distance():
+    table = writable_table()
+    # From (1, 5): (4, 2) is 3 hexes away along an axial diagonal, (3, 7) is 4
+    table.columns["r"][:] += 3
+
+    assert units.apply_updates(table, [move("alice", "alice_unit_0", [4, 2])], OPEN_MAP) == 1
+    assert units.apply_updates(table, [move("alice", "alice_unit_1", [3, 7])], OPEN_MAP) == 0
+
+
+def test_passable_grid():
+    map_data = {"width": 3, "height": 2, "hexes": [
+        {"q": q, "r": r, "passable": (q, r) != (1, 0)} for q in range(3) for r in range(2)
+    ]}
+
+    grid = units.passable_grid(map_data)
+
+    assert grid.shape == (3, 2)
+    assert grid.sum() == 5 and not grid[1, 0]
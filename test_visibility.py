@@ -0,0 +1,72 @@
+"""
+Unit tests for line-of-sight visibility (backend/visibility.py)
+
+Usage:
+    python -m pytest test_visibility.py
+"""
+
+import numpy as np
+
+import visibility
+from visibility import VisibilityMap, get_visibility_map
+
+
+def terrain_map(width, height, forest=()):
+    return {
+        "width": width,
+        "height": height,
+        "hexes": [
+            {"q": q, "r": r, "terrain": "forest" if (q, r) in forest else "plains"}
+            for q in range(width) for r in range(height)
+        ]
+    }
+
+
+def test_open_map_sees_whole_radius():
+    vis_map = VisibilityMap(np.zeros((20, 20), dtype=bool), radius=3)
+    assert vis_map.visible_mask([(10, 10)]).sum() == 3 * 3 * 4 + 1
+
+
+def test_forest_blocks_what_lies_behind_it():
+    blocked = np.zeros((10, 10), dtype=bool)
+    blocked[3, 2] = True
+    vis_map = VisibilityMap(blocked, radius=4)
+    mask = vis_map.visible_mask([(2, 2)])
+
+    assert mask[3, 2] and vis_map.can_see((2, 2), (3, 2))
+    assert not mask[4, 2] and not vis_map.can_see((2, 2), (4, 2))
+
+
+def test_visible_mask_agrees_with_can_see():
+    rng = np.random.default_rng(1)
+    vis_map = VisibilityMap(rng.random((12, 12)) < 0.3, radius=4)
+    origin = (6, 5)
+    mask = vis_map.visible_mask([origin])
+
+    for q in range(12):
+        for r in range(12):
+            assert mask[q, r] == vis_map.can_see(origin, (q, r)), (q, r)
+
+
+def test_origins_off_the_map_see_nothing():
+    vis_map = VisibilityMap(np.zeros((10, 10), dtype=bool), radius=3)
+
+    assert not vis_map.visible_mask([(9999, 9999), (-1, 0), (10, 5)]).any()
+    assert vis_map.visible_mask([(9999, 9999), (0, 0)]).sum() == vis_map.visible_mask([(0, 0)]).sum()
+    assert not vis_map.can_see((9999, 9999), (9, 9))
+    assert not vis_map.can_see((9, 9), (10, 9))
+
+
+def test_keyed_lookup_skips_grid_rebuild(monkeypatch):
+    map_data = terrain_map(8, 8, forest={(3, 3)})
+    built = []
+    grid = visibility.sight_blocking_grid
+    monkeypatch.setattr(visibility, "sight_blocking_grid", lambda data: built.append(1) or grid(data))
+
+    first = get_visibility_map(map_data, 3, map_key="game_vis")
+    assert get_visibility_map(map_data, 3, map_key="game_vis") is first
+    assert len(built) == 1
+
+    # Same terrain under another key still shares the precomputed instance
+    assert get_visibility_map(map_data, 3, map_key="game_other") is first
+    assert get_visibility_map(map_data, 2, map_key="game_vis") is not first